@@ -1,12 +1,16 @@
+import functools
+
 from google.adk.agents import LlmAgent
 from google.adk.tools import google_search
 from google.genai import types
 
-from google.adk.tools.langchain_tool import LangchainTool
-from langchain_community.tools import WikipediaQueryRun # A third-party LangChain tool
-from langchain_community.utilities import WikipediaAPIWrapper # Utility for Wikipedia tool
+from common.lazy_tools import LazyToolset
+from common.models import configured_model
+from common.response_cache import response_cache
+
+from .racing import RacingAgent
 
-GEMINI_MODEL = "gemini-2.0-flash"
+GEMINI_MODEL = configured_model("gemini-2.0-flash") # Override with the GEMINI_MODEL env var
 
 # --- Agent 2: Fact Finder Agent (Uses a Built-in Tool: Google Search) ---
 # This agent answers general knowledge questions by searching the web.
@@ -21,17 +25,37 @@ fact_finder_agent = LlmAgent(
     ),
     description="Answers factual questions by performing Google searches.",
     tools=[google_search], # Uses the built-in Google Search tool
-    generate_content_config=types.GenerateContentConfig(temperature=0.3) # Balanced for factual summary
+    generate_content_config=types.GenerateContentConfig(temperature=0.3), # Balanced for factual summary
+    # Low temperature: identical questions are answered from the shared response cache (see common/response_cache.py)
+    before_model_callback=response_cache.before_model,
+    after_model_callback=response_cache.after_model,
+    on_model_error_callback=response_cache.on_model_error
 )
 
 # --- Agent 3: Wikipedia Summarizer Agent (Uses a Third-Party LangChain Tool) ---
 # This agent uses LangChain's Wikipedia tool to fetch and summarize information.
 
 # Initialize the Wikipedia tool from LangChain
-wikipedia_api_wrapper = WikipediaAPIWrapper(top_k_results=1, doc_content_chars_max=500)
-wikipedia_tool = WikipediaQueryRun(api_wrapper=wikipedia_api_wrapper)
+# Answers are kept in a persistent local cache; set WIKIPEDIA_OFFLINE=1 to answer from the cache only.
+# LangChain is slow to import, so the tool is only built the first time this agent needs its tools.
+@functools.lru_cache(maxsize=None)
+def get_wikipedia_tool():
+    """Builds the cached LangChain Wikipedia tool on first call and returns the same instance afterwards."""
+    from langchain_community.utilities import WikipediaAPIWrapper # Utility for Wikipedia tool
+
+    from .wikipedia_cache import CachedWikipediaQueryRun, open_default_cache # Cached WikipediaQueryRun (a third-party LangChain tool)
+
+    wikipedia_api_wrapper = WikipediaAPIWrapper(top_k_results=1, doc_content_chars_max=500)
+    return CachedWikipediaQueryRun(api_wrapper=wikipedia_api_wrapper, cache=open_default_cache())
+
 
-adk_wikipedia_tool = LangchainTool(tool=wikipedia_tool)
+def _build_wikipedia_tools():
+    from google.adk.tools.langchain_tool import LangchainTool
+
+    return [LangchainTool(tool=get_wikipedia_tool())]
+
+
+adk_wikipedia_tool = LazyToolset(_build_wikipedia_tools)
 
 wikipedia_summarizer_agent = LlmAgent(
     name="WikipediaSummarizerAgent",
@@ -43,7 +67,22 @@ wikipedia_summarizer_agent = LlmAgent(
     ),
     description="Fetches and summarizes information from Wikipedia using a third-party LangChain tool.",
     tools=[adk_wikipedia_tool], # Uses the third-party Wikipedia tool
-    generate_content_config=types.GenerateContentConfig(temperature=0.2) # More factual, less creative
+    generate_content_config=types.GenerateContentConfig(temperature=0.2), # More factual, less creative
+    before_model_callback=response_cache.before_model,
+    after_model_callback=response_cache.after_model,
+    on_model_error_callback=response_cache.on_model_error
+)
+
+# --- Agent 4: Fact Lookup Race (Runs Agents 2 and 3 Concurrently) ---
+# Asks Google Search and Wikipedia at the same time and answers with whichever produces a sufficient
+# answer first; the other one is cancelled. A "could not find it" answer does not win the race.
+# Set a merge window to wait briefly for the second source and merge both answers (see racing.py).
+fact_lookup_race = RacingAgent(
+    name="FactLookupRace",
+    sub_agents=[fact_finder_agent, wikipedia_summarizer_agent],
+    merge_window_seconds=0.0, # Return the first sufficient answer immediately
+    source_labels={"FactFinderAgent": "Google Search", "WikipediaSummarizerAgent": "Wikipedia"},
+    description="Answers factual questions from Google Search and Wikipedia, whichever answers first.",
 )
 
-root_agent = fact_finder_agent
\ No newline at end of file
+root_agent = fact_lookup_race
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Latency benchmark for the fact lookup race, fully offline.
+
+Runs a workload of factual questions against the stand-in tools and model of
+`stubs.py`. Search answers in about 0.4 s (p95 1.2 s) and misses 5% of the time.
+Wikipedia answers in about 0.5 s with a long tail (p95 2.5 s) and misses 15% of the
+time. Each model turn takes a fixed simulated time. Compares:
+
+1. search      - FactFinderAgent alone
+2. wikipedia   - WikipediaSummarizerAgent alone
+3. race        - FactLookupRace: first sufficient answer wins, the other branch is cancelled
+4. race+merge  - the race with a merge window, merging both answers when they arrive close together
+
+Per variant it reports latency percentiles, the share of questions with a sufficient
+answer, the share of merged answers, and model and tool calls per question. The
+loser's cancelled calls are not counted.
+
+Run:
+    python -m agent_with_tools.benchmark --questions 300 --merge-window 0.3
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm
+
+from . import stubs
+from .racing import is_sufficient_answer
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    return ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))]
+
+
+async def run_variant(label: str, build, questions: List[str], concurrency: int, model_latency: float) -> None:
+    stubs.search_source.reset()
+    stubs.wikipedia_source.reset()
+    model = ScriptedLlm(responder=stubs.stub_responder, latency=lambda: model_latency)
+    lookup = build(model)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    sufficient = merged = 0
+
+    async def ask(question: str) -> None:
+        nonlocal sufficient, merged
+        async with semaphore:
+            start = time.perf_counter()
+            result = await run_agent(lookup, question, keep_session=False)
+            latencies.append((time.perf_counter() - start) * 1000)
+        sufficient += is_sufficient_answer(result.final_text)
+        merged += bool(result.state.get("race_result", {}).get("merged"))
+
+    await asyncio.gather(*(ask(question) for question in questions))
+    ordered = sorted(latencies)
+    count = len(questions)
+    print(
+        f"{label:<11} p50={_percentile(ordered, 50):6.0f}ms p90={_percentile(ordered, 90):6.0f}ms "
+        f"p99={_percentile(ordered, 99):6.0f}ms  answered={sufficient / count:6.1%} merged={merged / count:6.1%} "
+        f"model_calls={model.calls / count:4.2f} tool_calls={(stubs.search_source.calls + stubs.wikipedia_source.calls) / count:4.2f}"
+    )
+
+
+async def run_benchmark(count: int, merge_window: float, concurrency: int, model_latency: float) -> None:
+    facts = list(stubs.FACTS)
+    questions = [facts[i % len(facts)] for i in range(count)]
+    print(f"questions={count} concurrency={concurrency} model_turn={model_latency * 1000:.0f}ms merge_window={merge_window}s")
+    variants = (
+        ("search", lambda model: stubs.offline_agents(model)[0]),
+        ("wikipedia", lambda model: stubs.offline_agents(model)[1]),
+        ("race", lambda model: stubs.offline_race(model, 0.0)),
+        ("race+merge", lambda model: stubs.offline_race(model, merge_window)),
+    )
+    for label, build in variants:
+        await run_variant(label, build, questions, concurrency, model_latency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the fact lookup race against single sources, offline.")
+    parser.add_argument("--questions", type=int, default=300)
+    parser.add_argument("--merge-window", type=float, default=0.3, help="Merge window of the race+merge variant (s).")
+    parser.add_argument("--concurrency", type=int, default=50, help="Questions in flight at once.")
+    parser.add_argument("--model-latency", type=float, default=0.15, help="Simulated seconds per model turn.")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.questions, args.merge_window, args.concurrency, args.model_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Racing composite agent: asks several sources at once and keeps the first sufficient answer.
+
+`RacingAgent` runs its sub-agents concurrently, each in an isolated branch like
+`ParallelAgent`. Tool calls and results are forwarded as they happen, labelled with
+custom_metadata['race_branch'], but each branch's answer (its final text response) is
+held back until the race is decided:
+
+- The first sufficient answer wins (see `is_sufficient_answer`). The other branches
+  are cancelled, along with any model or tool call they have in flight.
+- With `merge_window_seconds`, the race waits that long after the first sufficient
+  answer for the others. Sufficient answers that arrive in the window are merged
+  into one response; branches still running after it are cancelled.
+- An insufficient answer ("I could not find ...") does not end the race. If no answer
+  is sufficient, the longest one is returned. If every branch failed, the first error is raised.
+- A branch cancelled between a forwarded tool call and its result gets a "cancelled"
+  function response for that call, so the session never holds an unanswered tool call.
+
+The outcome is recorded in state['race_result']: the winner, what was merged, the
+branches that were cancelled, gave insufficient answers or failed, and the time to the
+first sufficient answer. Streaming partials of the branches are not forwarded, since
+only one answer is kept.
+"""
+
+import asyncio
+import contextlib
+import re
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from common.branching import branch_context, branch_name
+
+MIN_ANSWER_CHARS = 20  # Shorter answers are treated as insufficient
+CANCELLED_TOOL_RESPONSE = {"error": "Cancelled: another source answered first."}
+
+_NO_ANSWER = re.compile(
+    r"\b(?:i (?:could not|couldn't|cannot|can't|was unable to|am unable to|don't know)"
+    r"|no (?:good |relevant )?(?:results?|information|matches?)(?: (?:was|were))? found"
+    r"|not (?:able to )?find)\b",
+    re.IGNORECASE,
+)
+
+
+def is_sufficient_answer(text: Optional[str], min_chars: int = MIN_ANSWER_CHARS) -> bool:
+    """Checks that an answer has some substance and is not a 'could not find it' reply."""
+    if not text or len(text.strip()) < min_chars:
+        return False
+    return not _NO_ANSWER.search(text)
+
+
+def _answer_text(event: Event) -> Optional[str]:
+    """The text of a branch's final response, or None for any other event."""
+    if not event.is_final_response() or not event.content or not event.content.parts:
+        return None
+    text = "".join(part.text or "" for part in event.content.parts if not part.thought)
+    return text or None
+
+
+class RacingAgent(BaseAgent):
+    """
+    Runs sub-agents concurrently and answers with the first sufficient answer (see the module docstring).
+
+    Attributes:
+        merge_window_seconds (float): How long to wait for further sufficient answers
+            to merge after the first one; 0 returns the first one immediately.
+        min_answer_chars (int): Answers shorter than this are insufficient.
+        output_key (Optional[str]): State key that receives the final answer text.
+        source_labels (Dict[str, str]): Per sub-agent name, how merged answers credit it
+            (default: the sub-agent's name).
+    """
+
+    merge_window_seconds: float = 0.0
+    min_answer_chars: int = MIN_ANSWER_CHARS
+    output_key: Optional[str] = None
+    source_labels: Dict[str, str] = {}
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        queue: asyncio.Queue = asyncio.Queue()
+        done_marker = object()
+
+        async def run_branch(sub_agent: BaseAgent) -> None:
+            branch_ctx = branch_context(self, sub_agent, ctx)
+            error: Optional[BaseException] = None
+            try:
+                # aclosing: a cancelled branch closes its generator in its own task, where its tracing context lives
+                async with contextlib.aclosing(sub_agent.run_async(branch_ctx)) as events:
+                    async for event in events:
+                        processed = asyncio.Event()
+                        await queue.put((sub_agent, event, processed))
+                        await processed.wait()  # Let the runner apply the event before generating the next one
+            except Exception as e:
+                error = e  # Reported through the queue; the race goes on without this branch
+            finally:
+                queue.put_nowait((sub_agent, done_marker, error))
+
+        start = time.monotonic()
+        tasks = {sub_agent.name: asyncio.ensure_future(run_branch(sub_agent)) for sub_agent in self.sub_agents}
+        racing = set(tasks)
+        answers: List[Tuple[str, Event, str]] = []  # (branch, final event, text) in arrival order
+        errors: Dict[str, BaseException] = {}
+        open_calls: Dict[str, Dict[str, str]] = {name: {} for name in tasks}  # Forwarded tool calls without a result yet
+        first_sufficient_at: Optional[float] = None
+        try:
+            while racing:
+                timeout = None
+                if first_sufficient_at is not None:
+                    timeout = first_sufficient_at + self.merge_window_seconds - time.monotonic()
+                    if timeout <= 0:
+                        break
+                try:
+                    sub_agent, event, payload = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break  # Merge window over
+
+                if event is done_marker:
+                    racing.discard(sub_agent.name)
+                    if payload is not None:
+                        errors[sub_agent.name] = payload
+                    continue
+                if sub_agent.name not in racing or event.partial:
+                    payload.set()
+                    continue
+                text = _answer_text(event)
+                if text is None:
+                    calls = open_calls[sub_agent.name]
+                    calls.update((call.id, call.name) for call in event.get_function_calls() if call.id)
+                    for response in event.get_function_responses():
+                        calls.pop(response.id, None)
+                    yield self._tag_branch(event, sub_agent)
+                    payload.set()
+                    continue
+
+                payload.set()
+                racing.discard(sub_agent.name)  # It has answered; only its end-of-run remains
+                answers.append((sub_agent.name, event, text))
+                if is_sufficient_answer(text, self.min_answer_chars) and first_sufficient_at is None:
+                    first_sufficient_at = time.monotonic()
+                    if self.merge_window_seconds <= 0:
+                        break
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        for sub_agent in self.sub_agents:
+            if open_calls.get(sub_agent.name):
+                yield self._cancelled_calls_event(ctx, sub_agent, open_calls[sub_agent.name])
+
+        sufficient = [answer for answer in answers if is_sufficient_answer(answer[2], self.min_answer_chars)]
+        chosen = sufficient or sorted(answers, key=lambda answer: len(answer[2]), reverse=True)[:1]
+        if not chosen:
+            if errors:
+                raise next(iter(errors.values()))
+            return
+
+        answered = {name for name, _, _ in answers}
+        result: Dict[str, Any] = {
+            "winner": chosen[0][0],
+            "merged": [name for name, _, _ in chosen[1:]],
+            "sufficient": bool(sufficient),
+            "insufficient": [name for name, _, text in answers if not is_sufficient_answer(text, self.min_answer_chars)],
+            "cancelled": [name for name in tasks if name not in answered and name not in errors],
+            "failed": sorted(errors),
+            "first_answer_ms": round((first_sufficient_at - start) * 1000, 1) if first_sufficient_at else None,
+        }
+        if len(chosen) == 1:
+            name, event, text = chosen[0]
+            final = self._tag_branch(event, next(agent for agent in self.sub_agents if agent.name == name))
+        else:
+            text = self._merge([(name, text) for name, _, text in chosen])
+            final = Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                actions=EventActions(),
+            )
+        final.actions.state_delta["race_result"] = result
+        if self.output_key:
+            final.actions.state_delta[self.output_key] = text
+        yield final
+
+    def _merge(self, answers: List[Tuple[str, str]]) -> str:
+        """Joins the sufficient answers: the first one as is, then the others under their source labels."""
+        (_, first), others = answers[0], answers[1:]
+        sections = [first.strip()]
+        for name, text in others:
+            sections.append(f"**Also from {self.source_labels.get(name, name)}:**\n{text.strip()}")
+        return "\n\n".join(sections)
+
+    def _cancelled_calls_event(self, ctx: InvocationContext, sub_agent: BaseAgent, calls: Dict[str, str]) -> Event:
+        """Answers a cancelled branch's open tool calls (id -> tool name), as its tool results would have."""
+        parts = [
+            types.Part(function_response=types.FunctionResponse(id=call_id, name=name, response=CANCELLED_TOOL_RESPONSE))
+            for call_id, name in calls.items()
+        ]
+        return self._tag_branch(
+            Event(
+                author=sub_agent.name,
+                invocation_id=ctx.invocation_id,
+                branch=branch_name(self, sub_agent, ctx),
+                content=types.Content(role="user", parts=parts),
+            ),
+            sub_agent,
+        )
+
+    @staticmethod
+    def _tag_branch(event: Event, sub_agent: BaseAgent) -> Event:
+        """Labels an event with the branch that produced it."""
+        event.custom_metadata = {**(event.custom_metadata or {}), "race_branch": sub_agent.name}
+        return event
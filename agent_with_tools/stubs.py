@@ -0,0 +1,141 @@
+"""
+Offline stand-ins for the fact lookup race's tools: Google Search and Wikipedia.
+
+Both answer from a small built-in fact table after a simulated, seeded latency, and
+miss (find nothing) at a configurable rate. Paired with a stand-in model
+(`stub_responder`), `offline_race` builds the FactLookupRace with no network access,
+for benchmarks and demos. Google Search is a built-in Gemini tool that cannot run
+locally, so its stand-in is an ordinary function tool with the same name.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LlmRequest
+
+from common.mock_backend import Distribution, lognormal
+from common.mock_llm import function_call_response, last_function_response, last_user_text
+
+from . import agent
+from .racing import RacingAgent
+
+# Question -> (search snippet, Wikipedia extract)
+FACTS: Dict[str, tuple] = {
+    "What is the tallest mountain in Europe?": (
+        "Mount Elbrus (5,642 m) in the Caucasus is the highest mountain in Europe.",
+        "Mount Elbrus is a dormant volcano in the Caucasus Mountains of Russia. At 5,642 m it is the highest peak in Europe.",
+    ),
+    "When was the Eiffel Tower built?": (
+        "The Eiffel Tower was built from 1887 to 1889 for the 1889 World's Fair in Paris.",
+        "The Eiffel Tower is a wrought-iron lattice tower in Paris, constructed from 1887 to 1889 as the centerpiece of the 1889 World's Fair.",
+    ),
+    "Who discovered penicillin?": (
+        "Alexander Fleming discovered penicillin in 1928 at St Mary's Hospital, London.",
+        "Penicillin was discovered in 1928 by the Scottish physician Alexander Fleming, who noticed mould inhibiting bacterial growth.",
+    ),
+    "What is the speed of light?": (
+        "The speed of light in vacuum is exactly 299,792,458 metres per second.",
+        "The speed of light in vacuum, commonly denoted c, is exactly 299,792,458 metres per second.",
+    ),
+    "How long is the Great Wall of China?": (
+        "All sections of the Great Wall of China together measure about 21,196 km.",
+        "The Great Wall of China is a series of fortifications; a 2012 survey measured all its branches at 21,196 km.",
+    ),
+    "What is the largest ocean on Earth?": (
+        "The Pacific Ocean is the largest ocean, covering about 165 million square kilometres.",
+        "The Pacific Ocean is the largest and deepest of Earth's five oceanic divisions, covering about 165.2 million km2.",
+    ),
+}
+
+
+@dataclass
+class StubSource:
+    """Timing and miss rate of a stand-in source, with a call counter."""
+
+    latency: Distribution
+    miss_rate: float
+    seed: int = 0
+    calls: int = 0
+    rng: random.Random = field(default_factory=random.Random)
+
+    def __post_init__(self):
+        self.rng.seed(self.seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        self.calls = 0
+        self.rng.seed(self.seed if seed is None else seed)
+
+    async def lookup(self, query: str, index: int) -> Optional[str]:
+        """Waits for the simulated latency, then returns the fact for `query` or None on a miss."""
+        self.calls += 1
+        delay, missed = self.latency(self.rng), self.rng.random() < self.miss_rate
+        await asyncio.sleep(delay)
+        fact = FACTS.get(query.strip())
+        return None if missed or fact is None else fact[index]
+
+
+# Search answers faster and misses less often than Wikipedia, which has a longer tail.
+search_source = StubSource(latency=lognormal(median=0.4, p95=1.2), miss_rate=0.05, seed=1)
+wikipedia_source = StubSource(latency=lognormal(median=0.5, p95=2.5), miss_rate=0.15, seed=2)
+
+
+async def google_search(query: str) -> Dict[str, Any]:
+    """
+    Searches the web for a query (offline stand-in).
+
+    Args:
+        query (str): The search query.
+
+    Returns:
+        Dict[str, Any]: 'results', a list of snippets (empty when nothing was found).
+    """
+    snippet = await search_source.lookup(query, 0)
+    return {"results": [snippet] if snippet else []}
+
+
+async def wikipedia(query: str) -> str:
+    """
+    Looks up a topic on Wikipedia (offline stand-in).
+
+    Args:
+        query (str): The topic or question.
+
+    Returns:
+        str: The page extract, or a 'No good Wikipedia Search Result was found' message.
+    """
+    extract = await wikipedia_source.lookup(query, 1)
+    return extract or "No good Wikipedia Search Result was found"
+
+
+def stub_responder(llm_request: LlmRequest):
+    """Plays both lookup agents: calls its tool with the question, then answers from the result."""
+    response = last_function_response(llm_request)
+    if response is None:
+        tool = "google_search" if "google_search" in llm_request.tools_dict else "wikipedia"
+        return function_call_response(tool, {"query": last_user_text(llm_request)})
+    result = response.response
+    found = (result.get("results") or []) if response.name == "google_search" else [result.get("result", "")]
+    found = [text for text in found if text and not text.startswith("No good Wikipedia")]
+    if not found:
+        return "I could not find information about that."
+    return found[0]
+
+
+def offline_agents(model: BaseLlm) -> Tuple[LlmAgent, LlmAgent]:
+    """Copies of the fact finder and Wikipedia summarizer on `model`, with the stand-in tools and no response cache."""
+    update = {"model": model, "before_model_callback": None, "after_model_callback": None, "on_model_error_callback": None}
+    fact_finder = agent.fact_finder_agent.clone(update={**update, "tools": [google_search]})
+    summarizer = agent.wikipedia_summarizer_agent.clone(update={**update, "tools": [wikipedia]})
+    return fact_finder, summarizer
+
+
+def offline_race(model: BaseLlm, merge_window_seconds: Optional[float] = None) -> RacingAgent:
+    """A copy of the FactLookupRace on `model` with the stand-in tools; optionally with another merge window."""
+    update: Dict[str, Any] = {"sub_agents": list(offline_agents(model))}
+    if merge_window_seconds is not None:
+        update["merge_window_seconds"] = merge_window_seconds
+    return agent.fact_lookup_race.clone(update=update)
+
@@ -0,0 +1,140 @@
+"""
+Persistent cache and offline mode for the LangChain Wikipedia tool.
+
+`CachedWikipediaQueryRun` is a drop-in `WikipediaQueryRun` that answers repeated
+queries from a local SQLite store (see `common/persistent_cache.py`) keyed on the
+normalized query. Settings come from environment variables:
+
+    WIKIPEDIA_CACHE_PATH         SQLite file (default: ~/.cache/adk-course-agents/wikipedia.sqlite3)
+    WIKIPEDIA_CACHE_TTL_SECONDS  Entry lifetime (default: 7 days)
+    WIKIPEDIA_OFFLINE            Set to 1 to answer only from the cache, never the network
+
+Warm the cache from a file with one topic per line:
+    python -m agent_with_tools.wikipedia_cache warm topics.txt
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_community.tools import WikipediaQueryRun
+
+from common.persistent_cache import PersistentCache
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "adk-course-agents", "wikipedia.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 5_000
+CACHE_MAX_BYTES = 20 * 1024 * 1024
+WARM_UP_WORKERS = 4
+
+
+def normalize_query(query: str) -> str:
+    """Case-folds a query and collapses whitespace so trivially different queries share an entry."""
+    return " ".join(query.casefold().split())
+
+
+def is_offline() -> bool:
+    """True when WIKIPEDIA_OFFLINE is set to a truthy value."""
+    return os.environ.get("WIKIPEDIA_OFFLINE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def open_default_cache() -> PersistentCache:
+    """Opens the Wikipedia cache configured through the environment."""
+    return PersistentCache(
+        os.environ.get("WIKIPEDIA_CACHE_PATH", DEFAULT_CACHE_PATH),
+        max_entries=CACHE_MAX_ENTRIES,
+        max_bytes=CACHE_MAX_BYTES,
+        default_ttl=float(os.environ.get("WIKIPEDIA_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+    )
+
+
+class CachedWikipediaQueryRun(WikipediaQueryRun):
+    """
+    WikipediaQueryRun that serves repeated queries from a persistent cache.
+
+    In offline mode only cached answers are returned (expired ones included);
+    a query that was never cached gets an explanatory message instead of a
+    network call.
+    """
+
+    cache: PersistentCache
+    offline: Optional[bool] = None  # None: follow the WIKIPEDIA_OFFLINE environment variable
+
+    def _cache_key(self, query: str) -> str:
+        # The wrapper settings are part of the key, since they change what an answer looks like.
+        return f"{self.api_wrapper.top_k_results}:{self.api_wrapper.doc_content_chars_max}:{normalize_query(query)}"
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        """Use the Wikipedia tool, answering from the cache when possible."""
+        key = self._cache_key(query)
+        offline = is_offline() if self.offline is None else self.offline
+        cached = self.cache.get(key, allow_expired=offline)
+        if cached is not None:
+            return cached
+        if offline:
+            return f"No cached Wikipedia result for '{query}' (offline mode is on)."
+        result = self.api_wrapper.run(query)
+        self.cache.set(key, result)
+        return result
+
+    def warm(self, topics: Iterable[str], max_workers: int = WARM_UP_WORKERS) -> Dict[str, int]:
+        """
+        Pre-fetches topics into the cache, skipping those already cached and fresh.
+
+        Args:
+            topics (Iterable[str]): Queries to cache.
+            max_workers (int): Lookups run concurrently on this many threads.
+
+        Returns:
+            Dict[str, int]: Counts of topics that were 'already_cached', 'fetched' or 'failed'.
+        """
+        pending = []
+        counts = {"already_cached": 0, "fetched": 0, "failed": 0}
+        for topic in dict.fromkeys(topic.strip() for topic in topics):
+            if not topic:
+                continue
+            if self.cache.get(self._cache_key(topic)) is not None:
+                counts["already_cached"] += 1
+            else:
+                pending.append(topic)
+
+        def fetch(topic: str) -> bool:
+            try:
+                self.cache.set(self._cache_key(topic), self.api_wrapper.run(topic))
+                return True
+            except Exception:
+                return False
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for fetched in executor.map(fetch, pending):
+                counts["fetched" if fetched else "failed"] += 1
+        return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the persistent Wikipedia tool cache.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    warm_parser = subcommands.add_parser("warm", help="Pre-fetch topics listed one per line in a file.")
+    warm_parser.add_argument("topics_file")
+    subcommands.add_parser("stats", help="Show cache size and bounds.")
+    subcommands.add_parser("purge", help="Remove expired entries.")
+    args = parser.parse_args()
+
+    if args.command == "warm":
+        from .agent import get_wikipedia_tool  # Warm with the exact wrapper settings the agent uses
+
+        wikipedia_tool = get_wikipedia_tool()
+        with open(args.topics_file, encoding="utf-8") as topics_file:
+            print(wikipedia_tool.warm(topics_file))
+        cache = wikipedia_tool.cache
+    else:
+        cache = open_default_cache()
+    if args.command == "purge":
+        print(f"Removed {cache.purge_expired()} expired entries.")
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
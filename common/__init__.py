@@ -0,0 +1,5 @@
+"""
+Shared helpers used by the agent packages (mock models, benchmarking utilities).
+
+This package does not define a `root_agent` and is not meant to be run as an agent.
+"""
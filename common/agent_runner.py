@@ -0,0 +1,95 @@
+"""
+Helpers for driving an agent programmatically (scripts, benchmarks, batch jobs).
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from google.adk.agents import BaseAgent
+from google.adk.apps import App
+from google.adk.events import Event
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from common.prompt_cache import context_cache_config
+from common.tracing import tracing_plugins
+
+
+@dataclass
+class RunResult:
+    """Outcome of a single agent run."""
+
+    events: List[Event] = field(default_factory=list)
+    final_text: str = ""
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+def new_runner(agent: BaseAgent, plugins: Sequence[BasePlugin] = ()) -> InMemoryRunner:
+    """
+    An in-memory runner for `agent` with `plugins`, plus the tracing plugin when tracing is
+    enabled and explicit context caching when LLM_CONTEXT_CACHE is on (see common/prompt_cache.py).
+    """
+    plugins = tracing_plugins() + list(plugins)
+    cache_config = context_cache_config()
+    if plugins or cache_config:
+        return InMemoryRunner(
+            app=App(name=agent.name, root_agent=agent, plugins=plugins, context_cache_config=cache_config)
+        )
+    return InMemoryRunner(agent=agent, app_name=agent.name)
+
+
+async def run_agent(
+    agent: BaseAgent,
+    user_message: str,
+    initial_state: Optional[Dict[str, Any]] = None,
+    runner: Optional[InMemoryRunner] = None,
+    user_id: str = "user",
+    keep_session: bool = True,
+) -> RunResult:
+    """
+    Runs `agent` for one user message in a fresh in-memory session.
+
+    Args:
+        agent (BaseAgent): The agent to run (usually a package's `root_agent`).
+        user_message (str): The user's message.
+        initial_state (Optional[Dict[str, Any]]): Session state to start from.
+        runner (Optional[InMemoryRunner]): Reuse an existing runner for `agent`; a new
+                                           one is created when omitted, with tracing
+                                           installed if it is enabled (see common/tracing.py).
+        user_id (str): The user ID the session belongs to.
+        keep_session (bool): When False, the session is deleted after the run, even one
+                             that failed, so a long-lived runner does not accumulate
+                             finished sessions.
+
+    Returns:
+        RunResult: All events produced, the text of the last final response,
+                   and the session state after the run.
+    """
+    runner = runner or new_runner(agent)
+    session_id = uuid.uuid4().hex
+    await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id, session_id=session_id, state=initial_state or {}
+    )
+    message = types.Content(role="user", parts=[types.Part(text=user_message)])
+
+    result = RunResult()
+    try:
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+            result.events.append(event)
+            if event.is_final_response() and event.content and event.content.parts:
+                text = "".join(part.text or "" for part in event.content.parts)
+                if text:
+                    result.final_text = text
+
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=user_id, session_id=session_id
+        )
+        result.state = dict(session.state) if session else {}
+    finally:
+        if not keep_session:  # Also when the run failed or was cancelled
+            await runner.session_service.delete_session(
+                app_name=runner.app_name, user_id=user_id, session_id=session_id
+            )
+    return result
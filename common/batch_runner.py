@@ -0,0 +1,287 @@
+"""
+Concurrent batch runner: drives a package's root_agent over a JSONL file of inputs.
+
+Each input line is a JSON object with a 'message', an optional 'id' (default: its line
+number) and an optional initial session 'state'. A bare JSON string is also accepted
+as the message:
+
+    {"id": "beekeeping", "message": "urban beekeeping"}
+    "remote work burnout"
+
+Every item runs in its own session, with at most `--concurrency` sessions in flight.
+Input is read lazily through a bounded queue, so a large file is never held in memory
+and reading pauses while the workers are busy. Failed attempts (errors and timeouts)
+are retried with exponential backoff.
+
+Results are appended to the output JSONL as each item finishes, one line per item:
+its id, status ('ok' or 'error'), final text, the selected state keys, latency and
+attempts. The output file is also the checkpoint. On restart, items already recorded
+as 'ok' are skipped and failed ones run again; the last line for an id wins.
+
+At the end, and every `--progress-every` items on stderr, it reports throughput, error
+rate and latency percentiles. The model comes from GEMINI_MODEL (or --model), so the
+same workload runs against Gemini or against the offline backend:
+
+    python -m common.batch_runner sequential_agent topics.jsonl --output outlines.jsonl \\
+        --concurrency 16 --state-keys final_content_outline
+    python -m common.batch_runner loop_agent dishes.jsonl --output recipes.jsonl \\
+        --model mock/gemini-2.0-flash --latency flash --concurrency 32 --state-keys current_recipe
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from google.adk.agents import BaseAgent
+
+from common.agent_runner import new_runner, run_agent
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 1.0  # Doubled on every further attempt
+
+
+@dataclass
+class BatchItem:
+    """One input of a batch: the user message and the session state to start from."""
+
+    id: str
+    message: str
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+def read_items(path: str) -> Iterator[BatchItem]:
+    """
+    Lazily parses the input JSONL file. Blank lines are skipped.
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no message.
+    """
+    with open(path, encoding="utf-8") as input_file:
+        for line_number, line in enumerate(input_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from e
+            if isinstance(record, str):
+                record = {"message": record}
+            if not isinstance(record, dict) or not isinstance(record.get("message"), str):
+                raise ValueError(f"{path}:{line_number}: expected a string or an object with a 'message'")
+            yield BatchItem(
+                id=str(record.get("id", line_number)),
+                message=record["message"],
+                state=record.get("state") or {},
+            )
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Ids whose latest record in an earlier output file is 'ok'. A line cut short by a crash is ignored."""
+    status: Dict[str, str] = {}
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, encoding="utf-8") as output_file:
+        for line in output_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and "id" in record:
+                status[str(record["id"])] = record.get("status")
+    return {item_id for item_id, item_status in status.items() if item_status == "ok"}
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    return ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))] if ordered else 0.0
+
+
+@dataclass
+class BatchStats:
+    """Counters and latencies of the items run so far."""
+
+    ok: int = 0
+    failed: int = 0
+    skipped: int = 0  # Already completed in an earlier run
+    retries: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def finished(self) -> int:
+        return self.ok + self.failed
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        ordered = sorted(self.latencies_ms)
+        return {
+            "finished": self.finished,
+            "ok": self.ok,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "retries": self.retries,
+            "error_rate": self.failed / self.finished if self.finished else 0.0,
+            "elapsed_s": elapsed,
+            "throughput_per_s": self.finished / elapsed if elapsed else 0.0,
+            "latency_p50_ms": _percentile(ordered, 50),
+            "latency_p90_ms": _percentile(ordered, 90),
+            "latency_p99_ms": _percentile(ordered, 99),
+        }
+
+
+def _format_summary(summary: Dict[str, Any]) -> str:
+    return (
+        f"finished={summary['finished']} ok={summary['ok']} failed={summary['failed']} "
+        f"skipped={summary['skipped']} retries={summary['retries']} error_rate={summary['error_rate']:.1%} "
+        f"throughput={summary['throughput_per_s']:.2f}/s latency p50={summary['latency_p50_ms']:.0f}ms "
+        f"p90={summary['latency_p90_ms']:.0f}ms p99={summary['latency_p99_ms']:.0f}ms"
+    )
+
+
+async def run_batch(
+    agent: BaseAgent,
+    items: Iterable[BatchItem],
+    output_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    timeout: Optional[float] = None,
+    state_keys: Sequence[str] = (),
+    resume: bool = True,
+    progress_every: int = 0,
+) -> Dict[str, Any]:
+    """
+    Runs every item through `agent` with bounded concurrency and appends one result line per item.
+
+    Args:
+        agent (BaseAgent): The agent to run (usually a package's `root_agent`).
+        items (Iterable[BatchItem]): The inputs; consumed lazily.
+        output_path (str): The results JSONL file, which also serves as the checkpoint.
+        concurrency (int): Sessions in flight at once.
+        retries (int): Further attempts after a failed one.
+        timeout (Optional[float]): Seconds allowed per attempt; None for no limit.
+        state_keys (Sequence[str]): Session state keys to copy into each result.
+        resume (bool): Skip items already recorded as 'ok' in `output_path`; when False
+                       the file is overwritten.
+        progress_every (int): Print a progress line to stderr every this many items (0: never).
+
+    Returns:
+        Dict[str, Any]: The run's summary (see `BatchStats.summary`).
+    """
+    done = completed_ids(output_path) if resume else set()
+    runner = new_runner(agent)
+    stats = BatchStats()
+    # Bounded, so reading the input waits for the workers instead of running ahead of them.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def run_item(item: BatchItem, output_file) -> None:
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            attempt += 1
+            try:
+                result = await asyncio.wait_for(
+                    run_agent(agent, item.message, item.state, runner=runner, keep_session=False), timeout
+                )
+                record = {
+                    "id": item.id,
+                    "status": "ok",
+                    "output": result.final_text,
+                    "state": {key: result.state[key] for key in state_keys if key in result.state},
+                }
+                stats.ok += 1
+                break
+            except Exception as e:
+                error = "timed out" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+                if attempt > retries:
+                    record = {"id": item.id, "status": "error", "error": error}
+                    stats.failed += 1
+                    break
+                stats.retries += 1
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        latency_ms = (time.perf_counter() - start) * 1000
+        stats.latencies_ms.append(latency_ms)
+        record.update(latency_ms=round(latency_ms, 1), attempts=attempt)
+        # One write per line from the event loop thread, flushed so a crash loses at most the items in flight.
+        output_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        output_file.flush()
+        if progress_every and stats.finished % progress_every == 0:
+            print(_format_summary(stats.summary()), file=sys.stderr)
+
+    async def worker(output_file) -> None:
+        while (item := await queue.get()) is not None:
+            await run_item(item, output_file)
+
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as output_file:
+        workers = [asyncio.create_task(worker(output_file)) for _ in range(concurrency)]
+        try:
+            for item in items:
+                if item.id in done:
+                    stats.skipped += 1
+                    continue
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+    return stats.summary()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a package's root_agent over a JSONL file of inputs.")
+    parser.add_argument("package", help="Agent package whose root_agent runs each item, e.g. sequential_agent.")
+    parser.add_argument("input", help="Input JSONL: objects with 'message' and optional 'id' and 'state', or strings.")
+    parser.add_argument("--output", required=True, help="Results JSONL; also the checkpoint that a rerun resumes from.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Sessions in flight at once.")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Further attempts after a failure.")
+    parser.add_argument("--timeout", type=float, help="Seconds allowed per attempt.")
+    parser.add_argument("--state-keys", nargs="*", default=[], help="Session state keys to include in each result.")
+    parser.add_argument("--restart", action="store_true", help="Overwrite the output instead of resuming from it.")
+    parser.add_argument("--model", help="Overrides GEMINI_MODEL, e.g. mock/gemini-2.0-flash for the offline backend.")
+    parser.add_argument("--latency", help="Mock latency profile (instant, flash, pro or tail).")
+    parser.add_argument("--progress-every", type=int, default=100, help="Progress line every N items (0: off).")
+    parser.add_argument("--stats", help="Write the summary to this JSON file.")
+    args = parser.parse_args(argv)
+
+    # Must be set before the agent module is imported: it reads them at import time.
+    if args.model:
+        os.environ["GEMINI_MODEL"] = args.model
+    if args.latency:
+        os.environ["MOCK_LLM_LATENCY"] = args.latency
+    if os.environ.get("GEMINI_MODEL", "").startswith("mock/"):
+        from common import mock_backend
+        from common.e2e_benchmark import SCRIPTS
+
+        for agent_name, script in SCRIPTS.items():  # Tool calls (e.g. exit_loop) the way Gemini would make them
+            mock_backend.register_script(agent_name, script)
+
+    root_agent = importlib.import_module(f"{args.package}.agent").root_agent
+    summary = asyncio.run(
+        run_batch(
+            root_agent,
+            read_items(args.input),
+            args.output,
+            concurrency=args.concurrency,
+            retries=args.retries,
+            timeout=args.timeout,
+            state_keys=args.state_keys,
+            resume=not args.restart,
+            progress_every=args.progress_every,
+        )
+    )
+    print(_format_summary(summary))
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as stats_file:
+            json.dump(summary, stats_file, indent=2)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
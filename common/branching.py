@@ -0,0 +1,24 @@
+"""
+Branch contexts for composite agents that run their sub-agents concurrently.
+
+ADK's ParallelAgent gives every sub-agent its own branch, so branches do not see each
+other's conversation history. Its helper for that is private, so the composite agents
+here (parallel_agent/scheduling.py, agent_with_tools/racing.py) build the same context
+from the public `InvocationContext.model_copy()` and the same branch naming.
+"""
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+
+
+def branch_name(agent: BaseAgent, sub_agent: BaseAgent, ctx: InvocationContext) -> str:
+    """The branch `sub_agent` runs in under `agent`: '<parent branch>.<agent>.<sub_agent>'."""
+    suffix = f"{agent.name}.{sub_agent.name}"
+    return f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+
+
+def branch_context(agent: BaseAgent, sub_agent: BaseAgent, ctx: InvocationContext) -> InvocationContext:
+    """A shallow copy of `ctx` for running `sub_agent` in its own branch, as ParallelAgent does."""
+    branch_ctx = ctx.model_copy()
+    branch_ctx.branch = branch_name(agent, sub_agent, ctx)
+    return branch_ctx
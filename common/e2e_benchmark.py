@@ -0,0 +1,284 @@
+"""
+End-to-end benchmark of every package's root_agent on the offline model backend.
+
+Each package's `root_agent` runs a fixed workload of user messages in fresh in-memory
+sessions. The model is GEMINI_MODEL=mock/gemini-2.0-flash (see `common/mock_backend.py`).
+Scripts make the tool-using agents call their tools the way Gemini would, including
+exit_loop in the recipe loop. The function_tools package is pointed at its local
+stand-in user server, so nothing leaves the machine. Per package it reports:
+
+- latency_ms:  wall time per run, from user message to last event (p50/p90/p99)
+- model calls, prompt and completion tokens per run, as served by the backend, and the
+  prompt tokens served from its prefix cache
+- tool calls per run (function calls in the run's events) and failed runs
+
+Results can be written to JSON and compared against an earlier run to catch regressions:
+
+    python -m common.e2e_benchmark --runs 20 --latency flash --output e2e.json
+    python -m common.e2e_benchmark --runs 20 --latency flash --baseline e2e.json --max-regression 0.25
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from common import mock_backend
+from common.agent_runner import new_runner, run_agent
+from common.mock_llm import function_call_response, last_function_response, last_user_text, request_prompt_text
+from common.startup_benchmark import AGENT_PACKAGES
+
+DEFAULT_MODEL = "mock/gemini-2.0-flash"
+
+WORKLOADS: Dict[str, List[str]] = {
+    "agent_with_tools": [
+        "What is the tallest mountain in Europe?",
+        "When was the Eiffel Tower built?",
+        "Who discovered penicillin?",
+    ],
+    "function_tools": [
+        "Show me the profile for user 3",
+        "Show me users 1, 2 and 5 in a table",
+        "Show me the profile for user 7",
+    ],
+    "loop_agent": ["pasta carbonara", "vegetable curry", "banana bread"],
+    "parallel_agent": ["urban beekeeping", "remote work burnout", "electric bikes"],
+    "sequential_agent": ["urban beekeeping", "remote work burnout", "electric bikes"],
+    "travel_advisor": [
+        "How far is it from Paris to Rome?",
+        "Suggest Italian restaurants in London",
+        "Which cities are near Berlin?",
+    ],
+    "youtube_helper": [
+        "Give me video ideas for my cooking tutorials channel",
+        "How can I grow my gaming channel?",
+        "Give me video ideas for my tech reviews channel",
+    ],
+}
+
+METRICS = ("latency_p50_ms", "prompt_tokens_per_run", "model_calls_per_run")
+
+
+# --- Scripts: what Gemini would do with each tool-using agent's instruction ---
+
+def _profile_viewer(llm_request):
+    response = last_function_response(llm_request)
+    if response is None:
+        ids = [int(n) for n in re.findall(r"\d+", last_user_text(llm_request))] or [1]
+        if len(ids) > 1:
+            return function_call_response("fetch_users", {"user_ids": ids})
+        return function_call_response("get_formatted_profile", {"user_id": ids[0]})
+    if response.name == "fetch_users":
+        return function_call_response("format_user_profiles", {"users": response.response["users"], "mode": "table"})
+    return response.response.get("result")
+
+
+def _travel_advisor(llm_request):
+    if last_function_response(llm_request) is not None:
+        return None
+    text = last_user_text(llm_request)
+    if match := re.search(r"from (\w+) to (\w+)", text):
+        return function_call_response("get_distance", {"from_city": match[1], "to_city": match[2]})
+    if match := re.search(r"(\w+) restaurants in (\w+)", text):
+        return function_call_response("get_restaurants", {"city": match[2], "cuisine": match[1]})
+    if match := re.search(r"near (\w+)", text):
+        return function_call_response("get_nearby_cities", {"city": match[1]})
+    return None
+
+
+def _youtube_assistant(llm_request):
+    if last_function_response(llm_request) is not None:
+        return None
+    text = last_user_text(llm_request)
+    if match := re.search(r"ideas for my (.+) channel", text):
+        return function_call_response("generate_niche_video_ideas", {"channel_niche": match[1]})
+    if match := re.search(r"grow my (.+) channel", text):
+        return function_call_response("get_channel_optimization_tips", {"channel_type": match[1]})
+    return None
+
+
+_REVISION = re.compile(r"Revision (\d+)")
+APPROVE_AFTER_REVISIONS = 2
+
+
+def _recipe_critic(llm_request):
+    revisions = [int(n) for n in _REVISION.findall(request_prompt_text(llm_request))]
+    if revisions and max(revisions) >= APPROVE_AFTER_REVISIONS:
+        return "Recipe looks great!"
+    return "Add more vegetables and specify the cooking temperature."
+
+
+def _recipe_refiner(llm_request):
+    prompt = request_prompt_text(llm_request)
+    if last_function_response(llm_request) is not None:
+        return None  # After exit_loop
+    if "**Critique/Suggestions:**\nRecipe looks great!" in prompt:
+        return function_call_response("exit_loop")
+    revisions = [int(n) for n in _REVISION.findall(prompt)]
+    return f"Revision {max(revisions, default=0) + 1}\n{mock_backend.default_reply(llm_request)}"
+
+
+SCRIPTS = {
+    "UserProfileViewer": _profile_viewer,
+    "travel_advisor": _travel_advisor,
+    "youtube_creator_assistant": _youtube_assistant,
+    "RecipeCriticAgent": _recipe_critic,
+    "RecipeRefinerAgent": _recipe_refiner,
+}
+
+
+# --- Measurement ---
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(percentile / 100 * len(ordered)))]
+
+
+async def measure_package(
+    package: str, runs: int, warmup: bool = True, plugins: Sequence[BasePlugin] = ()
+) -> Dict[str, Any]:
+    """
+    Runs a package's workload `runs` times in total and summarizes latency, model usage and tool calls.
+
+    With `warmup`, each workload message is first run once unmeasured, so tools and data
+    that load on first use do not count against the first runs' latency. `plugins` are
+    installed on the measured runs only.
+    """
+    root_agent = importlib.import_module(f"{package}.agent").root_agent
+    messages = WORKLOADS[package]
+    if warmup:
+        for message in messages:
+            await run_agent(root_agent, message)
+    runner = new_runner(root_agent, plugins) if plugins else None
+    latencies: List[float] = []
+    tool_calls = 0
+    errors: List[str] = []
+    mock_backend.usage.reset()
+    mock_backend.prefix_cache.clear()  # Warm-up prompts are not served from cache to the measured runs
+    for i in range(runs):
+        start = time.perf_counter()
+        try:
+            result = await run_agent(root_agent, messages[i % len(messages)], runner=runner)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        tool_calls += sum(len(event.get_function_calls()) for event in result.events)
+
+    if not latencies:
+        return {"error": errors[0] if errors else "no runs"}
+    usage = mock_backend.usage.totals()
+    completed = len(latencies)
+    return {
+        "runs": completed,
+        "failed_runs": len(errors),
+        "latency_p50_ms": _percentile(latencies, 50),
+        "latency_p90_ms": _percentile(latencies, 90),
+        "latency_p99_ms": _percentile(latencies, 99),
+        "model_calls_per_run": usage.calls / completed,
+        "prompt_tokens_per_run": usage.prompt_tokens / completed,
+        "completion_tokens_per_run": usage.completion_tokens / completed,
+        "cached_prompt_tokens_per_run": usage.cached_prompt_tokens / completed,
+        "tool_calls_per_run": tool_calls / completed,
+        "model_calls_by_agent": {name: agent.calls for name, agent in sorted(mock_backend.usage.by_agent.items())},
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], max_regression: float) -> List[str]:
+    """Returns a description of every package whose latency, tokens or model calls regressed beyond the allowed fraction."""
+    regressions = []
+    for package, current in results.items():
+        previous = baseline.get(package)
+        if not previous or "error" in current or "error" in previous:
+            continue
+        for metric in METRICS:
+            if previous[metric] and current[metric] > previous[metric] * (1 + max_regression):
+                regressions.append(
+                    f"{package}: {metric} {previous[metric]:.1f} -> {current[metric]:.1f} "
+                    f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+async def run_suite(packages: List[str], runs: int, warmup: bool = True) -> Dict[str, Dict[str, Any]]:
+    from function_tools.http_client import close_client
+    from function_tools.mock_server import start_server
+
+    server, base_url = start_server()
+    os.environ["JSONPLACEHOLDER_BASE_URL"] = base_url
+    for agent_name, script in SCRIPTS.items():
+        mock_backend.register_script(agent_name, script)
+    results = {}
+    try:
+        for package in packages:
+            results[package] = result = await measure_package(package, runs, warmup)
+            if "error" in result:
+                print(f"{package:<18} ERROR {result['error']}")
+                continue
+            print(
+                f"{package:<18} latency p50={result['latency_p50_ms']:8.1f}ms p90={result['latency_p90_ms']:8.1f}ms "
+                f"p99={result['latency_p99_ms']:8.1f}ms  model_calls={result['model_calls_per_run']:5.1f} "
+                f"prompt_tokens={result['prompt_tokens_per_run']:8.1f} cached={result['cached_prompt_tokens_per_run']:8.1f} completion_tokens={result['completion_tokens_per_run']:7.1f} "
+                f"tool_calls={result['tool_calls_per_run']:4.1f} failed={result['failed_runs']}"
+            )
+    finally:
+        await close_client()
+        server.shutdown()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run every package's root_agent end to end on the offline model.")
+    parser.add_argument("--packages", nargs="+", default=list(AGENT_PACKAGES), choices=list(AGENT_PACKAGES))
+    parser.add_argument("--runs", type=int, default=10, help="Runs per package, cycling through its workload.")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="A 'mock/...' model name, or a real model for a live run.")
+    parser.add_argument("--latency", default="instant", help="Mock latency profile: instant, flash, pro or tail.")
+    parser.add_argument("--no-warmup", action="store_true", help="Measure from the very first run.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mock latency generator.")
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against results from an earlier run.")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed fractional growth.")
+    args = parser.parse_args(argv)
+
+    # Must be set before the agent modules are imported: they read them at import time.
+    os.environ["GEMINI_MODEL"] = args.model
+    os.environ["MOCK_LLM_LATENCY"] = args.latency
+    os.environ["MOCK_LLM_SEED"] = str(args.seed)
+    mock_backend.seed(args.seed)  # The backend is already imported, so the variable alone comes too late
+    # Cached stages and responses would hide the agents' model calls after the warm-up runs.
+    os.environ.setdefault("CONTENT_STAGE_CACHE", "off")
+    os.environ.setdefault("LLM_RESPONSE_CACHE", "off")
+
+    results = asyncio.run(run_suite(args.packages, args.runs, not args.no_warmup))
+
+    if args.output:
+        settings = {
+            "model": args.model,
+            "latency": args.latency,
+            "seed": args.seed,
+            "runs": args.runs,
+            "warmup": not args.no_warmup,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"settings": settings, "packages": results}, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file)["packages"], args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Event-history compaction for multi-step pipelines whose agents read their inputs from state.
+
+Every turn of an LlmAgent sees the whole session history by default. In the recipe loop,
+for example, each iteration adds another critique and another recipe draft, although
+the critic and refiner read the latest `current_recipe` and `critique_feedback` through
+their instruction templates anyway. The superseded drafts only make each prompt longer.
+
+`HistoryCompactor` is a deterministic step (no model call) placed in a pipeline. It
+replaces the superseded events of the current run with a one-line note, using ADK's
+compaction events. Prompts are then built from the user's message, the note and the
+events that still matter. Which events are superseded is set by `output_keys`:
+
+- keep_latest=True:  the latest event writing each key stays, older writes are
+  compacted. Use it between loop iterations.
+- keep_latest=False: every event writing a key is compacted, because later stages read
+  the values from state. Use it between the stages of a chain.
+
+Only a contiguous run of events from the start of the run is compacted, since a
+compaction covers a time range. Later compactions extend earlier ones. The session
+keeps every event: the compaction is itself an event, and ADK skips the compacted
+range (and any earlier compaction the new one subsumes) whenever it builds a prompt.
+
+HISTORY_COMPACTION=off turns every compactor into a no-op, e.g. to measure the difference.
+"""
+
+import os
+from typing import AsyncGenerator, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.events.event_actions import EventCompaction
+from google.genai import types
+
+
+def compaction_enabled() -> bool:
+    return os.environ.get("HISTORY_COMPACTION", "on").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _writes(event: Event, keys: List[str]) -> bool:
+    return bool(event.actions and event.actions.state_delta) and any(key in event.actions.state_delta for key in keys)
+
+
+def _is_compaction(event: Event) -> bool:
+    return bool(event.actions and event.actions.compaction)
+
+
+def compact_history(
+    ctx: InvocationContext,
+    author: str,
+    output_keys: List[str],
+    keep_latest: bool = True,
+) -> Optional[Event]:
+    """
+    Builds the compaction event for the current run's superseded events (see the module docstring).
+
+    Args:
+        ctx (InvocationContext): The running invocation.
+        author (str): Author of the compaction event.
+        output_keys (List[str]): State keys the pipeline's agents read from state.
+        keep_latest (bool): Keep the latest event writing each key in the history.
+
+    Returns:
+        Optional[Event]: The compaction event to yield, or None if nothing new is superseded.
+    """
+    events = ctx.session.events
+    run = [
+        i for i, event in enumerate(events)
+        if event.invocation_id == ctx.invocation_id and event.author != "user" and not _is_compaction(event)
+    ]
+    writers = [i for i in run if _writes(events[i], output_keys)]
+    if not writers:
+        return None
+    latest = {}
+    for i in writers:
+        for key in output_keys:
+            if key in events[i].actions.state_delta:
+                latest[key] = i
+    # With keep_latest, everything from the oldest still-current write on stays.
+    boundary = min(latest.values()) if keep_latest else max(writers) + 1
+    superseded = [i for i in run if i < boundary]
+    if not any(events[i].content for i in superseded):
+        return None  # Only state updates; a note would cost more than it saves
+
+    previous = [
+        event for event in events
+        if event.invocation_id == ctx.invocation_id and _is_compaction(event)
+    ]
+    start = min([events[superseded[0]].timestamp] + [event.actions.compaction.start_timestamp for event in previous])
+    compacted = len(superseded)  # Includes the events of earlier compactions, which this one subsumes
+    note = (
+        f"[{compacted} earlier events of this run were compacted. They held superseded values of "
+        f"{', '.join(output_keys)}; the current values are provided in the instructions.]"
+    )
+    event = Event(
+        author=author,
+        invocation_id=ctx.invocation_id,
+        branch=ctx.branch,
+        actions=EventActions(
+            compaction=EventCompaction(
+                start_timestamp=start,
+                end_timestamp=events[superseded[-1]].timestamp,
+                compacted_content=types.Content(role="model", parts=[types.Part(text=note)]),
+            )
+        ),
+        custom_metadata={"compacted_events": compacted},
+    )
+    return event
+
+
+class HistoryCompactor(BaseAgent):
+    """
+    Compacts the run's superseded events into a short note (see the module docstring).
+
+    Attributes:
+        output_keys (List[str]): State keys the pipeline's agents read from state.
+        keep_latest (bool): Keep the latest event writing each key in the history.
+    """
+
+    output_keys: List[str]
+    keep_latest: bool = True
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if not compaction_enabled():
+            return
+        event = compact_history(ctx, self.name, self.output_keys, self.keep_latest)
+        if event is not None:
+            yield event
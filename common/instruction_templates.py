@@ -0,0 +1,31 @@
+"""
+The placeholder syntax of ADK instruction templates.
+
+ADK renders `{key}` (state), `{key?}` (optional state), `{app:key}`, `{user:key}`,
+`{temp:key}` (prefixed state) and `{artifact.file}` (artifact text) in a string
+instruction, and leaves any other braces as they are. The instruction splitter
+(common/prompt_cache.py) and the pipelined chain (sequential_agent/pipelining.py)
+both read templates through this module, so they agree on what a placeholder is.
+"""
+
+import re
+from typing import List
+
+PLACEHOLDER = re.compile(r"{+([^{}]*)}+")
+STATE_PREFIXES = ("app:", "user:", "temp:")
+ARTIFACT_PREFIX = "artifact."
+
+
+def is_placeholder(name: str) -> bool:
+    """Whether ADK substitutes `{name}`, e.g. 'key', 'key?', 'app:key' or 'artifact.file'."""
+    name = name.strip().removesuffix("?")
+    if name.startswith(ARTIFACT_PREFIX):
+        return True
+    return next((name[len(prefix):] for prefix in STATE_PREFIXES if name.startswith(prefix)), name).isidentifier()
+
+
+def placeholders(template: str) -> List[str]:
+    """The placeholder names in a template, stripped, in order of appearance (repeats included)."""
+    return [
+        name for name in (match.group(1).strip() for match in PLACEHOLDER.finditer(template)) if is_placeholder(name)
+    ]
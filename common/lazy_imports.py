@@ -0,0 +1,27 @@
+"""
+Lazy `agent` submodules for the agent packages.
+
+Each package's `__init__.py` installs `lazy_agent_module(__name__)` as its module-level
+`__getattr__` (PEP 562). `<package>.agent` is then imported on first access, so
+importing the package or one of its helper modules (e.g. for a benchmark) does not
+build the agent or pull in its dependencies. The ADK loader still resolves
+`root_agent` through `<package>.agent` as before.
+
+This module imports nothing beyond the standard library, so using it keeps the
+packages cheap to import.
+"""
+
+import importlib
+from types import ModuleType
+from typing import Callable
+
+
+def lazy_agent_module(package: str) -> Callable[[str], ModuleType]:
+    """A module `__getattr__` for `package` that imports `<package>.agent` on first access."""
+
+    def __getattr__(name: str) -> ModuleType:
+        if name == "agent":
+            return importlib.import_module(".agent", package)
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    return __getattr__
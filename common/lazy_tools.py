@@ -0,0 +1,43 @@
+"""
+Deferred construction of tools whose dependencies are expensive to import.
+
+`LazyToolset` plugs into an agent's `tools` list like any other ADK toolset, but
+only calls its factory the first time the agent actually asks for its tools, so
+heavy imports (e.g. LangChain) and client setup stay out of module import time.
+"""
+
+import threading
+from typing import Callable, List, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+
+class LazyToolset(BaseToolset):
+    """
+    Toolset whose tools are built by `factory` on first use and reused afterwards.
+
+    Args:
+        factory (Callable[[], List[BaseTool]]): Builds the tools; called at most once.
+    """
+
+    def __init__(self, factory: Callable[[], List[BaseTool]]):
+        super().__init__()
+        self._factory = factory
+        self._tools: Optional[List[BaseTool]] = None
+        self._lock = threading.Lock()
+
+    def materialize(self) -> List[BaseTool]:
+        """Builds the tools if they have not been built yet and returns them."""
+        if self._tools is None:
+            with self._lock:
+                if self._tools is None:
+                    self._tools = list(self._factory())
+        return self._tools
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        return self.materialize()
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,342 @@
+"""
+Offline model backend, selectable by name through ADK's model registry.
+
+Set GEMINI_MODEL=mock/<name> (see `common/models.py`) and every agent package runs
+on `MockLlm` instead of Gemini. Keeping a Gemini name after the prefix, e.g.
+'mock/gemini-2.0-flash', lets Gemini-only built-in tools such as google_search
+accept the model. Replies are deterministic:
+
+- A script registered for the calling agent (`register_script`) answers first. It can
+  emit tool calls (`function_call_response`, e.g. exit_loop) or return None to fall
+  back to the default reply.
+- By default, a tool result is summarized, and any other request gets a numbered list
+  whose words and length derive from a hash of the prompt. It is capped at the
+  request's max_output_tokens.
+
+Latency follows a named profile (MOCK_LLM_LATENCY: instant, flash, pro or tail), with
+a random time to first token drawn from a seeded generator (MOCK_LLM_SEED), a prefill
+time per prompt token and a per-token generation time.
+
+Like Gemini's implicit caching, `prefix_cache` serves the longest prefix a prompt shares
+with recent prompts (same model and tools) from cache. Cached tokens
+need no prefill and are reported in usage_metadata.cached_content_token_count. It is
+controlled by MOCK_LLM_PREFIX_CACHE ('off' disables it) and MOCK_LLM_PREFIX_CACHE_MIN_TOKENS
+(shorter prefixes are not cached; default 0, Gemini's minimum is 1024 or more).
+
+Calls and estimated tokens are tallied per agent in `usage`, across all MockLlm
+instances. The registry builds a new instance per request, so per-instance counters
+would not add up.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from google.adk.models import LLMRegistry, LlmRequest, LlmResponse
+
+from common.mock_llm import (
+    CHARS_PER_TOKEN,
+    ScriptedLlm,
+    content_text,
+    estimate_tokens,
+    is_dynamic_instruction,
+    last_function_response,
+    request_prompt_text,
+)
+
+_AGENT_NAME = re.compile(r'Your internal name is "([^"]+)"')
+
+_WORDS = (
+    "simple", "fresh", "bold", "quick", "seasonal", "practical", "classic", "smart", "balanced", "vivid",
+    "guide", "plan", "idea", "approach", "step", "tip", "angle", "story", "list", "draft",
+    "with", "for", "using", "around", "about", "beyond", "through", "into", "across", "after",
+    "flavor", "budget", "audience", "trend", "routine", "format", "detail", "focus", "season", "update",
+)
+
+
+# --- Latency ---
+
+Distribution = Callable[[random.Random], float]
+
+
+def constant(seconds: float) -> Distribution:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Distribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, p95: float) -> Distribution:
+    """A right-skewed distribution with the given median and 95th percentile, like real model latency."""
+    sigma = math.log(p95 / median) / 1.645
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Simulated timing of a model turn: prefill per uncached prompt token, time to first token, then time per output token."""
+
+    first_token: Distribution
+    seconds_per_token: float = 0.0
+    seconds_per_prompt_token: float = 0.0
+
+
+PROFILES: Dict[str, LatencyProfile] = {
+    "instant": LatencyProfile(constant(0.0)),
+    "flash": LatencyProfile(lognormal(median=0.35, p95=0.9), seconds_per_token=0.004, seconds_per_prompt_token=0.0002),
+    "pro": LatencyProfile(lognormal(median=1.2, p95=3.5), seconds_per_token=0.012, seconds_per_prompt_token=0.0006),
+    # Occasional very slow turns
+    "tail": LatencyProfile(lognormal(median=0.35, p95=2.5), seconds_per_token=0.004, seconds_per_prompt_token=0.0002),
+}
+
+_rng = random.Random(int(os.environ.get("MOCK_LLM_SEED", "0")))
+
+
+def seed(value: int) -> None:
+    """Restarts the latency generator, so a run's sequence of delays can be reproduced."""
+    _rng.seed(value)
+
+
+def latency_profile(name: Optional[str] = None) -> LatencyProfile:
+    """
+    Looks up a latency profile by name (default: MOCK_LLM_LATENCY, else 'instant').
+
+    Raises:
+        ValueError: If the profile is unknown.
+    """
+    name = name or os.environ.get("MOCK_LLM_LATENCY", "instant")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown mock latency profile {name!r}; choose from {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+# --- Usage accounting ---
+
+@dataclass
+class AgentUsage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+
+
+@dataclass
+class BackendUsage:
+    """Model calls and estimated tokens served by the backend, per agent name."""
+
+    by_agent: Dict[str, AgentUsage] = field(default_factory=lambda: defaultdict(AgentUsage))
+
+    def record(self, agent_name: str, prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int = 0) -> None:
+        usage = self.by_agent[agent_name]
+        usage.calls += 1
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+        usage.cached_prompt_tokens += cached_prompt_tokens
+
+    def totals(self) -> AgentUsage:
+        total = AgentUsage()
+        for usage in self.by_agent.values():
+            total.calls += usage.calls
+            total.prompt_tokens += usage.prompt_tokens
+            total.completion_tokens += usage.completion_tokens
+            total.cached_prompt_tokens += usage.cached_prompt_tokens
+        return total
+
+    def reset(self) -> None:
+        self.by_agent.clear()
+
+
+usage = BackendUsage()
+
+
+# --- Prompt prefix cache ---
+
+class PrefixCache:
+    """
+    Stand-in for a provider's implicit prompt caching.
+
+    A prompt is a sequence of segments after the model and tools: the system instruction,
+    then each content in order. Each prompt seen in the last `ttl_seconds` is remembered.
+    A new prompt is served from cache up to its longest common prefix with them: whole
+    segments, then the shared start of the first segment that differs. Prefixes shorter
+    than `min_tokens` are not served from cache.
+    """
+
+    MAX_VARIANTS = 8  # Remembered texts per position; the most recent are kept
+
+    def __init__(self, ttl_seconds: float = 300.0, min_tokens: int = 0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        # Hash of the preceding segments -> (expiry, texts seen next), least recently used first
+        self._seen: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+
+    @staticmethod
+    def _segments(llm_request: LlmRequest) -> Iterator[str]:
+        instruction = llm_request.config.system_instruction if llm_request.config else None
+        yield instruction if isinstance(instruction, str) else content_text(instruction)
+        for content in llm_request.contents:
+            yield f"{content.role}: {content_text(content)}"
+
+    def lookup(self, llm_request: LlmRequest) -> int:
+        """Returns the tokens of the request served from cache (estimated), and remembers the request."""
+        now = time.monotonic()
+        digest = hashlib.sha256(f"{llm_request.model}\n{json.dumps(sorted(llm_request.tools_dict))}".encode("utf-8"))
+        cached_chars = 0
+        matching = True
+        for text in self._segments(llm_request):
+            key = digest.hexdigest()
+            expiry, variants = self._seen.pop(key, (0.0, []))
+            if matching:
+                seen = variants if expiry > now else []
+                shared = max((len(os.path.commonprefix([text, variant])) for variant in seen), default=0)
+                cached_chars += shared
+                matching = shared == len(text)
+            if text in variants:
+                variants.remove(text)
+            variants.append(text)
+            self._seen[key] = (now + self.ttl_seconds, variants[-self.MAX_VARIANTS:])
+            digest.update(hashlib.sha256(text.encode("utf-8")).digest())
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        cached = cached_chars // CHARS_PER_TOKEN
+        return cached if cached >= self.min_tokens else 0
+
+    def clear(self) -> None:
+        self._seen.clear()
+
+
+def prefix_cache_enabled() -> bool:
+    return os.environ.get("MOCK_LLM_PREFIX_CACHE", "on").strip().lower() not in ("0", "false", "no", "off")
+
+
+prefix_cache = PrefixCache(min_tokens=int(os.environ.get("MOCK_LLM_PREFIX_CACHE_MIN_TOKENS", "0")))
+
+
+# --- Replies ---
+
+Script = Callable[[LlmRequest], Union[str, LlmResponse, None]]
+
+_scripts: Dict[str, Script] = {}
+
+
+def register_script(agent_name: str, script: Script) -> None:
+    """Answers the named agent's requests with `script`; a None reply falls back to the default."""
+    _scripts[agent_name] = script
+
+
+def clear_scripts() -> None:
+    _scripts.clear()
+
+
+def request_agent_name(llm_request: LlmRequest) -> str:
+    """The name of the agent that built a request, read from the identity line ADK adds to the system instruction."""
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    match = _AGENT_NAME.search(instruction if isinstance(instruction, str) else "")
+    return match.group(1) if match else ""
+
+
+def available_tools(llm_request: LlmRequest) -> List[str]:
+    return list(llm_request.tools_dict)
+
+
+def first_user_text(llm_request: LlmRequest) -> str:
+    """The first user message in the request, i.e. the original request rather than context injected by other agents."""
+    for content in llm_request.contents:
+        if is_dynamic_instruction(content):
+            continue  # Instruction text, placed among the contents (see common/prompt_cache.py)
+        if content.role == "user" and content.parts and any(part.text for part in content.parts):
+            return content_text(content)
+    return ""
+
+
+def _words(prompt: str) -> Iterator[str]:
+    # An endless deterministic word stream keyed by the prompt.
+    block = 0
+    while True:
+        for byte in hashlib.sha256(f"{block}:{prompt}".encode("utf-8")).digest():
+            yield _WORDS[byte % len(_WORDS)]
+        block += 1
+
+
+def _cap(text: str, llm_request: LlmRequest) -> str:
+    max_tokens = llm_request.config.max_output_tokens if llm_request.config else None
+    return text[: max_tokens * CHARS_PER_TOKEN] if max_tokens else text
+
+
+def default_reply(llm_request: LlmRequest) -> str:
+    """A deterministic answer: a short summary of the last tool result, else a numbered list about the user's request."""
+    function_response = last_function_response(llm_request)
+    if function_response is not None:
+        result = json.dumps(function_response.response, default=str)
+        return _cap(f"Here is what I found with {function_response.name}:\n{result[:600]}", llm_request)
+
+    prompt = request_prompt_text(llm_request)
+    topic = " ".join(first_user_text(llm_request).split()[:8]) or "your request"
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    words = _words(prompt)
+    lines = [f"{topic}:"]
+    for i in range(3 + digest[0] % 3):
+        length = 6 + digest[i + 1] % 10
+        lines.append(f"{i + 1}. " + " ".join(next(words) for _ in range(length)).capitalize())
+    return _cap("\n".join(lines), llm_request)
+
+
+def respond(llm_request: LlmRequest) -> Union[str, LlmResponse]:
+    script = _scripts.get(request_agent_name(llm_request))
+    reply = script(llm_request) if script else None
+    return default_reply(llm_request) if reply is None else reply
+
+
+class MockLlm(ScriptedLlm):
+    """
+    `ScriptedLlm` answering through registered scripts and the default reply, timed by a latency profile.
+
+    Built by ADK's model registry for any model name matching 'mock/.*'.
+    """
+
+    responder: Any = respond
+    profile: Optional[str] = None  # Latency profile name; None follows MOCK_LLM_LATENCY
+    seconds_per_prompt_token: float = 0.0  # Prefill time of each prompt token not served from the prefix cache
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"mock/.*"]
+
+    def model_post_init(self, __context: Any) -> None:
+        timing = latency_profile(self.profile)
+        self.latency = lambda: timing.first_token(_rng)
+        self.seconds_per_token = timing.seconds_per_token
+        self.seconds_per_prompt_token = timing.seconds_per_prompt_token
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cached_tokens = prefix_cache.lookup(llm_request) if prefix_cache_enabled() else 0
+        if self.seconds_per_prompt_token:
+            uncached = max(0, estimate_tokens(request_prompt_text(llm_request)) - cached_tokens)
+            await asyncio.sleep(self.seconds_per_prompt_token * uncached)
+        async for response in super().generate_content_async(llm_request, stream=stream):
+            if not response.partial and response.usage_metadata:
+                prompt_tokens = response.usage_metadata.prompt_token_count or 0
+                cached_tokens = min(cached_tokens, prompt_tokens)
+                response.usage_metadata.cached_content_token_count = cached_tokens or None
+                usage.record(
+                    request_agent_name(llm_request),
+                    prompt_tokens,
+                    response.usage_metadata.candidates_token_count or 0,
+                    cached_tokens,
+                )
+            yield response
+
+
+LLMRegistry.register(MockLlm)
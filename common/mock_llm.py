@@ -0,0 +1,136 @@
+"""
+Deterministic stand-in model for running agents offline.
+
+`ScriptedLlm` implements ADK's `BaseLlm` interface but never calls a provider.
+Each turn is answered by a `responder` function that receives the `LlmRequest`
+and returns the reply (plain text, a function call, or a full `LlmResponse`).
+The model counts calls and estimated prompt/completion tokens so agent designs
+can be compared without live Gemini calls.
+
+Example:
+    mock = ScriptedLlm(responder=lambda request: text_response("Hello!"))
+    agent = with_model(root_agent, mock)
+"""
+
+import asyncio
+from typing import Any, AsyncGenerator, Callable, Dict, Optional, Union
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+from common.prompt_cache import content_text, is_dynamic_instruction  # noqa: F401 (re-exported)
+from common.tokens import CHARS_PER_TOKEN, estimate_tokens  # noqa: F401 (re-exported)
+
+
+def request_prompt_text(llm_request: LlmRequest) -> str:
+    """Returns everything the model would read for a request: system instruction plus contents."""
+    system_instruction = ""
+    if llm_request.config and llm_request.config.system_instruction:
+        instruction = llm_request.config.system_instruction
+        system_instruction = instruction if isinstance(instruction, str) else content_text(instruction)
+    return "\n".join([system_instruction] + [content_text(content) for content in llm_request.contents])
+
+
+def text_response(text: str) -> LlmResponse:
+    """Builds a model reply consisting of a single text part."""
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def function_call_response(name: str, args: Optional[Dict[str, Any]] = None) -> LlmResponse:
+    """Builds a model reply that calls the named tool with the given arguments."""
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[types.Part(function_call=types.FunctionCall(name=name, args=args or {}))],
+        )
+    )
+
+
+def last_function_response(llm_request: LlmRequest) -> Optional[types.FunctionResponse]:
+    """Returns the most recent function response in the request, if the last turn was a tool result."""
+    turns = [content for content in llm_request.contents if not is_dynamic_instruction(content)]
+    if not turns:
+        return None
+    for part in turns[-1].parts or []:
+        if part.function_response:
+            return part.function_response
+    return None
+
+
+def last_user_text(llm_request: LlmRequest) -> str:
+    """Returns the text of the most recent user message in the request."""
+    for content in reversed(llm_request.contents):
+        if content.role == "user" and content.parts and any(part.text for part in content.parts):
+            return "".join(part.text or "" for part in content.parts)
+    return ""
+
+
+Responder = Callable[[LlmRequest], Union[str, LlmResponse]]
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Offline model whose replies come from a `responder` function.
+
+    Attributes:
+        responder (Responder): Maps each request to a reply; a plain string is sent as text.
+        latency (Optional[Callable[[], float]]): Simulated time to first token of each turn in seconds.
+        seconds_per_token (float): Simulated generation time per output token, added to `latency`.
+        calls (int): Number of model turns served.
+        prompt_tokens (int): Estimated input tokens across all turns.
+        completion_tokens (int): Estimated output tokens across all turns.
+
+    With `stream=True`, text replies are sent line by line as partial responses, paced
+    by `seconds_per_token`, followed by the complete reply.
+    """
+
+    model: str = "mock-llm"
+    responder: Responder
+    latency: Optional[Callable[[], float]] = None  # Returns the simulated seconds before each turn's first token
+    seconds_per_token: float = 0.0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency is not None:
+            await asyncio.sleep(self.latency())
+        reply = self.responder(llm_request)
+        response = text_response(reply) if isinstance(reply, str) else reply
+
+        prompt_tokens = estimate_tokens(request_prompt_text(llm_request))
+        completion_tokens = estimate_tokens(content_text(response.content))
+        if stream and isinstance(reply, str):
+            for line in reply.splitlines(keepends=True):
+                await asyncio.sleep(self.seconds_per_token * estimate_tokens(line))
+                chunk = text_response(line)
+                chunk.partial = True
+                yield chunk
+        elif self.seconds_per_token:
+            await asyncio.sleep(self.seconds_per_token * completion_tokens)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=completion_tokens,
+            total_token_count=prompt_tokens + completion_tokens,
+        )
+        yield response
+
+    def reset_counters(self) -> None:
+        """Zeroes the call and token counters."""
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+def with_model(agent: BaseAgent, model: BaseLlm) -> BaseAgent:
+    """Returns a copy of an agent tree in which every LlmAgent uses `model`; the original is untouched."""
+    update: Dict[str, Any] = {"sub_agents": [with_model(sub_agent, model) for sub_agent in agent.sub_agents]}
+    if isinstance(agent, LlmAgent):
+        update["model"] = model
+    return agent.clone(update=update)
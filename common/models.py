@@ -0,0 +1,26 @@
+"""
+Model selection shared by the agent packages.
+
+Every package builds its agents on `configured_model()`, so the model can be switched
+without editing code: set GEMINI_MODEL (e.g. GEMINI_MODEL=gemini-2.5-flash). Names
+starting with 'mock/' select the offline backend in `common/mock_backend.py`, e.g.
+GEMINI_MODEL=mock/gemini-2.0-flash. That backend is registered with ADK's model
+registry only when it is selected.
+"""
+
+import os
+
+MOCK_PREFIX = "mock/"
+
+
+def configured_model(default: str) -> str:
+    """
+    Returns the model name agents should use: GEMINI_MODEL from the environment, else `default`.
+
+    Args:
+        default (str): The package's own model, used when GEMINI_MODEL is not set.
+    """
+    name = os.environ.get("GEMINI_MODEL", "").strip() or default
+    if name.startswith(MOCK_PREFIX):
+        from common import mock_backend  # noqa: F401 (registers MockLlm for 'mock/...' names)
+    return name
@@ -0,0 +1,182 @@
+"""
+Persistent key-value cache backed by a local SQLite file.
+
+Values are strings (callers serialize structured data as JSON). Each entry has an
+optional TTL, and the store is bounded by entry count and total value size; when
+either bound is exceeded the least recently used entries are evicted. Expired
+entries can still be read explicitly (e.g. to answer from cache while offline).
+
+The cache is safe to share between threads; every operation runs under a lock on
+a single connection in WAL mode.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access ON cache_entries (last_access);
+"""
+
+
+class PersistentCache:
+    """
+    SQLite-backed cache with TTL and size-bounded LRU eviction.
+
+    Args:
+        path (str): Location of the SQLite file; parent directories are created.
+                    Use ':memory:' for a throwaway in-process store.
+        max_entries (int): Maximum number of entries kept.
+        max_bytes (Optional[int]): Maximum total size of stored values (UTF-8 bytes), if bounded.
+        default_ttl (Optional[float]): TTL in seconds for entries stored without an
+                                       explicit one; None means entries never expire.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+    ):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[str]:
+        """
+        Looks up a value.
+
+        Args:
+            key (str): The cache key.
+            allow_expired (bool): Return the value even if its TTL has passed.
+
+        Returns:
+            Optional[str]: The stored value, or None if missing (or expired and not allowed).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (not allow_expired and row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value, evicting least recently used entries if the store is over its bounds.
+
+        Args:
+            key (str): The cache key.
+            value (str): The value to store.
+            ttl (Optional[float]): TTL in seconds; defaults to `default_ttl`.
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, expires_at, now),
+            )
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        count, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        excess = max(0, count - self.max_entries)
+        if excess:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE key IN "
+                "(SELECT key FROM cache_entries ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+        if self.max_bytes is not None and total_bytes > self.max_bytes:
+            # Drop the oldest entries until the remaining ones fit.
+            rows = self._conn.execute("SELECT key, size FROM cache_entries ORDER BY last_access").fetchall()
+            total_bytes = sum(size for _, size in rows)
+            doomed = []
+            for key, size in rows:
+                if total_bytes <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total_bytes -= size
+            self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", doomed)
+            self.evictions += len(doomed)
+
+    def delete(self, key: str) -> None:
+        """Removes a single entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """Removes all expired entries and returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Removes every entry; counters are kept."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns store size and hit/miss/eviction counters for this process.
+
+        Returns:
+            Dict[str, Any]: Entry count, stored bytes, configured bounds and counters.
+        """
+        with self._lock:
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": count,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,251 @@
+"""
+Static instruction prefixes, and per-agent accounting of what each prompt is made of.
+
+Most of an LlmAgent's instruction is fixed text. Only a few blocks hold {state}
+placeholders (e.g. the recipe under review), and ADK renders those on every call.
+When the whole template goes into the system instruction, a changed placeholder
+changes the start of the prompt. The provider then has to process every token again.
+
+`split_static_instructions(root_agent)` splits the instruction of every LlmAgent in a
+tree into:
+
+- a static prefix: the blocks (paragraphs separated by blank lines) without placeholders.
+  They move to `static_instruction`, which ADK sends as the system instruction as is,
+  without state injection.
+- a dynamic suffix: the blocks with placeholders. They stay in `instruction`, so ADK
+  still renders them per call. They are sent as a labelled user turn after the
+  conversation history. The splitter starts them with DYNAMIC_INSTRUCTION_MARKER, a
+  line of its own that tells that turn apart from the user's turns.
+
+The system instruction, the tools and the history before that turn then stay
+byte-identical from one call to the next. Providers reuse such a prefix:
+
+- Gemini caches identical prefixes implicitly (2.5 models, for prefixes of 1024
+  tokens or more on Flash and 2048 on Pro) and bills the cached tokens at a discount.
+- Explicit context caching is turned on with LLM_CONTEXT_CACHE. Runners built by
+  `common.agent_runner.new_runner` then pass `context_cache_config()` to the App.
+- The offline backend simulates it with `PrefixCache` (see common/mock_backend.py).
+  Cached tokens are reported and cost no prefill time.
+
+The dynamic blocks now come last in the prompt, after the marker and a fixed preamble
+that ADK adds (about 100 tokens). A split prompt is therefore slightly longer, but most
+of it is cached.
+
+`PromptSizePlugin` records, per agent and model call, the tokens of:
+
+- the static instruction
+- the dynamic instruction, rendered
+- the conversation history
+- the part of the prompt the provider served from its cache
+
+Settings come from environment variables:
+
+    STATIC_INSTRUCTION_SPLIT       'off' keeps each instruction whole (default: on)
+    LLM_CONTEXT_CACHE              'on' enables explicit context caching (default: off)
+    LLM_CONTEXT_CACHE_TTL_SECONDS  Lifetime of an explicit cache (default: 1800)
+    LLM_CONTEXT_CACHE_MIN_TOKENS   Smallest prompt worth caching (default: 2048, Gemini's minimum)
+
+Compare the pipelines with and without the split on the offline backend:
+    python -m common.prompt_cache_benchmark --packages loop_agent sequential_agent parallel_agent --latency flash
+"""
+
+import json
+import os
+import re
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.utils.instructions_utils import inject_session_state
+from google.genai import types
+
+from common.instruction_templates import placeholders
+from common.tokens import estimate_tokens
+
+DYNAMIC_INSTRUCTION_MARKER = "[Current state for this turn]"
+_MARKER_LINE = re.compile(rf"^{re.escape(DYNAMIC_INSTRUCTION_MARKER)}$", re.M)
+_BLOCK_SEPARATOR = re.compile(r"\n[ \t]*\n")
+
+DEFAULT_CONTEXT_CACHE_TTL_SECONDS = 1800
+DEFAULT_CONTEXT_CACHE_MIN_TOKENS = 2048
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.environ.get(name, default).strip().lower() not in ("0", "false", "no", "off")
+
+
+def split_enabled() -> bool:
+    return _flag("STATIC_INSTRUCTION_SPLIT", "on")
+
+
+def context_cache_config() -> Optional[ContextCacheConfig]:
+    """The App's explicit context cache settings when LLM_CONTEXT_CACHE is on, else None."""
+    if not _flag("LLM_CONTEXT_CACHE", "off"):
+        return None
+    return ContextCacheConfig(
+        ttl_seconds=int(os.environ.get("LLM_CONTEXT_CACHE_TTL_SECONDS", DEFAULT_CONTEXT_CACHE_TTL_SECONDS)),
+        min_tokens=int(os.environ.get("LLM_CONTEXT_CACHE_MIN_TOKENS", DEFAULT_CONTEXT_CACHE_MIN_TOKENS)),
+    )
+
+
+# --- Splitting ---
+
+def split_instruction(template: str) -> Tuple[str, str]:
+    """
+    Splits an instruction template into its static text and the blocks that hold {state} placeholders.
+
+    Blocks are paragraphs separated by blank lines. Each part keeps its blocks in their
+    original order. Braces that ADK would leave as they are (e.g. a JSON example) are static.
+
+    Returns:
+        Tuple[str, str]: (static, dynamic); either may be empty.
+    """
+    static: List[str] = []
+    dynamic: List[str] = []
+    for block in _BLOCK_SEPARATOR.split(template.strip()):
+        (dynamic if placeholders(block) else static).append(block)
+    return "\n\n".join(static), "\n\n".join(dynamic)
+
+
+def split_static_instructions(agent: BaseAgent) -> BaseAgent:
+    """
+    Moves the static text of every LlmAgent's instruction in a tree into its `static_instruction`, in place.
+
+    Only the blocks with placeholders remain in `instruction`, after DYNAMIC_INSTRUCTION_MARKER.
+    Agents that already have a static instruction, or build their instruction with a
+    function, are left as they are.
+    Does nothing when STATIC_INSTRUCTION_SPLIT is off.
+
+    Returns:
+        BaseAgent: `agent`, for chaining.
+    """
+    if not split_enabled():
+        return agent
+    if isinstance(agent, LlmAgent) and isinstance(agent.instruction, str) and agent.static_instruction is None:
+        static, dynamic = split_instruction(agent.instruction)
+        if static:
+            agent.static_instruction = static
+            agent.instruction = f"{DYNAMIC_INSTRUCTION_MARKER}\n{dynamic}" if dynamic else ""
+    for sub_agent in agent.sub_agents:
+        split_static_instructions(sub_agent)
+    return agent
+
+
+def content_text(content: Optional[types.Content]) -> str:
+    """Flattens a Content into text, serializing function calls and responses as JSON."""
+    if content is None or not content.parts:
+        return ""
+    chunks = []
+    for part in content.parts:
+        if part.text:
+            chunks.append(part.text)
+        if part.function_call:
+            chunks.append(json.dumps({"name": part.function_call.name, "args": part.function_call.args}, default=str))
+        if part.function_response:
+            chunks.append(
+                json.dumps({"name": part.function_response.name, "response": part.function_response.response}, default=str)
+            )
+    return "\n".join(chunks)
+
+
+def is_dynamic_instruction(content: types.Content) -> bool:
+    """
+    Whether a request content is the rendered instruction of an agent with a static instruction.
+
+    ADK sends it as a labelled user turn among the contents, after any tool result of
+    the current turn. It is recognized by the marker line `split_static_instructions` puts
+    in front of it, not by ADK's label.
+    """
+    return content.role == "user" and any(part.text and _MARKER_LINE.search(part.text) for part in content.parts or [])
+
+
+def dynamic_instruction_text(llm_request: LlmRequest) -> str:
+    """The rendered dynamic instruction in a request's contents, or '' when the instruction is whole."""
+    return next((content_text(content) for content in llm_request.contents if is_dynamic_instruction(content)), "")
+
+
+# --- Accounting ---
+
+@dataclass
+class PromptSizes:
+    """Token totals of an agent's model calls, by part of the prompt."""
+
+    calls: int = 0
+    static_tokens: int = 0
+    dynamic_tokens: int = 0
+    history_tokens: int = 0
+    cached_tokens: int = 0
+
+    def per_call(self) -> Dict[str, float]:
+        fields = asdict(self)
+        calls = fields.pop("calls") or 1
+        return {name: value / calls for name, value in fields.items()}
+
+
+class PromptSizePlugin(BasePlugin):
+    """
+    Records how many prompt tokens each agent's model calls spend on static instruction,
+    dynamic instruction and history, and how many were cached.
+
+    Calls answered without the model (e.g. by a stage or response cache) are not counted.
+    Estimates use `common.tokens.estimate_tokens`. Cached tokens are what the model
+    reported in usage_metadata.cached_content_token_count.
+    """
+
+    def __init__(self, name: str = "prompt_sizes"):
+        super().__init__(name=name)
+        self.by_agent: Dict[str, PromptSizes] = defaultdict(PromptSizes)
+        self._agents: Dict[str, BaseAgent] = {}
+        self._pending: Dict[Tuple[str, Optional[str], str], Tuple[int, int, int]] = {}
+
+    async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> None:
+        self._agents[agent.name] = agent
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        instruction = llm_request.config.system_instruction if llm_request.config else None
+        system_tokens = estimate_tokens(instruction if isinstance(instruction, str) else "")
+        dynamic = dynamic_instruction_text(llm_request)
+        if dynamic:
+            static_tokens, dynamic_tokens = system_tokens, estimate_tokens(dynamic)
+        else:
+            # The whole template is in the system instruction: render its placeholder blocks to size them
+            agent = self._agents.get(callback_context.agent_name)
+            template = getattr(agent, "instruction", None)
+            rendered = ""
+            if isinstance(template, str):
+                rendered = await inject_session_state(split_instruction(template)[1], callback_context)
+            dynamic_tokens = min(estimate_tokens(rendered), system_tokens)
+            static_tokens = system_tokens - dynamic_tokens
+        history_tokens = sum(
+            estimate_tokens(content_text(content)) for content in llm_request.contents
+        ) - estimate_tokens(dynamic)
+        key = (callback_context.invocation_id, callback_context.branch, callback_context.agent_name)
+        self._pending[key] = (static_tokens, dynamic_tokens, history_tokens)
+
+    async def after_model_callback(self, *, callback_context: CallbackContext, llm_response: LlmResponse) -> None:
+        if llm_response.partial or llm_response.usage_metadata is None:
+            return
+        key = (callback_context.invocation_id, callback_context.branch, callback_context.agent_name)
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        sizes = self.by_agent[callback_context.agent_name]
+        sizes.calls += 1
+        sizes.static_tokens += pending[0]
+        sizes.dynamic_tokens += pending[1]
+        sizes.history_tokens += pending[2]
+        sizes.cached_tokens += llm_response.usage_metadata.cached_content_token_count or 0
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Per agent: model calls, then the average tokens per call of each part of the prompt."""
+        return {name: {"calls": sizes.calls, **sizes.per_call()} for name, sizes in sorted(self.by_agent.items())}
+
+    def reset(self) -> None:
+        self.by_agent.clear()
+        self._pending.clear()
+
@@ -0,0 +1,97 @@
+"""
+Prompt sizes and prefix caching of the pipelines, with and without static instruction prefixes.
+
+Each mode runs the packages' root agents on the offline model backend (see
+`common/mock_backend.py`) in a fresh interpreter, because the split (see
+`common/prompt_cache.py`) is applied when the agent modules are imported. Every run is
+a new request, so the backend's prefix cache only serves what differing requests share.
+Per package and mode it reports latency and prompt tokens per run, how many of them were
+cached, and per agent the static, dynamic and history tokens of a model call.
+
+Run:
+    python -m common.prompt_cache_benchmark --packages loop_agent sequential_agent parallel_agent --latency flash
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from common import e2e_benchmark, mock_backend
+from common.prompt_cache import PromptSizePlugin
+
+REPORT_PACKAGES = ("loop_agent", "sequential_agent", "parallel_agent")
+
+
+async def _measure(packages: List[str], runs: int) -> Dict[str, Any]:
+    for agent_name, script in e2e_benchmark.SCRIPTS.items():
+        mock_backend.register_script(agent_name, script)
+    results = {}
+    for package in packages:
+        messages = e2e_benchmark.WORKLOADS[package]
+        e2e_benchmark.WORKLOADS[package] = [f"{messages[i % len(messages)]} #{i + 1}" for i in range(runs)]
+        plugin = PromptSizePlugin()
+        # No warm-up: the first runs pay for filling the prefix cache, as they would with a provider
+        result = await e2e_benchmark.measure_package(package, runs, warmup=False, plugins=[plugin])
+        result["agents"] = plugin.report()
+        results[package] = result
+    return results
+
+
+def _run_mode(split: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    env = {
+        **os.environ,
+        "STATIC_INSTRUCTION_SPLIT": "on" if split else "off",
+        "GEMINI_MODEL": "mock/gemini-2.0-flash",
+        "MOCK_LLM_LATENCY": args.latency,
+        "MOCK_LLM_SEED": str(args.seed),
+        "CONTENT_STAGE_CACHE": "off",
+        "LLM_RESPONSE_CACHE": "off",
+        "CONTENT_LLM_POLISH": "1",  # Include the parallel pipeline's only templated agent, ContentPolisher
+    }
+    command = [
+        sys.executable, "-m", "common.prompt_cache_benchmark", "--measure", "--runs", str(args.runs),
+        "--packages", *args.packages,
+    ]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare prompt sizes and caching with and without static instruction prefixes.")
+    parser.add_argument("--packages", nargs="+", default=list(REPORT_PACKAGES), choices=list(REPORT_PACKAGES))
+    parser.add_argument("--runs", type=int, default=12, help="Runs per package, each with its own request.")
+    parser.add_argument("--latency", default="flash", help="Mock latency profile: instant, flash, pro or tail.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)  # One mode, in this process
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(asyncio.run(_measure(args.packages, args.runs))))
+        return
+
+    modes = {"whole": _run_mode(False, args), "split": _run_mode(True, args)}
+    print(f"runs={args.runs} latency={args.latency}; tokens are estimates per model call (cached: served from the prefix cache)")
+    for package in args.packages:
+        print(f"\n{package}")
+        for mode, results in modes.items():
+            result = results[package]
+            prompt, cached = result["prompt_tokens_per_run"], result["cached_prompt_tokens_per_run"]
+            print(
+                f"  {mode:<5} latency p50={result['latency_p50_ms']:7.1f}ms p90={result['latency_p90_ms']:7.1f}ms  "
+                f"prompt_tokens/run={prompt:7.1f} cached={cached:7.1f} ({cached / prompt if prompt else 0:4.0%}) "
+                f"uncached={prompt - cached:7.1f}"
+            )
+            for agent_name, sizes in result["agents"].items():
+                print(
+                    f"    {agent_name:<28} calls={sizes['calls']:<3} static={sizes['static_tokens']:6.1f} "
+                    f"dynamic={sizes['dynamic_tokens']:6.1f} history={sizes['history_tokens']:6.1f} "
+                    f"cached={sizes['cached_tokens']:6.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
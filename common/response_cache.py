@@ -0,0 +1,245 @@
+"""
+Exact-match model response cache that any LlmAgent can opt into.
+
+An agent opts in with the cache's callbacks:
+
+    LlmAgent(..., before_model_callback=response_cache.before_model,
+                  after_model_callback=response_cache.after_model,
+                  on_model_error_callback=response_cache.on_model_error)
+
+A response is stored under a hash of the normalized request: model, system
+instruction, contents, tool declarations and generation config. Per-call function
+call ids are left out, and message text is stripped of surrounding whitespace. An
+identical request is then answered from the cache without a model call.
+
+Only low-temperature requests are cached. A request is cached when its temperature is
+set and at or below the threshold. Requests at higher or default temperature are meant
+to vary and always reach the model. Partial, failed and empty responses are never stored.
+
+Settings come from environment variables:
+
+    LLM_RESPONSE_CACHE                  'off' disables the cache (default: on)
+    LLM_RESPONSE_CACHE_MAX_TEMPERATURE  Highest temperature that is cached (default: 0.3)
+    LLM_RESPONSE_CACHE_PATH             SQLite file for a persistent cache shared across
+                                        processes (default: in memory, per process)
+    LLM_RESPONSE_CACHE_TTL_SECONDS      Entry lifetime (default: 1 day)
+    LLM_RESPONSE_CACHE_MAX_ENTRIES      Entry bound; least recently used entries are evicted (default: 5000)
+
+`response_cache.stats()` reports hits, misses and skipped requests per agent, with the
+hit rate. Inspect or clear a persistent cache:
+    python -m common.response_cache stats
+    python -m common.response_cache clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from common.persistent_cache import PersistentCache
+
+DEFAULT_MAX_TEMPERATURE = 0.3
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+MAX_PENDING_CALLS = 1024  # Calls in flight that are tracked; the oldest are dropped beyond it (e.g. cancelled calls)
+
+# Config fields that do not change what the model answers
+_IGNORED_CONFIG_FIELDS = ("http_options", "labels", "automatic_function_calling")
+
+
+def _env_enabled() -> bool:
+    return os.environ.get("LLM_RESPONSE_CACHE", "on").strip().lower() not in ("0", "false", "no", "off")
+
+
+def normalize_contents(llm_request: LlmRequest) -> list:
+    # Per-call function call ids differ between otherwise identical requests, and so can
+    # surrounding whitespace; neither changes the answer.
+    contents = []
+    for content in llm_request.contents:
+        dumped = content.model_dump(mode="json", exclude_none=True)
+        for part in dumped.get("parts", []):
+            for call in ("function_call", "function_response"):
+                if call in part:
+                    part[call].pop("id", None)
+            if "text" in part:
+                part["text"] = part["text"].strip()
+        contents.append(dumped)
+    return contents
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """Hashes the normalized request (model, instruction, contents, tools, generation config) into a cache key."""
+    config = llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else {}
+    for name in _IGNORED_CONFIG_FIELDS:
+        config.pop(name, None)
+    material = json.dumps(
+        {"model": llm_request.model, "config": config, "contents": normalize_contents(llm_request)},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return "llm:" + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cacheable_content(llm_response: LlmResponse) -> Optional[str]:
+    """The response content as JSON, without function call ids, if it is complete and successful."""
+    if llm_response.partial or llm_response.error_code or llm_response.content is None:
+        return None
+    parts = llm_response.content.parts or []
+    if not any(part.function_call or (part.text and part.text.strip()) for part in parts):
+        return None
+    content = llm_response.content.model_dump(mode="json", exclude_none=True)
+    for part in content.get("parts", []):
+        part.get("function_call", {}).pop("id", None)  # ADK assigns a fresh id to each call
+    return json.dumps(content, ensure_ascii=False)
+
+
+class ResponseCache:
+    """
+    Model callbacks that answer repeated low-temperature requests from a cache.
+
+    Args:
+        store (Optional[PersistentCache]): Backing store. When omitted, the store configured
+                                           through the environment is opened on first use.
+        max_temperature (Optional[float]): Highest temperature that is cached; None follows
+                                           LLM_RESPONSE_CACHE_MAX_TEMPERATURE.
+        enabled (Optional[bool]): None follows the LLM_RESPONSE_CACHE environment variable.
+    """
+
+    def __init__(
+        self,
+        store: Optional[PersistentCache] = None,
+        max_temperature: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self._store = store
+        self._max_temperature = max_temperature
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        # (invocation_id, branch, agent name) -> key of the call in flight, for after_model
+        self._pending: Dict[Tuple[str, Optional[str], str], str] = {}
+        # Agent name -> {'hits', 'misses', 'skipped'}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "skipped": 0})
+
+    @property
+    def enabled(self) -> bool:
+        return _env_enabled() if self._enabled is None else self._enabled
+
+    @property
+    def max_temperature(self) -> float:
+        if self._max_temperature is not None:
+            return self._max_temperature
+        return float(os.environ.get("LLM_RESPONSE_CACHE_MAX_TEMPERATURE", DEFAULT_MAX_TEMPERATURE))
+
+    @property
+    def store(self) -> PersistentCache:
+        # Opened lazily so importing an agent does not touch the filesystem.
+        with self._lock:
+            if self._store is None:
+                self._store = PersistentCache(
+                    os.environ.get("LLM_RESPONSE_CACHE_PATH", ":memory:"),
+                    max_entries=int(os.environ.get("LLM_RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                    max_bytes=CACHE_MAX_BYTES,
+                    default_ttl=float(os.environ.get("LLM_RESPONSE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                )
+            return self._store
+
+    def cacheable(self, llm_request: LlmRequest) -> bool:
+        """Whether the request's temperature is set and at or below the threshold."""
+        temperature = llm_request.config.temperature if llm_request.config else None
+        return temperature is not None and temperature <= self.max_temperature
+
+    @staticmethod
+    def _call_id(callback_context: CallbackContext) -> Tuple[str, Optional[str], str]:
+        return (callback_context.invocation_id, callback_context.branch, callback_context.agent_name)
+
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        """Returns the cached response for an identical earlier request, skipping the model call (before_model_callback)."""
+        if not self.enabled:
+            return None
+        counters = self._counters[callback_context.agent_name]
+        if not self.cacheable(llm_request):
+            counters["skipped"] += 1
+            return None
+        key = request_key(llm_request)
+        cached = self.store.get(key)
+        if cached is not None:
+            counters["hits"] += 1
+            return LlmResponse(
+                content=types.Content.model_validate_json(cached),
+                custom_metadata={"response_cache": "hit"},
+            )
+        counters["misses"] += 1
+        self._pending[self._call_id(callback_context)] = key
+        if len(self._pending) > MAX_PENDING_CALLS:
+            self._pending.pop(next(iter(self._pending)))
+        return None
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        """Stores a completed response under the key computed before the call (after_model_callback)."""
+        if llm_response.partial:
+            return None  # Streaming chunk; the aggregated final response follows
+        key = self._pending.pop(self._call_id(callback_context), None)
+        if key is not None:
+            content = _cacheable_content(llm_response)
+            if content is not None:
+                self.store.set(key, content)
+        return None
+
+    def on_model_error(
+        self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> Optional[LlmResponse]:
+        """Forgets the key of a failed call, which never reaches after_model (on_model_error_callback)."""
+        self._pending.pop(self._call_id(callback_context), None)
+        return None  # The error propagates
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits, misses and skipped (too warm) requests per agent and in total, with hit rates and store stats."""
+        total = {"hits": 0, "misses": 0, "skipped": 0}
+        agents = {}
+        for agent, counters in sorted(self._counters.items()):
+            lookups = counters["hits"] + counters["misses"]
+            agents[agent] = {**counters, "hit_rate": counters["hits"] / lookups if lookups else 0.0}
+            for name in total:
+                total[name] += counters[name]
+        lookups = total["hits"] + total["misses"]
+        return {
+            **total,
+            "hit_rate": total["hits"] / lookups if lookups else 0.0,
+            "max_temperature": self.max_temperature,
+            "agents": agents,
+            "store": self.store.stats(),
+        }
+
+    def reset_stats(self) -> None:
+        self._counters.clear()
+
+
+# Shared by every agent that opts in, so identical requests from different runs hit the same entries.
+response_cache = ResponseCache()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the persistent model response cache (LLM_RESPONSE_CACHE_PATH).")
+    parser.add_argument("command", choices=("stats", "clear", "purge"), help="purge drops expired entries")
+    args = parser.parse_args()
+    if not os.environ.get("LLM_RESPONSE_CACHE_PATH"):
+        parser.error("LLM_RESPONSE_CACHE_PATH is not set; the default in-memory cache lives only inside a process")
+    store = ResponseCache(enabled=True).store
+    if args.command == "clear":
+        store.clear()
+    elif args.command == "purge":
+        print(f"Removed {store.purge_expired()} expired entries.")
+    print(json.dumps(store.stats(), indent=2))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Cold-start benchmark for the agent packages.
+
+Each package is measured in a fresh interpreter (so nothing is already imported):
+
+- import_ms:     `import <package>`
+- root_agent_ms: resolving `root_agent` the way the ADK loader does (package, then `<package>.agent`)
+- rss_mb:        resident set size after `root_agent` is resolved
+
+Results can be written to JSON and compared against an earlier run to catch regressions:
+
+    python -m common.startup_benchmark --output startup.json
+    python -m common.startup_benchmark --baseline startup.json --max-regression 0.25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AGENT_PACKAGES = (
+    "agent_with_tools",
+    "function_tools",
+    "loop_agent",
+    "parallel_agent",
+    "sequential_agent",
+    "travel_advisor",
+    "youtube_helper",
+)
+
+# Runs inside the child interpreter; prints one JSON line with the measurements.
+_PROBE = """
+import importlib, json, sys, time
+package = sys.argv[1]
+start = time.perf_counter()
+module = importlib.import_module(package)
+imported = time.perf_counter()
+root_agent = getattr(module, "root_agent", None)
+if root_agent is None:
+    root_agent = importlib.import_module(package + ".agent").root_agent
+resolved = time.perf_counter()
+rss_kb = 0
+with open("/proc/self/status") as status:
+    for line in status:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "root_agent_ms": (resolved - imported) * 1000,
+    "rss_mb": rss_kb / 1024,
+    "modules_loaded": len(sys.modules),
+}))
+"""
+
+METRICS = ("import_ms", "root_agent_ms", "rss_mb")
+
+
+def measure_package(package: str, repeats: int) -> Dict[str, Any]:
+    """Measures a package `repeats` times in fresh interpreters and returns the median of each metric."""
+    samples: List[Dict[str, float]] = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE, package],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "failed"}
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    result = {metric: statistics.median(sample[metric] for sample in samples) for metric in METRICS}
+    result["total_ms"] = result["import_ms"] + result["root_agent_ms"]
+    result["modules_loaded"] = samples[-1]["modules_loaded"]
+    return result
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], max_regression: float) -> List[str]:
+    """Returns a description of every package whose total time or RSS regressed beyond the allowed fraction."""
+    regressions = []
+    for package, current in results.items():
+        previous = baseline.get(package)
+        if not previous or "error" in current or "error" in previous:
+            continue
+        for metric in ("total_ms", "rss_mb"):
+            if current[metric] > previous[metric] * (1 + max_regression):
+                regressions.append(
+                    f"{package}: {metric} {previous[metric]:.1f} -> {current[metric]:.1f} "
+                    f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time and RSS of each agent package.")
+    parser.add_argument("--packages", nargs="+", default=list(AGENT_PACKAGES))
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per package (median is reported).")
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against results from an earlier run.")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed fractional slowdown/growth.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for package in args.packages:
+        results[package] = measure_package(package, args.repeats)
+        result = results[package]
+        if "error" in result:
+            print(f"{package:<18} ERROR {result['error']}")
+        else:
+            print(
+                f"{package:<18} import={result['import_ms']:8.1f}ms root_agent={result['root_agent_ms']:8.1f}ms "
+                f"total={result['total_ms']:8.1f}ms rss={result['rss_mb']:7.1f}MB modules={result['modules_loaded']}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
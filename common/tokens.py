@@ -0,0 +1,19 @@
+"""
+Token estimates for sizing prompts and tool payloads without a tokenizer.
+"""
+
+import json
+import math
+from typing import Any
+
+CHARS_PER_TOKEN = 4  # Rough heuristic used for token estimates throughout the repo
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the token count of a string (about 4 characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def estimate_json_tokens(value: Any) -> int:
+    """Estimates the tokens a JSON-serializable value takes up once serialized for the model."""
+    return estimate_tokens(json.dumps(value, ensure_ascii=False))
@@ -0,0 +1,410 @@
+"""
+Structured tracing and metrics for agent runs.
+
+`TracingPlugin` is an ADK plugin that records a span for every run, agent, model call
+and tool call. Each span carries:
+
+- kind ('run', 'agent', 'model' or 'tool') and name, with trace_id (the invocation id),
+  span_id and parent_id
+- session_id, agent, branch (set inside parallel branches), and loop / iteration for
+  agents running inside a LoopAgent such as RecipeRefinementLoop
+- start time, duration_ms, status ('ok' or 'error') and error
+- prompt_tokens / completion_tokens for model calls, and cached_tokens: the prompt
+  tokens the provider served from its context cache. A call answered by a
+  before_model_callback (e.g. a cache) is marked cached and has no tokens.
+
+Finished spans feed Prometheus-style metrics (span counts, a duration histogram and
+token counters) and the configured exporters. Tracing is off unless one of these
+environment variables is set:
+
+- AGENT_TRACE_FILE=path:   append every span to a JSONL file (written when each run ends)
+- AGENT_METRICS_PORT=9464: serve the metrics in Prometheus text format at /metrics
+- AGENT_TRACING=1:         record in memory only (see `get_tracer()`)
+
+When tracing is off, `tracing_plugins()` returns no plugin, so runs pay nothing for it.
+`run_agent` (common/agent_runner.py) installs the plugin when tracing is on. With the
+ADK CLI, pass `--extra_plugins common.tracing.TracingPlugin` to `adk web` or
+`adk api_server`.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LoopAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass
+class Span:
+    """One timed unit of work in an agent run."""
+
+    kind: str
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: Optional[str] = None
+    session_id: str = ""
+    agent: str = ""
+    branch: Optional[str] = None
+    loop: Optional[str] = None
+    iteration: Optional[int] = None
+    start: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def finish(self, error: Optional[BaseException] = None) -> "Span":
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        del record["_started"]
+        return record
+
+
+class Metrics:
+    """
+    Aggregates finished spans into Prometheus metrics.
+
+    - agent_spans_total{kind, name, agent, status}: counter
+    - agent_span_duration_seconds{kind, name, agent}: histogram
+    - agent_model_tokens_total{agent, type}: counter of prompt, cached (prompt) and completion tokens
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()  # The metrics endpoint reads from another thread
+        self._counts: Dict[Tuple[str, str, str, str], int] = defaultdict(int)
+        self._histograms: Dict[Tuple[str, str, str], List[float]] = {}  # Bucket counts, then sum and count
+        self._tokens: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def observe(self, span: Span) -> None:
+        seconds = span.duration_ms / 1000
+        with self._lock:
+            self._counts[(span.kind, span.name, span.agent, span.status)] += 1
+            histogram = self._histograms.setdefault((span.kind, span.name, span.agent), [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+            for kind in ("prompt", "cached", "completion"):
+                tokens = span.attributes.get(f"{kind}_tokens")
+                if tokens:
+                    self._tokens[(span.agent, kind)] += tokens
+
+    def render(self) -> str:
+        """The metrics in Prometheus text exposition format."""
+        lines = [
+            "# HELP agent_spans_total Finished spans by kind, name, agent and status.",
+            "# TYPE agent_spans_total counter",
+        ]
+        with self._lock:
+            for (kind, name, agent, status), count in sorted(self._counts.items()):
+                lines.append(f"agent_spans_total{_labels(kind=kind, name=name, agent=agent, status=status)} {count}")
+            lines += [
+                "# HELP agent_span_duration_seconds Span duration by kind, name and agent.",
+                "# TYPE agent_span_duration_seconds histogram",
+            ]
+            for (kind, name, agent), histogram in sorted(self._histograms.items()):
+                labels = {"kind": kind, "name": name, "agent": agent}
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f"agent_span_duration_seconds_bucket{_labels(**labels, le=f'{bound:g}')} {count:g}")
+                lines.append(f"agent_span_duration_seconds_bucket{_labels(**labels, le='+Inf')} {histogram[-1]:g}")
+                lines.append(f"agent_span_duration_seconds_sum{_labels(**labels)} {histogram[-2]:.6f}")
+                lines.append(f"agent_span_duration_seconds_count{_labels(**labels)} {histogram[-1]:g}")
+            lines += [
+                "# HELP agent_model_tokens_total Model tokens by agent and type (prompt, cached or completion).",
+                "# TYPE agent_model_tokens_total counter",
+            ]
+            for (agent, kind), tokens in sorted(self._tokens.items()):
+                lines.append(f"agent_model_tokens_total{_labels(agent=agent, type=kind)} {tokens}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class JsonlExporter:
+    """Appends spans to a JSONL file, one object per line. Spans are buffered and written on `flush`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        self._buffer.append(json.dumps(span.to_dict(), default=str))
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            if lines:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+
+
+class Tracer:
+    """
+    Collects finished spans: updates the metrics, keeps the most recent spans in memory
+    and passes spans to the exporters.
+
+    Args:
+        exporters (Optional[List[JsonlExporter]]): Where finished spans are written.
+        keep (int): How many recent spans to keep in `recent`.
+    """
+
+    def __init__(self, exporters: Optional[List[JsonlExporter]] = None, keep: int = 1000):
+        self.exporters = exporters or []
+        self.metrics = Metrics()
+        self.recent: Deque[Span] = deque(maxlen=keep)
+
+    def record(self, span: Span) -> None:
+        self.metrics.observe(span)
+        self.recent.append(span)
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def flush(self) -> None:
+        for exporter in self.exporters:
+            exporter.flush()
+
+
+def tracing_enabled() -> bool:
+    return any(os.environ.get(name) for name in ("AGENT_TRACE_FILE", "AGENT_METRICS_PORT")) or os.environ.get(
+        "AGENT_TRACING", ""
+    ).strip().lower() in ("1", "true", "yes", "on")
+
+
+@lru_cache(maxsize=None)
+def get_tracer() -> Tracer:
+    """The process-wide tracer configured from the environment; starts the metrics endpoint if a port is set."""
+    path = os.environ.get("AGENT_TRACE_FILE")
+    tracer = Tracer([JsonlExporter(path)] if path else [])
+    port = os.environ.get("AGENT_METRICS_PORT")
+    if port:
+        serve_metrics(tracer.metrics, int(port))
+    return tracer
+
+
+def serve_metrics(metrics: Metrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves `metrics` at http://host:port/metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def tracing_plugins() -> List[BasePlugin]:
+    """The plugins a runner should install: a TracingPlugin when tracing is enabled, else none."""
+    return [TracingPlugin()] if tracing_enabled() else []
+
+
+def _enclosing_loop(agent: BaseAgent) -> Optional[LoopAgent]:
+    parent = agent.parent_agent
+    while parent is not None and not isinstance(parent, LoopAgent):
+        parent = parent.parent_agent
+    return parent
+
+
+class TracingPlugin(BasePlugin):
+    """
+    Records run, agent, model and tool spans into a `Tracer`.
+
+    Args:
+        name (str): The plugin name.
+        tracer (Optional[Tracer]): Defaults to the process-wide tracer from `get_tracer()`.
+    """
+
+    def __init__(self, name: str = "tracing", tracer: Optional[Tracer] = None):
+        super().__init__(name=name)
+        self.tracer = tracer or get_tracer()
+        self._open: Dict[Tuple[str, ...], Span] = {}
+        self._iterations: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def _start(self, key: Tuple[str, ...], span: Span) -> None:
+        self._open[key] = span
+
+    def _finish(self, key: Tuple[str, ...], error: Optional[BaseException] = None, **attributes: Any) -> None:
+        span = self._open.pop(key, None)
+        if span is not None:
+            span.attributes.update(attributes)
+            self.tracer.record(span.finish(error))
+
+    def _child(self, kind: str, name: str, callback_context: CallbackContext) -> Span:
+        # Model and tool spans inherit their agent span's tags.
+        invocation_id = callback_context.invocation_id
+        parent = self._open.get(("agent", invocation_id, callback_context.agent_name))
+        return Span(
+            kind=kind,
+            name=name,
+            trace_id=invocation_id,
+            parent_id=parent.span_id if parent else None,
+            session_id=callback_context.session.id,
+            agent=callback_context.agent_name,
+            branch=parent.branch if parent else None,
+            loop=parent.loop if parent else None,
+            iteration=parent.iteration if parent else None,
+        )
+
+    # --- Runs ---
+
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self._start(
+            ("run", invocation_context.invocation_id),
+            Span(
+                kind="run",
+                name=invocation_context.agent.name,
+                trace_id=invocation_context.invocation_id,
+                session_id=invocation_context.session.id,
+                agent=invocation_context.agent.name,
+                attributes={"user_id": invocation_context.user_id},
+            ),
+        )
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self._end_run(invocation_context.invocation_id)
+
+    async def on_run_error_callback(self, *, invocation_context: InvocationContext, error: Exception) -> None:
+        self._end_run(invocation_context.invocation_id, error)
+
+    def _end_run(self, invocation_id: str, error: Optional[BaseException] = None) -> None:
+        self._finish(("run", invocation_id), error)
+        for key in [key for key in self._open if key[1] == invocation_id]:
+            self._finish(key, error or RuntimeError("span still open when the run ended"))
+        for key in [key for key in self._iterations if key[0] == invocation_id]:
+            del self._iterations[key]
+        self.tracer.flush()
+
+    # --- Agents ---
+
+    async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> None:
+        invocation_id = callback_context.invocation_id
+        parent_agent = agent.parent_agent
+        parent = (
+            self._open.get(("agent", invocation_id, parent_agent.name)) if parent_agent else None
+        ) or self._open.get(("run", invocation_id))
+        loop = _enclosing_loop(agent)
+        iteration = None
+        if loop is not None:
+            if parent_agent is loop and loop.sub_agents and loop.sub_agents[0] is agent:
+                self._iterations[(invocation_id, loop.name)] += 1
+            iteration = self._iterations.get((invocation_id, loop.name))
+        self._start(
+            ("agent", invocation_id, agent.name),
+            Span(
+                kind="agent",
+                name=agent.name,
+                trace_id=invocation_id,
+                parent_id=parent.span_id if parent else None,
+                session_id=callback_context.session.id,
+                agent=agent.name,
+                branch=callback_context.branch,
+                loop=loop.name if loop else None,
+                iteration=iteration,
+            ),
+        )
+
+    async def after_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> None:
+        self._finish(("agent", callback_context.invocation_id, agent.name))
+
+    async def on_agent_error_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext, error: Exception
+    ) -> None:
+        self._finish(("agent", callback_context.invocation_id, agent.name), error)
+
+    # --- Model calls ---
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        self._start(key, self._child("model", llm_request.model or "", callback_context))
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        if llm_response.partial:
+            return
+        usage = llm_response.usage_metadata
+        self._finish(
+            ("model", callback_context.invocation_id, callback_context.agent_name),
+            RuntimeError(llm_response.error_message or llm_response.error_code) if llm_response.error_code else None,
+            prompt_tokens=(usage.prompt_token_count or 0) if usage else 0,
+            completion_tokens=(usage.candidates_token_count or 0) if usage else 0,
+            cached_tokens=(usage.cached_content_token_count or 0) if usage else 0,
+        )
+
+    async def on_model_error_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> None:
+        self._finish(("model", callback_context.invocation_id, callback_context.agent_name), error)
+
+    async def on_event_callback(self, *, invocation_context: InvocationContext, event: Event) -> None:
+        # A before_model_callback that answers the request skips after_model_callback, so
+        # the model span is still open when the agent's response event arrives.
+        if not event.partial:
+            self._finish(("model", invocation_context.invocation_id, event.author), cached=True)
+
+    # --- Tool calls ---
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext
+    ) -> None:
+        self._start(
+            ("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name),
+            self._child("tool", tool.name, tool_context),
+        )
+
+    async def after_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, result: Any
+    ) -> None:
+        failed = isinstance(result, dict) and result.get("status") == "error"
+        self._finish(
+            ("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name),
+            RuntimeError(result.get("message") or result.get("error_message")) if failed else None,
+        )
+
+    async def on_tool_error_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, error: Exception
+    ) -> None:
+        self._finish(("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name), error)
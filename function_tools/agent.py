@@ -1,15 +1,84 @@
-import requests
-from typing import Dict, Any
+import asyncio
+import logging
+import httpx
+from typing import Dict, Any, List, Optional, Tuple
 from google.adk.agents import LlmAgent
 
-GEMINI_MODEL = "gemini-2.0-flash"
+from common.models import configured_model
+
+from .cache import AsyncTTLCache
+from .http_client import get_json
+from .rendering import RENDER_MODES, render_profile, render_profiles
+
+GEMINI_MODEL = configured_model("gemini-2.0-flash") # Override with the GEMINI_MODEL env var
+
+MAX_BATCH_SIZE = 50          # Upper bound on IDs accepted by a single fetch_users call
+MAX_CONCURRENT_FETCHES = 10  # Requests in flight at once during a batch fan-out
+
+logger = logging.getLogger(__name__)
+
+# --- User Cache Settings ---
+USER_CACHE_MAX_ENTRIES = 512
+USER_CACHE_TTL_SECONDS = 300.0          # Successful lookups are fresh for 5 minutes
+USER_CACHE_NEGATIVE_TTL_SECONDS = 30.0  # "Not found" results are cached briefly
+USER_CACHE_STALE_SECONDS = 3600.0       # Expired entries are served for up to an hour while refreshing
 
 # --- Tool 1: Fetch User Data from JSONPlaceholder ---
-def fetch_user_data(user_id: int) -> Dict[str, Any]:
+async def _fetch_user(user_id: int) -> Tuple[Dict[str, Any], bool]:
+    """
+    Fetches a single user through the shared pooled client.
+
+    Returns:
+        Tuple[Dict[str, Any], bool]: The tool result (a status dict), and whether the
+                                     user does not exist. The flag only sets the cache
+                                     TTL and never reaches the model.
+    """
+    try:
+        user_data = await get_json(f"/users/{user_id}")
+        if user_data:
+            return {"status": "success", "user_data": user_data}, False
+        else:
+            return {"status": "error", "message": f"User with ID {user_id} not found."}, True
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {"status": "error", "message": f"User with ID {user_id} not found."}, True
+        return {"status": "error", "message": f"Failed to fetch data: {e}"}, False
+    except httpx.HTTPError as e:
+        return {"status": "error", "message": f"Failed to fetch data: {e}"}, False
+    except Exception as e:
+        return {"status": "error", "message": f"An unexpected error occurred: {e}"}, False
+
+
+def _user_cache_ttl(entry: Tuple[Dict[str, Any], bool]) -> Optional[float]:
+    """Successes get the full TTL, 'not found' a short one; transient errors are never cached."""
+    result, not_found = entry
+    if result["status"] == "success":
+        return USER_CACHE_TTL_SECONDS
+    if not_found:
+        return USER_CACHE_NEGATIVE_TTL_SECONDS
+    return None
+
+
+# Shared by fetch_user_data and fetch_users; call user_cache.stats() for hit/miss/eviction counters.
+user_cache = AsyncTTLCache(
+    max_entries=USER_CACHE_MAX_ENTRIES,
+    stale_seconds=USER_CACHE_STALE_SECONDS,
+    ttl_for=_user_cache_ttl,
+)
+
+
+async def _fetch_user_cached(user_id: int) -> Dict[str, Any]:
+    result, _ = await user_cache.get_or_fetch(user_id, lambda: _fetch_user(user_id))
+    return result
+
+
+async def fetch_user_data(user_id: int) -> Dict[str, Any]:
     """
     Fetches user data from JSONPlaceholder API based on a user ID.
 
-    This tool makes an HTTP GET request to the /users endpoint of JSONPlaceholder.
+    This tool makes an HTTP GET request to the /users endpoint of JSONPlaceholder
+    over a shared, keep-alive connection pool with timeouts and bounded retries.
+    Results are served from an in-process TTL/LRU cache when available.
 
     Args:
         user_id (int): The ID of the user to fetch (e.g., 1 to 10).
@@ -19,19 +88,62 @@ def fetch_user_data(user_id: int) -> Dict[str, Any]:
                         otherwise a dictionary with an 'error' message.
                         The structure aligns with JSONPlaceholder's user object.
     """
-    print(f"  [Tool Call] fetch_user_data called for user_id: {user_id}")
-    try:
-        response = requests.get(f"https://jsonplaceholder.typicode.com/users/{user_id}")
-        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-        user_data = response.json()
-        if user_data:
-            return {"status": "success", "user_data": user_data}
+    logger.debug("fetch_user_data called for user_id: %s", user_id)
+    return await _fetch_user_cached(user_id)
+
+
+# --- Tool 1b: Fetch Several Users Concurrently ---
+async def fetch_users(user_ids: List[int]) -> Dict[str, Any]:
+    """
+    Fetches several users from JSONPlaceholder API concurrently in a single call.
+
+    Use this instead of calling 'fetch_user_data' repeatedly when more than one
+    user is requested. Duplicate IDs are fetched once.
+
+    Args:
+        user_ids (List[int]): The IDs of the users to fetch (e.g., [1, 2, 3]).
+
+    Returns:
+        Dict[str, Any]: A dictionary with a 'status' ('success', 'partial' or 'error'),
+                        a 'users' list holding the user objects that were found
+                        (in request order), and an 'errors' list with a 'user_id'
+                        and 'message' for each ID that could not be fetched.
+    """
+    logger.debug("fetch_users called for user_ids: %s", user_ids)
+    unique_ids = list(dict.fromkeys(user_ids))  # De-duplicate while keeping request order
+    if not unique_ids:
+        return {"status": "error", "message": "No user IDs were provided.", "users": [], "errors": []}
+    if len(unique_ids) > MAX_BATCH_SIZE:
+        return {
+            "status": "error",
+            "message": f"Too many user IDs requested ({len(unique_ids)}); the maximum is {MAX_BATCH_SIZE}.",
+            "users": [],
+            "errors": [],
+        }
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    async def fetch_bounded(user_id: int) -> Dict[str, Any]:
+        async with semaphore:
+            return await _fetch_user_cached(user_id)
+
+    results = await asyncio.gather(*(fetch_bounded(user_id) for user_id in unique_ids))
+
+    users = []
+    errors = []
+    for user_id, result in zip(unique_ids, results):
+        if result["status"] == "success":
+            users.append(result["user_data"])
         else:
-            return {"status": "error", "message": f"User with ID {user_id} not found."}
-    except requests.exceptions.RequestException as e:
-        return {"status": "error", "message": f"Failed to fetch data: {e}"}
-    except Exception as e:
-        return {"status": "error", "message": f"An unexpected error occurred: {e}"}
+            errors.append({"user_id": user_id, "message": result["message"]})
+
+    if not errors:
+        status = "success"
+    elif users:
+        status = "partial"
+    else:
+        status = "error"
+    return {"status": status, "users": users, "errors": errors}
 
 # --- Tool 2: Format User Profile for Display ---
 def format_user_profile(user_data_json: Dict[str, Any]) -> str:
@@ -50,30 +162,50 @@ def format_user_profile(user_data_json: Dict[str, Any]) -> str:
         str: A multi-line string representing the formatted user profile in Markdown.
              Returns an error message string if input data is invalid.
     """
-    print(f"  [Tool Call] format_user_profile called with user data for Markdown formatting.")
-    user_data = user_data_json # Extract the actual user data from the wrapper dict
-
-    if not isinstance(user_data, dict):
-        return "Error: Invalid user data provided for Markdown formatting."
-
-    name = user_data.get("name", "N/A")
-    username = user_data.get("username", "N/A")
-    email = user_data.get("email", "N/A")
-    phone = user_data.get("phone", "N/A").split(' ')[0] # Take only the first part if multiple numbers
-    website = user_data.get("website", "N/A")
-    company_name = user_data.get("company", {}).get("name", "N/A")
-    city = user_data.get("address", {}).get("city", "N/A")
-
-    markdown_profile_string = (
-        f"## User Profile: {name}\n\n"  # Main heading for the profile
-        f"**Username:** {username}\n\n"
-        f"**Email:** {email}\n\n"
-        f"**Phone:** {phone}\n\n"
-        f"**Website:** {website}\n\n"
-        f"**Company:** {company_name}\n\n"
-        f"**Location:** {city}\n\n"
-    )
-    return markdown_profile_string
+    logger.debug("format_user_profile called with user data for Markdown formatting.")
+    return render_profile(user_data_json)
+
+
+# --- Tool 2b: Format Several User Profiles at Once ---
+def format_user_profiles(users: List[Dict[str, Any]], mode: str = "markdown") -> str:
+    """
+    Formats several raw user objects (e.g. the 'users' list from fetch_users) in one call.
+
+    Args:
+        users (List[Dict[str, Any]]): The user objects to format.
+        mode (str): 'markdown' for one full profile per user, or 'table' for a
+                    compact Markdown table with one row per user.
+
+    Returns:
+        str: The formatted profiles in Markdown, or an error message string if the
+             mode is not supported.
+    """
+    logger.debug("format_user_profiles called for %d users in '%s' mode.", len(users), mode)
+    if mode not in RENDER_MODES:
+        return f"Error: Unsupported mode '{mode}'. Use one of: {', '.join(RENDER_MODES)}."
+    return "".join(render_profiles(users, mode))
+
+
+# --- Tool 3: Fetch and Format a Profile in One Step ---
+async def get_formatted_profile(user_id: int) -> str:
+    """
+    Fetches a user from JSONPlaceholder API and returns their profile formatted in Markdown.
+
+    This is the fused form of 'fetch_user_data' followed by 'format_user_profile':
+    the raw user JSON never has to pass back through the conversation.
+
+    Args:
+        user_id (int): The ID of the user to display (e.g., 1 to 10).
+
+    Returns:
+        str: A multi-line string representing the formatted user profile in Markdown,
+             or an error message string if the user could not be fetched.
+    """
+    logger.debug("get_formatted_profile called for user_id: %s", user_id)
+    result = await _fetch_user_cached(user_id)
+    if result["status"] != "success":
+        return f"Error: {result['message']}"
+    return render_profile(result["user_data"])
 
 
 # --- Agent Definition: User Profile Viewer Agent ---
@@ -82,11 +214,15 @@ root_agent = LlmAgent(
     model=GEMINI_MODEL,
     instruction=(
         "You are a helpful assistant that can retrieve and display user profiles. "
-        "When asked for a user's profile by ID, first use the 'fetch_user_data' tool to get the raw data. "
-        "Then, use the 'format_user_profile' tool to make it readable. "
+        "When asked for a user's profile by ID, use the 'get_formatted_profile' tool, which fetches the user "
+        "and returns the profile already formatted in Markdown, and present its output to the user as is. "
+        "When asked for several users at once, use the 'fetch_users' tool with all of the IDs in a single call "
+        "instead of calling a tool once per user, then use the 'format_user_profiles' tool once to make them all readable "
+        "(use mode 'table' for a compact overview of many users). "
+        "Only use 'fetch_user_data' when specific raw fields are needed rather than a profile. "
         "Finally, present the formatted user profile to the user. "
         "If fetching or formatting fails, inform the user about the error."
     ),
     description="Retrieves and formats user profile information from a mock API.",
-    tools=[fetch_user_data, format_user_profile]
+    tools=[get_formatted_profile, fetch_user_data, fetch_users, format_user_profile, format_user_profiles]
 )
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Offline throughput/latency benchmark for the user lookup tools.
+
+Compares four ways of fetching the same set of users from the local stand-in
+server (see `mock_server.py`):
+
+1. baseline     - a bare `requests.get` per user, one after another (the original tool)
+2. pooled       - `fetch_user_data` per user, one after another, over the shared pool
+3. fetch_users  - a single `fetch_users` call that fans out concurrently
+4. cached       - per-call `fetch_user_data` latency on hot IDs served from the user cache
+
+The cache is cleared before every round of modes 2 and 3 so they measure the network path.
+
+Run:
+    python -m function_tools.benchmark --users 10 --rounds 20 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Callable, List
+
+import requests
+
+from .mock_server import start_server
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(label: str, round_times: List[float], requests_per_round: int) -> None:
+    total = sum(round_times)
+    print(
+        f"{label:<12} rounds={len(round_times):<4} "
+        f"p50={_percentile(round_times, 50) * 1000:8.2f}ms "
+        f"p95={_percentile(round_times, 95) * 1000:8.2f}ms "
+        f"mean={statistics.fmean(round_times) * 1000:8.2f}ms "
+        f"throughput={requests_per_round * len(round_times) / total:8.1f} users/s"
+    )
+
+
+def _time_rounds(run_round: Callable[[], None], rounds: int) -> List[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run_round()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmark(num_users: int, rounds: int, latency_ms: float) -> None:
+    server, base_url = start_server(num_users=num_users, latency_ms=latency_ms)
+    os.environ["JSONPLACEHOLDER_BASE_URL"] = base_url
+
+    # Imported after the base URL is set so the shared client targets the stand-in server.
+    from . import agent
+    from .http_client import close_client
+
+    user_ids = list(range(1, num_users + 1))
+    print(f"Stand-in server at {base_url}; {num_users} users per round, {latency_ms}ms injected latency\n")
+
+    def baseline_round():
+        for user_id in user_ids:
+            requests.get(f"{base_url}/users/{user_id}").json()
+
+    _report("baseline", _time_rounds(baseline_round, rounds), num_users)
+
+    loop = asyncio.new_event_loop()
+    try:
+        async def pooled_sequential():
+            agent.user_cache.clear()
+            for user_id in user_ids:
+                await agent.fetch_user_data(user_id)
+
+        _report("pooled", _time_rounds(lambda: loop.run_until_complete(pooled_sequential()), rounds), num_users)
+
+        async def batch():
+            agent.user_cache.clear()
+            await agent.fetch_users(user_ids)
+
+        _report("fetch_users", _time_rounds(lambda: loop.run_until_complete(batch()), rounds), num_users)
+
+        # Hot IDs: warm the cache once, then time individual tool calls.
+        loop.run_until_complete(batch())
+
+        async def hot_call_timings():
+            timings = []
+            for _ in range(rounds):
+                for user_id in user_ids:
+                    start = time.perf_counter()
+                    await agent.fetch_user_data(user_id)
+                    timings.append(time.perf_counter() - start)
+            return timings
+
+        call_times = loop.run_until_complete(hot_call_timings())
+        print(
+            f"{'cached':<12} calls={len(call_times):<5} "
+            f"p50={_percentile(call_times, 50) * 1e6:8.2f}us "
+            f"p95={_percentile(call_times, 95) * 1e6:8.2f}us  cache={agent.user_cache.stats()}"
+        )
+        loop.run_until_complete(close_client())
+    finally:
+        loop.close()
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark user lookup tools against a local stand-in server.")
+    parser.add_argument("--users", type=int, default=10, help="Users fetched per round.")
+    parser.add_argument("--rounds", type=int, default=20, help="Number of timed rounds per mode.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latency injected by the server.")
+    args = parser.parse_args()
+    run_benchmark(args.users, args.rounds, args.latency_ms)
+
+
+if __name__ == "__main__":
+    main()
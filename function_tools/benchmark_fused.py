@@ -0,0 +1,98 @@
+"""
+Model-turn benchmark: two-step fetch/format flow vs. the fused get_formatted_profile tool.
+
+Both agents run against a scripted stand-in model (see `common/mock_llm.py`) that
+behaves the way Gemini does with each instruction, and against the local stand-in
+user server, so the comparison is deterministic and offline. Reports model calls
+and estimated prompt/completion tokens per profile request.
+
+Run:
+    python -m function_tools.benchmark_fused --requests 10
+"""
+
+import argparse
+import asyncio
+import os
+import re
+
+from google.adk.agents import LlmAgent
+
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm, function_call_response, last_function_response, last_user_text
+
+from .mock_server import start_server
+
+# The instruction the agent used before the fused tool existed.
+TWO_STEP_INSTRUCTION = (
+    "You are a helpful assistant that can retrieve and display user profiles. "
+    "When asked for a user's profile by ID, first use the 'fetch_user_data' tool to get the raw data. "
+    "Then, use the 'format_user_profile' tool to make it readable. "
+    "Finally, present the formatted user profile to the user. "
+    "If fetching or formatting fails, inform the user about the error."
+)
+
+
+def _requested_user_id(llm_request) -> int:
+    match = re.search(r"\d+", last_user_text(llm_request))
+    return int(match.group()) if match else 1
+
+
+def two_step_responder(llm_request):
+    response = last_function_response(llm_request)
+    if response is None:
+        return function_call_response("fetch_user_data", {"user_id": _requested_user_id(llm_request)})
+    if response.name == "fetch_user_data":
+        return function_call_response("format_user_profile", {"user_data_json": response.response["user_data"]})
+    return response.response["result"]
+
+
+def fused_responder(llm_request):
+    response = last_function_response(llm_request)
+    if response is None:
+        return function_call_response("get_formatted_profile", {"user_id": _requested_user_id(llm_request)})
+    return response.response["result"]
+
+
+async def _measure(label: str, agent: LlmAgent, model: ScriptedLlm, num_requests: int) -> None:
+    for i in range(num_requests):
+        await run_agent(agent, f"Show me the profile for user {i % 10 + 1}")
+    print(
+        f"{label:<10} model_calls/request={model.calls / num_requests:5.2f} "
+        f"prompt_tokens/request={model.prompt_tokens / num_requests:8.1f} "
+        f"completion_tokens/request={model.completion_tokens / num_requests:7.1f}"
+    )
+
+
+async def run_benchmark(num_requests: int) -> None:
+    server, base_url = start_server()
+    os.environ["JSONPLACEHOLDER_BASE_URL"] = base_url
+    from . import agent  # Imported after the base URL is set
+    from .http_client import close_client
+
+    two_step_model = ScriptedLlm(responder=two_step_responder)
+    two_step_agent = LlmAgent(
+        name="UserProfileViewerTwoStep",
+        model=two_step_model,
+        instruction=TWO_STEP_INSTRUCTION,
+        tools=[agent.fetch_user_data, agent.format_user_profile],
+    )
+    fused_model = ScriptedLlm(responder=fused_responder)
+    fused_agent = agent.root_agent.clone(update={"model": fused_model})
+
+    try:
+        await _measure("two-step", two_step_agent, two_step_model, num_requests)
+        await _measure("fused", fused_agent, fused_model, num_requests)
+    finally:
+        await close_client()
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare model turns for the two-step and fused profile flows.")
+    parser.add_argument("--requests", type=int, default=10, help="Profile requests per flow.")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.requests))
+
+
+if __name__ == "__main__":
+    main()
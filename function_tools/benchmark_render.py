@@ -0,0 +1,78 @@
+"""
+Micro-benchmark: per-profile formatting calls vs. the streaming bulk renderer.
+
+For each record count, compares:
+
+1. per-profile  - one `format_user_profile` tool call per user, joined into a report
+2. bulk-join    - `render_profiles` joined into a single report string
+3. bulk-stream  - `render_profiles` chunks written straight to a sink (nothing retained)
+4. table-stream - `render_profiles(mode="table")` written straight to a sink
+
+Peak memory is measured with tracemalloc (the input records are built beforehand
+and not counted).
+
+Run:
+    python -m function_tools.benchmark_render --sizes 10 1000 100000
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from typing import Callable, List
+
+from .agent import format_user_profile
+from .mock_server import make_user
+from .rendering import render_profiles
+
+
+def _measure(label: str, size: int, run: Callable[[], None]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<13} n={size:<7} total={elapsed * 1000:10.2f}ms "
+        f"per_record={elapsed / size * 1e6:7.2f}us peak_mem={peak / 1024:10.1f}KiB"
+    )
+
+
+def run_benchmark(sizes: List[int]) -> None:
+    with open(os.devnull, "w") as sink:
+        for size in sizes:
+            users = [make_user(user_id) for user_id in range(1, size + 1)]
+
+            def per_profile():
+                "".join([format_user_profile(user) for user in users])
+
+            def bulk_join():
+                "".join(render_profiles(users))
+
+            def bulk_stream():
+                write = sink.write
+                for chunk in render_profiles(users):
+                    write(chunk)
+
+            def table_stream():
+                write = sink.write
+                for chunk in render_profiles(users, mode="table"):
+                    write(chunk)
+
+            _measure("per-profile", size, per_profile)
+            _measure("bulk-join", size, bulk_join)
+            _measure("bulk-stream", size, bulk_stream)
+            _measure("table-stream", size, table_stream)
+            print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-profile vs. bulk profile rendering.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000], help="Record counts to test.")
+    args = parser.parse_args()
+    run_benchmark(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Bounded in-process async cache with per-entry TTL, LRU eviction and
+stale-while-revalidate.
+
+- Fresh entries are returned immediately.
+- Expired entries that are still inside the stale window are returned immediately
+  as well, while a single background task refreshes them.
+- Concurrent misses for the same key share one in-flight fetch. Each fetch runs in its
+  own task, so a caller that is cancelled only stops waiting: the fetch still completes,
+  is cached and is returned to the other callers.
+- The TTL of each entry is decided per value, so negative results (e.g. "not found")
+  can be cached briefly and transient errors not at all.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    expires_at: float      # After this the entry is stale
+    stale_until: float     # After this the entry is unusable and must be refetched
+
+
+class AsyncTTLCache:
+    """
+    LRU cache whose values are produced by async fetchers.
+
+    Args:
+        max_entries (int): Maximum number of entries kept; the least recently used
+                           entry is evicted when the cache is full.
+        stale_seconds (float): How long past its TTL an entry may still be served
+                               while it is being refreshed in the background.
+        ttl_for (Callable[[Any], Optional[float]]): Returns the TTL in seconds for a
+                               fetched value, or None if the value must not be cached.
+        clock (Callable[[], float]): Time source, monotonic by default.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        stale_seconds: float,
+        ttl_for: Callable[[Any], Optional[float]],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
+        self._ttl_for = ttl_for
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._fetch_tasks: Set[asyncio.Task] = set()  # Strong refs so fetches are not GC'd mid-flight
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the cached value for `key`, calling `fetch` on a miss.
+
+        Args:
+            key (Hashable): The cache key.
+            fetch (Callable[[], Awaitable[Any]]): Produces a fresh value for `key`.
+
+        Returns:
+            Any: The cached or freshly fetched value.
+        """
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.expires_at:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._in_flight:
+                    self._start_fetch(key, fetch, refresh=True)
+                return entry.value
+
+        self.misses += 1
+        task = self._in_flight.get(key) or self._start_fetch(key, fetch)
+        # shield: cancelling this caller must not cancel the fetch other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], refresh: bool = False) -> asyncio.Task:
+        """Runs `fetch` in its own task and caches its value. A failed refresh keeps the stale entry."""
+
+        async def run() -> Any:
+            value = await fetch()
+            if refresh:
+                self.refreshes += 1
+            self._store(key, value)
+            return value
+
+        def done(task: asyncio.Task) -> None:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
+            self._fetch_tasks.discard(task)
+            if not task.cancelled():
+                task.exception()  # Mark as retrieved when nobody is waiting (e.g. a failed refresh)
+
+        task = asyncio.ensure_future(run())
+        self._in_flight[key] = task
+        self._fetch_tasks.add(task)
+        task.add_done_callback(done)
+        return task
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        ttl = self._ttl_for(value)
+        if ttl is None or ttl <= 0:
+            return
+        now = self._clock()
+        self._entries[key] = _CacheEntry(value, now + ttl, now + ttl + self.stale_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drops a single entry from the cache."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops all entries; counters are kept."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns cache counters for sizing and monitoring.
+
+        Returns:
+            Dict[str, Any]: Entry count, capacity, hit/stale-hit/miss/eviction/refresh
+                            counters and the overall hit ratio (stale hits count as hits).
+        """
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,100 @@
+"""
+Shared, pooled HTTP client for the JSONPlaceholder user API.
+
+Every tool call goes through one `httpx.AsyncClient`, so TCP/TLS connections are
+kept alive and reused instead of being re-established per request. Requests have
+explicit timeouts and transient failures (connection errors, timeouts, 429/5xx)
+are retried a bounded number of times with exponential backoff and jitter.
+
+The base URL can be pointed at the local stand-in server (see `mock_server.py`)
+through the JSONPLACEHOLDER_BASE_URL environment variable.
+"""
+
+import asyncio
+import os
+import random
+from typing import Any, Optional
+
+import httpx
+
+DEFAULT_BASE_URL = "https://jsonplaceholder.typicode.com"
+
+# --- Client Settings ---
+REQUEST_TIMEOUT = httpx.Timeout(5.0, connect=2.0)  # Seconds; connect gets a tighter bound
+CONNECTION_LIMITS = httpx.Limits(
+    max_connections=20,            # Upper bound on sockets open to the API at once
+    max_keepalive_connections=10,  # Idle sockets kept warm for the next request
+    keepalive_expiry=30.0,
+)
+MAX_RETRIES = 3            # Retries on top of the first attempt
+BACKOFF_BASE_SECONDS = 0.2  # Delay before the first retry, doubled on each further retry
+BACKOFF_MAX_SECONDS = 2.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared AsyncClient, creating it on first use.
+
+    httpx connection pools are bound to the event loop they were created on, so a
+    new client is built if the running loop has changed (e.g. between separate
+    `asyncio.run` calls in scripts).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            base_url=os.environ.get("JSONPLACEHOLDER_BASE_URL", DEFAULT_BASE_URL),
+            timeout=REQUEST_TIMEOUT,
+            limits=CONNECTION_LIMITS,
+            headers={"Accept": "application/json"},
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    """Closes the shared client and its pooled connections."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+async def get_json(path: str) -> Any:
+    """
+    Performs a GET request on the shared client and returns the decoded JSON body.
+
+    Args:
+        path (str): The request path relative to the API base URL (e.g. '/users/1').
+
+    Returns:
+        Any: The decoded JSON response.
+
+    Raises:
+        httpx.HTTPStatusError: For non-retryable error statuses (e.g. 404), or a
+                               retryable status that persisted through all retries.
+        httpx.TransportError: If the request kept failing at the transport level.
+    """
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await client.get(path)
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                await asyncio.sleep(_backoff_delay(attempt))
+                continue
+            response.raise_for_status()  # Raise an HTTPStatusError for bad responses (4xx or 5xx)
+            return response.json()
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(_backoff_delay(attempt))
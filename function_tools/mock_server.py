@@ -0,0 +1,122 @@
+"""
+Local stand-in for the JSONPlaceholder /users endpoint.
+
+Serves deterministic user objects shaped like JSONPlaceholder's so the tools can be
+exercised and benchmarked offline. It speaks HTTP/1.1 with keep-alive so connection
+reuse in the pooled client is visible in measurements.
+
+Run standalone:
+    python -m function_tools.mock_server --port 8765 --latency-ms 20
+
+Then point the tools at it:
+    JSONPLACEHOLDER_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+USER_PATH_PATTERN = re.compile(r"^/users/(\d+)/?$")
+
+
+def make_user(user_id: int) -> Dict[str, Any]:
+    """Builds a deterministic JSONPlaceholder-style user object for the given ID."""
+    return {
+        "id": user_id,
+        "name": f"Test User {user_id}",
+        "username": f"user{user_id}",
+        "email": f"user{user_id}@example.com",
+        "address": {
+            "street": f"{user_id} Main Street",
+            "suite": f"Apt. {100 + user_id}",
+            "city": f"City {user_id % 7}",
+            "zipcode": f"{10000 + user_id}",
+            "geo": {"lat": f"{user_id * 1.5:.4f}", "lng": f"{-user_id * 2.5:.4f}"},
+        },
+        "phone": f"1-555-{user_id:04d} x{user_id}",
+        "website": f"user{user_id}.example.org",
+        "company": {
+            "name": f"Company {user_id % 3}",
+            "catchPhrase": "Synergized local throughput",
+            "bs": "harness offline benchmarks",
+        },
+    }
+
+
+def _make_handler(num_users: int, latency_s: float):
+    """Creates a request handler class bound to the server's settings."""
+
+    # Bodies are pre-encoded once; the server should never be the bottleneck.
+    bodies = {user_id: json.dumps(make_user(user_id)).encode("utf-8") for user_id in range(1, num_users + 1)}
+    not_found_body = b"{}"
+
+    class UserRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Enables keep-alive
+        disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+        def do_GET(self):
+            if latency_s:
+                time.sleep(latency_s)
+            match = USER_PATH_PATTERN.match(self.path)
+            body = bodies.get(int(match.group(1))) if match else None
+            status = 200 if body is not None else 404
+            body = body if body is not None else not_found_body
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+    return UserRequestHandler
+
+
+def start_server(
+    host: str = "127.0.0.1", port: int = 0, num_users: int = 10, latency_ms: float = 0.0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Starts the stand-in server on a background thread.
+
+    Args:
+        host (str): Interface to bind to.
+        port (int): Port to bind to; 0 picks a free port.
+        num_users (int): Users with IDs 1..num_users exist; other IDs return 404.
+        latency_ms (float): Artificial delay added to every response.
+
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: The running server (call `shutdown()` to stop it)
+                                         and its base URL.
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(num_users, latency_ms / 1000.0))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}"
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local JSONPlaceholder /users stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--num-users", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server, base_url = start_server(args.host, args.port, args.num_users, args.latency_ms)
+    print(f"Serving {args.num_users} users at {base_url}/users/<id> (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
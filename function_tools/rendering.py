@@ -0,0 +1,98 @@
+"""
+Markdown rendering for user profiles, single and bulk.
+
+The profile layout is compiled once into bound `str.format` templates. Bulk
+rendering is a generator that yields one chunk per user (plus a header in
+table mode), so reports over hundreds of thousands of users can be streamed to a
+file or response without building the whole document in memory.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+RENDER_MODES = ("markdown", "table")
+
+# --- Precompiled Templates ---
+_PROFILE_TEMPLATE = (
+    "## User Profile: {0}\n\n"  # Main heading for the profile
+    "**Username:** {1}\n\n"
+    "**Email:** {2}\n\n"
+    "**Phone:** {3}\n\n"
+    "**Website:** {4}\n\n"
+    "**Company:** {5}\n\n"
+    "**Location:** {6}\n\n"
+).format
+_TABLE_HEADER = (
+    "| Name | Username | Email | Phone | Website | Company | Location |\n"
+    "|---|---|---|---|---|---|---|\n"
+)
+_TABLE_ROW_TEMPLATE = "| {0} | {1} | {2} | {3} | {4} | {5} | {6} |\n".format
+_EMPTY: Dict[str, Any] = {}
+
+
+def _profile_fields(user_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Extracts the displayed fields of a user in template order, with 'N/A' for missing ones."""
+    get = user_data.get
+    return (
+        get("name", "N/A"),
+        get("username", "N/A"),
+        get("email", "N/A"),
+        get("phone", "N/A").split(" ", 1)[0],  # Take only the first part if multiple numbers
+        get("website", "N/A"),
+        (get("company") or _EMPTY).get("name", "N/A"),
+        (get("address") or _EMPTY).get("city", "N/A"),
+    )
+
+
+def _table_cell(value: Any) -> str:
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def render_profile(user_data: Dict[str, Any]) -> str:
+    """
+    Renders a single user dict as a Markdown profile.
+
+    Args:
+        user_data (Dict[str, Any]): A JSONPlaceholder-style user object.
+
+    Returns:
+        str: The Markdown profile, or an error message string if the input is not a dict.
+    """
+    if not isinstance(user_data, dict):
+        return "Error: Invalid user data provided for Markdown formatting."
+    return _PROFILE_TEMPLATE(*_profile_fields(user_data))
+
+
+def _render_markdown(users: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for user_data in users:
+        if isinstance(user_data, dict):
+            yield _PROFILE_TEMPLATE(*_profile_fields(user_data))
+
+
+def _render_table(users: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    yield _TABLE_HEADER
+    for user_data in users:
+        if isinstance(user_data, dict):
+            yield _TABLE_ROW_TEMPLATE(*map(_table_cell, _profile_fields(user_data)))
+
+
+def render_profiles(users: Iterable[Dict[str, Any]], mode: str = "markdown") -> Iterator[str]:
+    """
+    Lazily renders many user dicts, yielding one Markdown chunk per user.
+
+    The mode is checked when this is called, not when the first chunk is requested.
+
+    Args:
+        users (Iterable[Dict[str, Any]]): User objects; consumed one at a time.
+        mode (str): 'markdown' for full profiles, or 'table' for a compact Markdown
+                    table (the header row is yielded first).
+
+    Returns:
+        Iterator[str]: Rendered chunks, ready to be written out in order. Entries
+                       that are not dicts are skipped.
+
+    Raises:
+        ValueError: If `mode` is not one of RENDER_MODES.
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode {mode!r}; expected one of {RENDER_MODES}")
+    return _render_table(users) if mode == "table" else _render_markdown(users)
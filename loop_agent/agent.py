@@ -7,16 +7,27 @@ The goal is to iteratively refine a recipe based on feedback, such as making it
 Use Case: Start with a basic recipe, have a "critic" agent provide feedback, and a "refiner" agent update the recipe based on the feedback, looping until the critic gives an "all clear."
 """
 
+import logging
+
 from google.adk.agents import LoopAgent, LlmAgent, SequentialAgent
 from google.adk.tools.tool_context import ToolContext
 
-GEMINI_MODEL = "gemini-2.0-flash"
+from common.history_compaction import HistoryCompactor
+from common.models import configured_model
+from common.prompt_cache import split_static_instructions
+
+from .budget import BudgetGate, close_loop_iteration, record_model_usage, start_budget_clock
+from .gates import CritiqueApprovalGate, RecipeConvergenceGate
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = configured_model("gemini-2.0-flash") # Override with the GEMINI_MODEL env var
 
 # --- Tool Definition ---
 # This tool signals the LoopAgent to exit
 def exit_loop(tool_context: ToolContext):
     """Call this function ONLY when the critique indicates no further changes are needed, signaling the iterative process should end."""
-    print(f"  [Tool Call] exit_loop triggered by {tool_context.agent_name}")
+    logger.debug("exit_loop triggered by %s", tool_context.agent_name)
     tool_context.actions.escalate = True # This tells the LoopAgent to exit
     return {} # Tools should typically return JSON-serializable output
 
@@ -34,7 +45,8 @@ Include very basic ingredients and steps (3-5 items each).
 Output *only* the recipe text. Do not add introductions or explanations.
 """,
     description="Writes the initial recipe draft based on the provided dish topic.",
-    output_key="current_recipe" # Stores output in state['current_recipe']
+    output_key="current_recipe", # Stores output in state['current_recipe']
+    after_model_callback=record_model_usage # Adds token usage to state['budget_usage']
 )
 
 # STEP 2a: Recipe Critic Agent (Inside the Refinement Loop)
@@ -59,7 +71,8 @@ Respond *exactly* with the phrase "Recipe looks great!" and nothing else. Avoid
 Do not add explanations. Output only the critique OR the exact completion phrase.
 """,
     description="Reviews the current recipe draft, providing critique or signaling completion.",
-    output_key="critique_feedback" # Stores output in state['critique_feedback']
+    output_key="critique_feedback", # Stores output in state['critique_feedback']
+    after_model_callback=record_model_usage
 )
 
 # STEP 2b: Recipe Refiner Agent (Inside the Refinement Loop)
@@ -86,18 +99,61 @@ Do not add explanations. Either output the refined recipe OR call the exit_loop
 """,
     description="Refines the recipe based on critique, or calls exit_loop if critique indicates completion.",
     tools=[exit_loop], # Provide the exit_loop tool
-    output_key="current_recipe" # Overwrites state['current_recipe'] with the refined version
+    output_key="current_recipe", # Overwrites state['current_recipe'] with the refined version
+    after_model_callback=record_model_usage
+)
+
+# STEP 2c: Deterministic loop gates (no model calls)
+# Exits as soon as the critique is exactly "Recipe looks great!", so the refiner is not called just to exit.
+critique_gate_in_loop = CritiqueApprovalGate(
+    name="CritiqueApprovalGate",
+    description="Ends the loop when the critic approves the recipe.",
+)
+# Exits when the refiner stopped changing the recipe meaningfully since the previous iteration.
+convergence_gate_in_loop = RecipeConvergenceGate(
+    name="RecipeConvergenceGate",
+    description="Ends the loop when the recipe has converged.",
+)
+
+# STEP 2d: Budget gates (no model calls)
+# Stop the loop with the best recipe so far once the run's state['loop_budget'] (deadline, tokens
+# or model calls) is spent. The first one also records per-iteration usage in state['loop_iterations'].
+iteration_budget_gate_in_loop = BudgetGate(
+    name="IterationBudgetGate",
+    description="Checks the run budget and records per-iteration usage at the start of each iteration.",
+    opens_iteration=True,
+)
+refinement_budget_gate_in_loop = BudgetGate(
+    name="RefinementBudgetGate",
+    description="Checks the run budget before the recipe is refined.",
+)
+
+# STEP 2e: History compaction (no model calls)
+# The critic and refiner read the latest recipe and critique from state, so earlier drafts and critiques
+# in the session history are superseded. Compacts them at the start of each iteration, keeping the prompt
+# bounded to about one iteration (see common/history_compaction.py).
+history_compactor_in_loop = HistoryCompactor(
+    name="RecipeHistoryCompactor",
+    description="Compacts superseded recipe drafts and critiques from earlier iterations.",
+    output_keys=["current_recipe", "critique_feedback"],
 )
 
 # STEP 2: Recipe Refinement Loop Agent
 refinement_loop = LoopAgent(
     name="RecipeRefinementLoop",
-    # Agent order is crucial: Critic first, then Refine/Exit
+    # Agent order is crucial: Budget check, history compaction, convergence check, Critic, Approval and
+    # budget checks, then Refine/Exit
     sub_agents=[
+        iteration_budget_gate_in_loop,
+        history_compactor_in_loop,
+        convergence_gate_in_loop,
         critic_agent_in_loop,
+        critique_gate_in_loop,
+        refinement_budget_gate_in_loop,
         refiner_agent_in_loop,
     ],
-    max_iterations=5 # Limit loops to prevent infinite loops
+    max_iterations=5, # Limit loops to prevent infinite loops
+    after_agent_callback=close_loop_iteration # Closes the last per-iteration usage record
 )
 
 # STEP 3: Overall Sequential Pipeline
@@ -108,5 +164,11 @@ root_agent = SequentialAgent(
         initial_recipe_writer_agent, # Run first to create initial recipe
         refinement_loop              # Then run the critique/refine loop
     ],
-    description="Writes an initial recipe and then iteratively refines it based on feedback."
-)
\ No newline at end of file
+    description="Writes an initial recipe and then iteratively refines it based on feedback.",
+    before_agent_callback=start_budget_clock # Starts the run's budget clock and usage counters
+)
+
+# The critic and refiner instructions are the same text on every iteration except for the recipe and
+# critique blocks. Sends the fixed text as a static, cacheable system instruction and only the
+# {placeholder} blocks per call (see common/prompt_cache.py).
+split_static_instructions(root_agent)
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Model-call benchmark for the Recipe Refinement Loop with and without its deterministic and budget gates.
+
+Runs the pipeline against a scripted stand-in model (see `common/mock_llm.py`) in
+three scenarios:
+
+- approve: the critic asks for two changes, then answers "Recipe looks great!"
+- no-op:   the critic keeps asking for changes but the refiner returns the recipe unchanged
+- budget:  the critic never approves; the run declares a budget of 6 model calls
+
+A second table measures history compaction (see `common/history_compaction.py`) on a
+run where the critic never approves, so the loop runs all of its iterations. Per
+iteration it shows the critic's and refiner's prompt tokens, with compaction on and off.
+
+Run:
+    python -m loop_agent.benchmark                  # Every scenario, then the compaction table
+    python -m loop_agent.benchmark gates --scenario budget
+    python -m loop_agent.benchmark compaction
+"""
+
+import argparse
+import asyncio
+import os
+import re
+from collections import defaultdict
+from typing import Sequence
+
+from google.adk.agents import LoopAgent, SequentialAgent
+
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm, function_call_response, last_function_response, request_prompt_text, with_model
+from common.tokens import estimate_tokens
+
+from . import agent
+from .budget import OPEN_ITERATION_KEY
+from .gates import COMPLETION_PHRASE
+
+SCENARIOS = ("approve", "no-op", "budget")
+INITIAL_RECIPE = "Tomato Soup\nIngredients: tomatoes, water, salt\nSteps: chop, boil, blend"
+CRITIQUES = ["Add more vegetables, such as carrots and celery.", "Specify the simmering time and temperature."]
+
+
+def _section(prompt: str, heading: str) -> str:
+    # A section ends at the next heading, at the end of ADK's dynamic instruction block or at the end of the prompt
+    match = re.search(rf"\*\*{re.escape(heading)}\*\*\s*\n(.*?)(?:\n\*\*|\n<<<|\Z)", prompt, re.S)
+    return match.group(1).strip() if match else ""
+
+
+def make_responder(scenario: str):
+    """Builds a responder that plays writer, critic and refiner for the given scenario."""
+    critic_turns = [0]
+
+    def respond(llm_request):
+        prompt = request_prompt_text(llm_request)
+        if "Culinary Critic" in prompt:
+            critic_turns[0] += 1
+            if scenario == "approve" and critic_turns[0] > len(CRITIQUES):
+                return COMPLETION_PHRASE
+            return f"{CRITIQUES[(critic_turns[0] - 1) % len(CRITIQUES)]} (round {critic_turns[0]})"
+        if "Recipe Refinement Assistant" in prompt:
+            if last_function_response(llm_request) is not None:
+                return ""  # exit_loop already ran; nothing left to say
+            recipe = _section(prompt, "Current Recipe:")
+            critique = _section(prompt, "Critique/Suggestions:")
+            if critique == COMPLETION_PHRASE:
+                return function_call_response("exit_loop")
+            return recipe if scenario == "no-op" else f"{recipe}\nRevision: {critique}"
+        return INITIAL_RECIPE
+
+    return respond
+
+
+def build_pipeline(model: ScriptedLlm, gated: bool) -> SequentialAgent:
+    """Builds a copy of the pipeline on the scripted model, optionally without the gates."""
+    if gated:
+        return with_model(agent.root_agent, model)
+    return SequentialAgent(
+        name="RecipeOptimizationPipeline",
+        sub_agents=[
+            agent.initial_recipe_writer_agent.clone(update={"model": model}),
+            LoopAgent(
+                name="RecipeRefinementLoop",
+                sub_agents=[
+                    agent.critic_agent_in_loop.clone(update={"model": model}),
+                    agent.refiner_agent_in_loop.clone(update={"model": model}),
+                ],
+                max_iterations=5,
+            ),
+        ],
+    )
+
+
+async def run_benchmark(scenarios: Sequence[str] = SCENARIOS) -> None:
+    for scenario in scenarios:
+        initial_state = {"loop_budget": {"max_model_calls": 6}} if scenario == "budget" else None
+        for gated in (False, True):
+            model = ScriptedLlm(responder=make_responder(scenario))
+            result = await run_agent(build_pipeline(model, gated), "Tomato soup", initial_state=initial_state)
+            print(
+                f"{scenario:<8} {'gated' if gated else 'baseline':<9} model_calls={model.calls:<3} "
+                f"prompt_tokens={model.prompt_tokens:<6} exit_reason={result.state.get('loop_exit_reason') or 'exit_loop/max'}"
+            )
+            if scenario == "budget" and gated:
+                for iteration in result.state.get("loop_iterations", []):
+                    print(f"    {iteration}")
+                print(f"    final response: {result.final_text.splitlines()[-1]!r}")
+
+
+def make_probe(samples):
+    """A before_model_callback recording (iteration, agent, prompt tokens) per model call."""
+
+    def probe(callback_context, llm_request):
+        open_iteration = callback_context.state.get(OPEN_ITERATION_KEY) or {}
+        samples.append((
+            open_iteration.get("iteration", 0),
+            callback_context.agent_name,
+            estimate_tokens(request_prompt_text(llm_request)),
+        ))
+
+    return probe
+
+
+async def run_compaction_benchmark() -> None:
+    print("\nhistory compaction (critic never approves; per iteration)")
+    for compaction in ("off", "on"):
+        os.environ["HISTORY_COMPACTION"] = compaction
+        model = ScriptedLlm(responder=make_responder("long"))
+        pipeline = with_model(agent.root_agent, model)
+        samples = []
+        for name in ("RecipeCriticAgent", "RecipeRefinerAgent"):
+            pipeline.find_agent(name).before_model_callback = make_probe(samples)
+        result = await run_agent(pipeline, "Tomato soup")
+        per_iteration = defaultdict(dict)
+        for iteration, name, prompt_tokens in samples:
+            per_iteration[iteration][name] = prompt_tokens
+        print(f"  compaction={compaction}: model_calls={model.calls} prompt_tokens={model.prompt_tokens} "
+              f"stored_session_events={len(result.events)}")
+        for iteration, row in sorted(per_iteration.items()):
+            print(
+                f"    iteration {iteration}: critic_prompt={row.get('RecipeCriticAgent', 0):<5} "
+                f"refiner_prompt={row.get('RecipeRefinerAgent', 0)}"
+            )
+    os.environ.pop("HISTORY_COMPACTION")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the recipe loop's gates and history compaction.")
+    parser.add_argument(
+        "benchmark", nargs="?", choices=("all", "gates", "compaction"), default="all",
+        help="gates: model calls with and without the gates; compaction: prompt tokens per iteration.",
+    )
+    parser.add_argument(
+        "--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="Gate scenarios to run."
+    )
+    args = parser.parse_args()
+    if args.benchmark in ("all", "gates"):
+        asyncio.run(run_benchmark(args.scenario))
+    if args.benchmark in ("all", "compaction"):
+        asyncio.run(run_compaction_benchmark())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Budget-aware termination and per-iteration accounting for the Recipe Refinement Loop.
+
+A run can declare a budget in session state under 'loop_budget', e.g. by passing it as
+initial state or a `state_delta`:
+
+    {"loop_budget": {"deadline_seconds": 30, "max_tokens": 20000, "max_model_calls": 8}}
+
+Every key is optional; without a budget the loop only does the accounting.
+
+- `start_budget_clock` (before_agent_callback on the pipeline) starts the clock,
+  resets the counters in state['budget_usage'] and clears the previous turn's exit
+  reason and convergence snapshot (see gates.py).
+- `record_model_usage` (after_model_callback on each LlmAgent) adds each model
+  call's token usage to state['budget_usage'].
+- `BudgetGate` (a non-LLM agent inside the loop) stops the loop when any budget is
+  spent, or when the next iteration would not fit in what is left. It then returns
+  the best recipe so far as the final response. At the start of an iteration it also
+  closes the previous iteration's record in state['loop_iterations'].
+- `close_loop_iteration` (after_agent_callback on the loop) closes the final record.
+"""
+
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from .gates import EXIT_REASON_KEY, SNAPSHOT_KEY
+
+logger = logging.getLogger(__name__)
+
+BUDGET_KEY = "loop_budget"
+USAGE_KEY = "budget_usage"
+ITERATIONS_KEY = "loop_iterations"
+OPEN_ITERATION_KEY = "loop_open_iteration"
+USAGE_COUNTERS = ("model_calls", "prompt_tokens", "completion_tokens", "total_tokens")
+
+
+def start_budget_clock(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Starts the run's budget clock and resets per-run state (before_agent_callback on the pipeline)."""
+    state = callback_context.state
+    state[USAGE_KEY] = {"started_at": time.time(), **{counter: 0 for counter in USAGE_COUNTERS}}
+    state[ITERATIONS_KEY] = []
+    state[OPEN_ITERATION_KEY] = None
+    state[SNAPSHOT_KEY] = None  # Otherwise the next turn's first iteration compares against the last turn's recipe
+    state[EXIT_REASON_KEY] = None
+    state["budget_exhausted"] = None
+    return None
+
+
+def record_model_usage(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """Adds a completed model call's token usage to state['budget_usage'] (after_model_callback)."""
+    if llm_response.partial:
+        return None  # Streaming chunks are counted once, on the final response
+    usage = dict(callback_context.state.get(USAGE_KEY) or {"started_at": time.time()})
+    metadata = llm_response.usage_metadata
+    prompt_tokens = (metadata.prompt_token_count or 0) if metadata else 0
+    completion_tokens = (metadata.candidates_token_count or 0) if metadata else 0
+    usage["model_calls"] = usage.get("model_calls", 0) + 1
+    usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + prompt_tokens
+    usage["completion_tokens"] = usage.get("completion_tokens", 0) + completion_tokens
+    usage["total_tokens"] = usage.get("total_tokens", 0) + (
+        (metadata.total_token_count if metadata and metadata.total_token_count else prompt_tokens + completion_tokens)
+    )
+    callback_context.state[USAGE_KEY] = usage  # Reassign so the change is recorded as a state delta
+    return None
+
+
+def _close_iteration(state: Dict[str, Any], now: float) -> Optional[List[Dict[str, Any]]]:
+    """Returns the iteration list with the open iteration closed, or None if none is open."""
+    open_iteration = state.get(OPEN_ITERATION_KEY)
+    if not open_iteration:
+        return None
+    usage = state.get(USAGE_KEY) or {}
+    start_usage = open_iteration["usage_at_start"]
+    record = {
+        "iteration": open_iteration["iteration"],
+        "latency_ms": round((now - open_iteration["started_at"]) * 1000, 1),
+        **{counter: usage.get(counter, 0) - start_usage.get(counter, 0) for counter in USAGE_COUNTERS},
+    }
+    return list(state.get(ITERATIONS_KEY) or []) + [record]
+
+
+def close_loop_iteration(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Closes the last iteration's accounting record when the loop ends (after_agent_callback on the loop)."""
+    iterations = _close_iteration(callback_context.state, time.time())
+    if iterations is not None:
+        callback_context.state[ITERATIONS_KEY] = iterations
+        callback_context.state[OPEN_ITERATION_KEY] = None
+    return None
+
+
+def exhausted_budget(budget: Dict[str, Any], usage: Dict[str, Any], iterations: List[Dict[str, Any]], now: float) -> Optional[str]:
+    """
+    Checks a budget against usage so far.
+
+    A budget counts as exhausted when it is used up, or when the average cost of the
+    iterations completed so far no longer fits in what remains (so the loop never
+    starts an iteration it cannot afford to finish).
+
+    Returns:
+        Optional[str]: The name of the exhausted budget ('deadline_seconds',
+                       'max_tokens' or 'max_model_calls'), or None.
+    """
+    elapsed = now - usage.get("started_at", now)
+    spent = {
+        "deadline_seconds": elapsed,
+        "max_tokens": usage.get("total_tokens", 0),
+        "max_model_calls": usage.get("model_calls", 0),
+    }
+    per_iteration_cost = {}
+    if iterations:
+        per_iteration_cost = {
+            "deadline_seconds": sum(i["latency_ms"] for i in iterations) / 1000 / len(iterations),
+            "max_tokens": sum(i["total_tokens"] for i in iterations) / len(iterations),
+            "max_model_calls": sum(i["model_calls"] for i in iterations) / len(iterations),
+        }
+    for name, used in spent.items():
+        limit = budget.get(name)
+        if limit is None:
+            continue
+        if used >= limit or used + per_iteration_cost.get(name, 0) > limit:
+            return name
+    return None
+
+
+class BudgetGate(BaseAgent):
+    """
+    Stops the loop when the run's budget is spent and returns the best recipe so far.
+
+    With `opens_iteration` set, the gate also marks the start of a loop iteration for
+    per-iteration accounting; place exactly one such gate first in the loop.
+    """
+
+    recipe_key: str = "current_recipe"
+    opens_iteration: bool = False
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        now = time.time()
+        state_delta: Dict[str, Any] = {}
+        iterations = list(state.get(ITERATIONS_KEY) or [])
+        if self.opens_iteration:
+            closed = _close_iteration(state, now)
+            if closed is not None:
+                iterations = closed
+                state_delta[ITERATIONS_KEY] = closed
+            state_delta[OPEN_ITERATION_KEY] = None
+
+        budget = state.get(BUDGET_KEY) or {}
+        exhausted = None
+        if budget:
+            # Only a gate at the top of the loop is about to start a whole iteration, so only it
+            # projects the next iteration's cost; a mid-loop gate stops on hard exhaustion alone.
+            projected = iterations if self.opens_iteration else []
+            exhausted = exhausted_budget(budget, state.get(USAGE_KEY) or {}, projected, now)
+        if exhausted:
+            logger.debug("%s: %s budget reached, exiting loop with the best recipe so far", self.name, exhausted)
+            state_delta.update({EXIT_REASON_KEY: "budget_exhausted", "budget_exhausted": exhausted})
+            best_recipe = state.get(self.recipe_key) or ""
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=best_recipe)]),
+                actions=EventActions(escalate=True, state_delta=state_delta),
+            )
+            return
+
+        if self.opens_iteration:
+            state_delta[OPEN_ITERATION_KEY] = {
+                "iteration": len(iterations) + 1,
+                "started_at": now,
+                "usage_at_start": {counter: (state.get(USAGE_KEY) or {}).get(counter, 0) for counter in USAGE_COUNTERS},
+            }
+        if state_delta:
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                actions=EventActions(state_delta=state_delta),
+            )
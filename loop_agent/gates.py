@@ -0,0 +1,112 @@
+"""
+Deterministic (non-LLM) loop control for the Recipe Refinement Loop.
+
+These agents make exit decisions that do not need a model call:
+
+- CritiqueApprovalGate runs after the critic and ends the loop as soon as the
+  critique is the completion phrase, so the refiner is never called just to
+  invoke `exit_loop`.
+- RecipeConvergenceGate runs at the start of every iteration and ends the loop
+  when the recipe has stopped changing meaningfully since the previous
+  iteration, so no critic/refiner calls are spent on no-op rounds.
+
+Both record why the loop ended in state['loop_exit_reason']. That key and the
+convergence snapshot carry over between turns of a session, so
+`budget.start_budget_clock` clears them when a run starts.
+"""
+
+import difflib
+import logging
+import re
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+logger = logging.getLogger(__name__)
+
+COMPLETION_PHRASE = "Recipe looks great!"
+CONVERGENCE_SIMILARITY_THRESHOLD = 0.97  # Recipes at least this similar count as unchanged
+EXIT_REASON_KEY = "loop_exit_reason"
+SNAPSHOT_KEY = "previous_iteration_recipe"
+
+
+def _normalize(text: str) -> str:
+    """Lower-cases and collapses whitespace so formatting-only edits do not count as changes."""
+    return " ".join(text.lower().split())
+
+
+def is_completion_critique(critique: Optional[str]) -> bool:
+    """
+    Checks whether a critique is the critic's completion phrase.
+
+    Tolerates the small deviations models make when asked for an exact phrase:
+    surrounding whitespace, quotes, Markdown emphasis, case and trailing punctuation.
+    """
+    if not critique:
+        return False
+    stripped = re.sub(r"^[\s\"'*_`]+|[\s\"'*_`.!]+$", "", critique)
+    return _normalize(stripped) == _normalize(COMPLETION_PHRASE.rstrip("!"))
+
+
+def recipe_similarity(previous: str, current: str, threshold: float = CONVERGENCE_SIMILARITY_THRESHOLD) -> float:
+    """
+    Returns a 0..1 similarity ratio between two recipe versions, ignoring case and whitespace.
+
+    Values below `threshold` are only upper bounds: the full diff is skipped once a
+    cheap estimate already rules out convergence.
+    """
+    matcher = difflib.SequenceMatcher(None, _normalize(previous), _normalize(current), autojunk=False)
+    quick = matcher.quick_ratio()
+    if quick < threshold:
+        return quick
+    return matcher.ratio()
+
+
+def _exit_event(agent: BaseAgent, ctx: InvocationContext, reason: str, **state) -> Event:
+    return Event(
+        author=agent.name,
+        invocation_id=ctx.invocation_id,
+        branch=ctx.branch,
+        actions=EventActions(escalate=True, state_delta={EXIT_REASON_KEY: reason, **state}),
+    )
+
+
+class CritiqueApprovalGate(BaseAgent):
+    """Ends the loop without a model call when the critique is the completion phrase."""
+
+    critique_key: str = "critique_feedback"
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if is_completion_critique(ctx.session.state.get(self.critique_key)):
+            logger.debug("%s: critique approved the recipe, exiting loop", self.name)
+            yield _exit_event(self, ctx, "critic_approved")
+
+
+class RecipeConvergenceGate(BaseAgent):
+    """
+    Ends the loop when the recipe is nearly identical to the one seen at the
+    start of the previous iteration.
+    """
+
+    recipe_key: str = "current_recipe"
+    snapshot_key: str = SNAPSHOT_KEY
+    similarity_threshold: float = CONVERGENCE_SIMILARITY_THRESHOLD
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        current = state.get(self.recipe_key) or ""
+        previous = state.get(self.snapshot_key)
+        if previous is not None:
+            similarity = recipe_similarity(previous, current, self.similarity_threshold)
+            if similarity >= self.similarity_threshold:
+                logger.debug("%s: recipe converged (similarity %.3f), exiting loop", self.name, similarity)
+                yield _exit_event(self, ctx, "converged", recipe_similarity=similarity)
+                return
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.snapshot_key: current}),
+        )
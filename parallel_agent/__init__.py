@@ -1 +1,3 @@
-from . import agent
\ No newline at end of file
+from common.lazy_imports import lazy_agent_module
+
+__getattr__ = lazy_agent_module(__name__)
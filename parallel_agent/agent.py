@@ -5,13 +5,29 @@ This pipeline will generate different types of content (a tweet, an Instagram ca
 """
 
 import os
-from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.agents import LlmAgent, SequentialAgent
 from google.genai import types
 
+from common.models import configured_model
+from common.prompt_cache import split_static_instructions
+
+from .consolidation import TemplateConsolidatorAgent
+from .scheduling import BranchScheduler, ScheduledParallelAgent
+
 # --- Setup for Model ---
 # Replace with your actual model name and ensure your environment is set up
 # for authentication (e.g., GOOGLE_API_KEY or Google Cloud project credentials).
-GEMINI_MODEL = "gemini-2.0-flash" # Or "gemini-1.0-pro-latest" / "gemini-2.0-flash"
+GEMINI_MODEL = configured_model("gemini-2.0-flash") # Or "gemini-1.0-pro-latest"; the GEMINI_MODEL env var overrides it
+
+# --- Branch Scheduling ---
+# All branch model calls share one process-wide concurrency limit (across sessions), and
+# a call that runs longer than its branch's recent p95 latency is hedged with a duplicate.
+BRANCH_TIMEOUT_SECONDS = 30.0 # A branch that misses this deadline gets a placeholder draft
+branch_scheduler = BranchScheduler(max_concurrent_calls=8, hedge_percentile=95.0)
+
+def branch_model(branch: str):
+    """Returns the Gemini model for a branch, wrapped with the shared scheduler (the client is built on first use)."""
+    return branch_scheduler.model_for(GEMINI_MODEL, branch)
 
 # --- 1. Define Content Creator Sub-Agents (to run in parallel) ---
 # Each agent takes the initial topic and generates content for a specific platform.
@@ -19,7 +35,7 @@ GEMINI_MODEL = "gemini-2.0-flash" # Or "gemini-1.0-pro-latest" / "gemini-2.0-fla
 # Agent 1: Tweet Generator
 tweet_generator_agent = LlmAgent(
     name="TweetGenerator",
-    model=GEMINI_MODEL,
+    model=branch_model("tweet"),
     instruction="""You are a Twitter content creator.
 Based *only* on the topic provided, write a concise and engaging tweet (max 280 characters).
 Include relevant hashtags.
@@ -34,7 +50,7 @@ Output *only* the complete tweet text. Do not add any other text.
 # Agent 2: Instagram Caption Generator
 instagram_caption_agent = LlmAgent(
     name="InstagramCaptionGenerator",
-    model=GEMINI_MODEL,
+    model=branch_model("instagram"),
     instruction="""You are an Instagram content creator.
 Based *only* on the topic provided, write a short, engaging Instagram caption.
 Include 3-5 relevant and popular hashtags.
@@ -48,7 +64,7 @@ Output *only* the complete Instagram caption. Do not add any other text.
 # Agent 3: Blog Post Introduction Generator
 blog_intro_agent = LlmAgent(
     name="BlogPostIntroGenerator",
-    model=GEMINI_MODEL,
+    model=branch_model("blog_intro"),
     instruction="""You are a blog writer.
 Based *only* on the topic provided, write a compelling and informative introductory paragraph (3-5 sentences) for a blog post.
 The introduction should hook the reader and clearly state what the post will cover.
@@ -59,65 +75,64 @@ Output *only* the introductory paragraph. Do not add any other text.
     output_key="generated_blog_intro" # Stores output in state['generated_blog_intro']
 )
 
-# --- 2. Create the ParallelAgent (Runs content creators concurrently) ---
+# --- 2. Create the Parallel Agent (Runs content creators concurrently) ---
 # This agent orchestrates the concurrent execution of the content generators.
-# It finishes once all sub-agents have completed and stored their results in state.
-parallel_content_agent = ParallelAgent(
+# It finishes once all sub-agents have completed and stored their results in state,
+# or once a branch misses its deadline (its output_key then holds a placeholder).
+parallel_content_agent = ScheduledParallelAgent(
     name="ParallelSocialMediaContent",
     sub_agents=[
         tweet_generator_agent,
         instagram_caption_agent,
         blog_intro_agent
     ],
-    description="Runs multiple content generation agents in parallel for different platforms."
+    description="Runs multiple content generation agents in parallel for different platforms.",
+    branch_timeout_seconds=BRANCH_TIMEOUT_SECONDS
 )
 
-# --- 3. Define the Consolidator Agent (Runs *after* the parallel agents) ---
-# This agent takes the results stored in the session state by the parallel agents
-# and synthesizes them into a single, structured summary.
-content_consolidator_agent = LlmAgent(
+# --- 3. Define the Consolidator (Runs *after* the parallel agents) ---
+# The drafts stored in session state by the parallel agents are placed into a fixed
+# Markdown layout. This is deterministic, so it is done without a model call.
+# Set CONTENT_LLM_POLISH=1 to additionally have an LLM editor polish the summary.
+USE_LLM_POLISH = os.environ.get("CONTENT_LLM_POLISH", "").strip().lower() in ("1", "true", "yes", "on")
+
+content_consolidator_agent = TemplateConsolidatorAgent(
     name="ContentConsolidator",
+    description="Consolidates parallel content drafts into a single summary.",
+    output_key="consolidated_summary", # Stores the summary in state['consolidated_summary']
+    emit_response=not USE_LLM_POLISH # When polishing, the polish step produces the final output
+)
+
+# Optional: LLM polish step (Runs *after* the consolidator when enabled)
+content_polish_agent = LlmAgent(
+    name="ContentPolisher",
     model=GEMINI_MODEL,
     instruction="""You are a Content Editor.
-Your primary task is to consolidate the generated social media content drafts into a single, organized summary.
+Your task is to polish the consolidated social media content drafts below: fix grammar, tighten wording and keep each draft's tone and hashtags.
 
-**Input Drafts:**
+**Consolidated Drafts:**
+{consolidated_summary}
 
-* **Tweet:**
-    {generated_tweet}
-
-* **Instagram Caption:**
-    {generated_instagram_caption}
-
-* **Blog Post Introduction:**
-    {generated_blog_intro}
-
-**Output Format:**
-
-## Social Media Content Draft Summary
-
-### Twitter Draft
-[Insert the generated tweet here]
-
-### Instagram Draft
-[Insert the generated Instagram caption here]
-
-### Blog Post Introduction Draft
-[Insert the generated blog post introduction here]
-
-Output *only* the structured summary following this format. Do not include any other text.
+Keep the exact same Markdown structure and headings.
+Output *only* the polished summary. Do not include any other text.
 """,
-    description="Consolidates parallel content drafts into a single summary.",
+    description="Polishes the consolidated content summary.",
     # No output_key needed here, as its direct response is the final output of the root Sequential Agent
 )
 
 
 # --- 4. Create the SequentialAgent (Orchestrates the overall flow) ---
 # This is the main agent that will be run. It first executes the ParallelAgent
-# to populate the state, and then executes the ConsolidatorAgent to produce the final output.
+# to populate the state, and then executes the ConsolidatorAgent to produce the final output
+# (followed by the polish step when enabled).
 root_agent = SequentialAgent(
     name="MultiPlatformContentPipeline",
-    sub_agents=[parallel_content_agent, content_consolidator_agent],
+    sub_agents=[parallel_content_agent, content_consolidator_agent]
+    + ([content_polish_agent] if USE_LLM_POLISH else []),
     description="Coordinates parallel content generation and synthesizes the results."
 )
 
+# Sends each agent's fixed instruction text as a static, cacheable system instruction and only the
+# polish step's {consolidated_summary} block per call (see common/prompt_cache.py)
+split_static_instructions(root_agent)
+
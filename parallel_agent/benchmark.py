@@ -0,0 +1,128 @@
+"""
+Tail-latency benchmark for the parallel content pipeline.
+
+Runs many pipelines concurrently against a stand-in model (see `common/mock_llm.py`)
+whose latency has an injected tail: most calls take ~50ms, a few take seconds.
+Compares end-to-end latency percentiles of:
+
+1. baseline  - ADK's ParallelAgent waiting for the slowest branch
+2. scheduled - ScheduledParallelAgent with hedged requests and per-branch deadlines
+
+Run:
+    python -m parallel_agent.benchmark --runs 300 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List, Tuple
+
+from google.adk.agents import ParallelAgent, SequentialAgent
+
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm
+
+from . import agent
+from .scheduling import BranchScheduler, ScheduledParallelAgent
+
+BRANCH_AGENTS = (agent.tweet_generator_agent, agent.instagram_caption_agent, agent.blog_intro_agent)
+
+
+def tail_latency(base: float, tail: float, tail_probability: float):
+    """Latency sampler: ~`base` seconds with jitter, or `tail` seconds with the given probability."""
+    def sample() -> float:
+        if random.random() < tail_probability:
+            return tail
+        return random.uniform(0.8 * base, 1.2 * base)
+    return sample
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+def build_baseline(model: ScriptedLlm) -> SequentialAgent:
+    return SequentialAgent(
+        name="MultiPlatformContentPipeline",
+        sub_agents=[
+            ParallelAgent(
+                name="ParallelSocialMediaContent",
+                sub_agents=[branch.clone(update={"model": model}) for branch in BRANCH_AGENTS],
+            ),
+            agent.content_consolidator_agent.clone(),
+        ],
+    )
+
+
+def build_scheduled(model: ScriptedLlm, scheduler: BranchScheduler, timeout: float) -> SequentialAgent:
+    return SequentialAgent(
+        name="MultiPlatformContentPipeline",
+        sub_agents=[
+            ScheduledParallelAgent(
+                name="ParallelSocialMediaContent",
+                sub_agents=[
+                    branch.clone(update={"model": scheduler.model_for(model, branch.name)}) for branch in BRANCH_AGENTS
+                ],
+                branch_timeout_seconds=timeout,
+            ),
+            agent.content_consolidator_agent.clone(),
+        ],
+    )
+
+
+async def _drive(pipeline: SequentialAgent, runs: int, concurrency: int) -> Tuple[List[float], float]:
+    """Runs the pipeline `runs` times, `concurrency` at a time; returns per-run latencies and total wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await run_agent(pipeline, f"Topic number {i}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    return latencies, time.perf_counter() - start
+
+
+def _report(label: str, result: Tuple[List[float], float], model: ScriptedLlm) -> None:
+    # Pipelines share one event loop, so at high concurrency a setup that finishes runs faster also has more
+    # of them competing for CPU at once, which raises its p50. Throughput shows that trade-off.
+    latencies, elapsed = result
+    print(
+        f"{label:<10} runs={len(latencies):<5} "
+        + " ".join(f"p{pct}={_percentile(latencies, pct) * 1000:7.1f}ms" for pct in (50, 95, 99))
+        + f" throughput={len(latencies) / elapsed:6.1f}/s model_calls={model.calls}"
+    )
+
+
+async def run_benchmark(runs: int, concurrency: int, tail_probability: float, timeout: float) -> None:
+    latency = tail_latency(base=0.05, tail=2.0, tail_probability=tail_probability)
+
+    baseline_model = ScriptedLlm(responder=lambda request: "Draft text #content", latency=latency)
+    _report("baseline", await _drive(build_baseline(baseline_model), runs, concurrency), baseline_model)
+
+    scheduled_model = ScriptedLlm(responder=lambda request: "Draft text #content", latency=latency)
+    scheduler = BranchScheduler(max_concurrent_calls=3 * concurrency, hedge_percentile=95.0, min_samples=20)
+    pipeline = build_scheduled(scheduled_model, scheduler, timeout)
+    await _drive(pipeline, 10, concurrency)  # Warm up the latency windows that drive hedging
+    scheduled_model.reset_counters()
+    _report("scheduled", await _drive(pipeline, runs, concurrency), scheduled_model)
+    print(f"scheduler: {scheduler.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare tail latency of ParallelAgent and ScheduledParallelAgent.")
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20, help="Pipelines in flight at once.")
+    parser.add_argument("--tail-probability", type=float, default=0.03, help="Share of model calls that are slow.")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Per-branch deadline in seconds.")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.runs, args.concurrency, args.tail_probability, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Deterministic consolidation of the parallel content drafts.
+
+`TemplateConsolidatorAgent` renders the drafts that the parallel generators stored
+in session state into the fixed Markdown summary layout, without a model call.
+"""
+
+from typing import AsyncGenerator, Dict, List
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+SUMMARY_HEADING = "## Social Media Content Draft Summary\n\n"
+# (section heading, state key) in layout order
+SUMMARY_SECTIONS = (
+    ("### Twitter Draft", "generated_tweet"),
+    ("### Instagram Draft", "generated_instagram_caption"),
+    ("### Blog Post Introduction Draft", "generated_blog_intro"),
+)
+MISSING_DRAFT = "_No draft was generated._"
+
+
+def render_summary_sections(state: Dict) -> List[str]:
+    """Renders the summary as its heading followed by one chunk per draft section, in layout order."""
+    sections = [SUMMARY_HEADING]
+    for index, (heading, key) in enumerate(SUMMARY_SECTIONS):
+        draft = (state.get(key) or "").strip() or MISSING_DRAFT
+        separator = "\n\n" if index < len(SUMMARY_SECTIONS) - 1 else "\n"
+        sections.append(f"{heading}\n{draft}{separator}")
+    return sections
+
+
+def render_summary(state: Dict) -> str:
+    """Fills the summary layout from state, marking drafts that are missing or empty."""
+    return "".join(render_summary_sections(state))
+
+
+class TemplateConsolidatorAgent(BaseAgent):
+    """
+    Renders the content drafts in state into the summary layout without calling a model.
+
+    The summary is stored in state[output_key]. It is also sent as the agent's response
+    unless `emit_response` is off, e.g. when an LLM polish step follows and produces
+    the final output instead. When the run streams (StreamingMode.SSE), each section
+    is first sent as a partial event so clients can render it immediately.
+    """
+
+    output_key: str = "consolidated_summary"
+    emit_response: bool = True
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        sections = render_summary_sections(ctx.session.state)
+        streaming = ctx.run_config is not None and ctx.run_config.streaming_mode == StreamingMode.SSE
+        if self.emit_response and streaming:
+            for section in sections:
+                yield Event(
+                    author=self.name,
+                    invocation_id=ctx.invocation_id,
+                    branch=ctx.branch,
+                    partial=True,
+                    content=types.Content(role="model", parts=[types.Part(text=section)]),
+                )
+        summary = "".join(sections)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=summary)]) if self.emit_response else None,
+            actions=EventActions(state_delta={self.output_key: summary}),
+        )
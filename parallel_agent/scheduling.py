@@ -0,0 +1,309 @@
+"""
+Scheduling for parallel content branches: bounded concurrency, per-branch
+deadlines and hedged model requests.
+
+- `BranchScheduler` owns a process-wide limit on in-flight model calls (shared by
+  every session, so a burst of concurrent pipelines cannot exceed provider rate
+  limits) and a rolling latency window per branch.
+- `HedgedLlm` wraps a branch's model. Calls wait for a free slot. When a call runs
+  longer than the branch's recent latency percentile, a duplicate request is sent
+  if a slot is free, the first reply wins and the other request is cancelled.
+- `ScheduledParallelAgent` runs its sub-agents concurrently like `ParallelAgent`,
+  but gives every branch a deadline. A branch that misses it is cancelled, and a
+  placeholder is written to its `output_key` so downstream stages still render.
+  Events are yielded as soon as each branch produces them, labelled with
+  custom_metadata['parallel_branch'] and ['output_key'].
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional, Tuple, Union
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from pydantic import PrivateAttr
+
+from common.branching import branch_context, branch_name
+
+logger = logging.getLogger(__name__)
+
+TIMED_OUT_PLACEHOLDER = "[Draft unavailable: generation timed out]"
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies (seconds) with percentile lookup."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Returns the given percentile of the window, or None if it is empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+class BranchScheduler:
+    """
+    Shared concurrency limit and hedging policy for parallel branches.
+
+    Args:
+        max_concurrent_calls (int): Model calls allowed in flight at once across all sessions.
+        hedge_percentile (float): A request is hedged once it runs longer than this
+                                  percentile of the branch's recent latencies.
+        min_samples (int): Latencies a branch must have recorded before hedging starts.
+        min_hedge_delay (float): Lower bound on the hedge delay in seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_calls: int = 8,
+        hedge_percentile: float = 95.0,
+        min_samples: int = 20,
+        min_hedge_delay: float = 0.05,
+    ):
+        self.max_concurrent_calls = max_concurrent_calls
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.min_hedge_delay = min_hedge_delay
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one event loop; rebuild if the loop changed (e.g. separate asyncio.run calls).
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def tracker(self, branch: str) -> LatencyTracker:
+        if branch not in self._trackers:
+            self._trackers[branch] = LatencyTracker()
+        return self._trackers[branch]
+
+    def hedge_delay(self, branch: str) -> Optional[float]:
+        """Seconds to wait before hedging a call on `branch`, or None while there is too little history."""
+        tracker = self.tracker(branch)
+        if len(tracker) < self.min_samples:
+            return None
+        return max(self.min_hedge_delay, tracker.percentile(self.hedge_percentile))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delays": {branch: self.hedge_delay(branch) for branch in self._trackers},
+        }
+
+    def model_for(self, model: Union[str, BaseLlm], branch: str) -> "HedgedLlm":
+        """
+        Wraps a branch's model so its calls go through this scheduler.
+
+        A model name is resolved through ADK's model registry on the first call, so
+        defining an agent does not build a model client.
+        """
+        name = model if isinstance(model, str) else model.model
+        return HedgedLlm(model=name, inner=model, scheduler=self, branch=branch)
+
+
+class HedgedLlm(BaseLlm):
+    """
+    Model wrapper that bounds concurrency and hedges slow requests for one branch.
+
+    Streaming requests pass through under the concurrency limit without hedging.
+    `inner` may be a model name, which is resolved on the first call.
+    """
+
+    inner: Union[str, BaseLlm]
+    scheduler: BranchScheduler
+    branch: str
+    _inner_llm: Optional[BaseLlm] = PrivateAttr(default=None)
+
+    @property
+    def inner_llm(self) -> BaseLlm:
+        if self._inner_llm is None:
+            self._inner_llm = LLMRegistry.new_llm(self.inner) if isinstance(self.inner, str) else self.inner
+        return self._inner_llm
+
+    async def _call(self, llm_request: LlmRequest) -> Tuple[List[LlmResponse], float]:
+        async with self.scheduler.semaphore:
+            start = time.perf_counter()
+            responses = [response async for response in self.inner_llm.generate_content_async(llm_request, stream=False)]
+            return responses, time.perf_counter() - start
+
+    async def _hedge(self, llm_request: LlmRequest) -> Tuple[List[LlmResponse], float]:
+        # The semaphore was acquired by the caller; release it when this attempt ends.
+        try:
+            start = time.perf_counter()
+            responses = [response async for response in self.inner_llm.generate_content_async(llm_request, stream=False)]
+            return responses, time.perf_counter() - start
+        finally:
+            self.scheduler.semaphore.release()
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        scheduler = self.scheduler
+        scheduler.calls += 1
+        if stream:
+            async with scheduler.semaphore:
+                async for response in self.inner_llm.generate_content_async(llm_request, stream=True):
+                    yield response
+            return
+
+        tracker = scheduler.tracker(self.branch)
+        delay = scheduler.hedge_delay(self.branch)
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(self._call(llm_request))
+        attempts = {primary}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            # Hedge only when a slot is free: under saturation a duplicate would just add load.
+            if not done and delay is not None and not scheduler.semaphore.locked():
+                await scheduler.semaphore.acquire()
+                scheduler.hedges += 1
+                # The hedge gets its own copy of the request, so the two attempts never share one. Copying only
+                # here keeps the deep copy off the common path; model preprocessing of the request is idempotent.
+                attempts.add(asyncio.ensure_future(self._hedge(llm_request.model_copy(deep=True))))
+                done, _ = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+            elif not done:
+                done, _ = await asyncio.wait(attempts)
+            # Prefer a successful attempt; if the first to finish failed, wait for the other one.
+            remaining = attempts - done
+            winner = next((attempt for attempt in done if attempt.exception() is None), None)
+            while winner is None and remaining:
+                done, remaining = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((attempt for attempt in done if attempt.exception() is None), None)
+            winner = winner or next(iter(done))
+            if winner is not primary:
+                scheduler.hedge_wins += 1
+            responses, _ = winner.result()
+            # The window tracks the primary's latency, so the hedge delay follows the model rather than the
+            # hedges. A primary still running when the hedge won contributes its time so far, a lower bound;
+            # recording the hedge's latency instead would pull the percentile down and hedge ever more often.
+            if primary.done() and not primary.cancelled() and primary.exception() is None:
+                tracker.record(primary.result()[1])
+            elif winner is not primary:
+                tracker.record(time.perf_counter() - start)
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+        for response in responses:
+            yield response
+
+
+class ScheduledParallelAgent(BaseAgent):
+    """
+    Runs sub-agents concurrently, each in an isolated branch, with per-branch deadlines.
+
+    A branch that misses its deadline is cancelled, and `placeholder` is written to the
+    branch agent's `output_key`. The names of timed-out branches are listed in
+    state['timed_out_branches'].
+    """
+
+    branch_timeout_seconds: Optional[float] = 30.0
+    branch_timeouts: Dict[str, float] = {}  # Per sub-agent name overrides of branch_timeout_seconds
+    placeholder: str = TIMED_OUT_PLACEHOLDER
+
+    def _deadline_for(self, sub_agent: BaseAgent, start: float) -> float:
+        timeout = self.branch_timeouts.get(sub_agent.name, self.branch_timeout_seconds)
+        return start + timeout if timeout is not None else float("inf")
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        queue: asyncio.Queue = asyncio.Queue()
+        done_marker = object()
+
+        async def run_branch(sub_agent: BaseAgent) -> None:
+            branch_ctx = branch_context(self, sub_agent, ctx)
+            error: Optional[BaseException] = None
+            try:
+                async for event in sub_agent.run_async(branch_ctx):
+                    processed = asyncio.Event()
+                    await queue.put((sub_agent, event, processed))
+                    await processed.wait()  # Let the runner apply the event before generating the next one
+            except Exception as e:
+                error = e  # Reported through the queue and re-raised by the consumer
+            finally:
+                queue.put_nowait((sub_agent, done_marker, error))
+
+        start = time.monotonic()
+        tasks = {sub_agent.name: asyncio.ensure_future(run_branch(sub_agent)) for sub_agent in self.sub_agents}
+        deadlines = {sub_agent.name: self._deadline_for(sub_agent, start) for sub_agent in self.sub_agents}
+        pending = {sub_agent.name: sub_agent for sub_agent in self.sub_agents}
+        timed_out: List[str] = []
+        try:
+            while pending:
+                next_deadline = min(deadlines[name] for name in pending)
+                timeout = max(0.0, next_deadline - time.monotonic())
+                try:
+                    sub_agent, event, payload = await asyncio.wait_for(
+                        queue.get(), timeout=None if timeout == float("inf") else timeout
+                    )
+                except asyncio.TimeoutError:
+                    now = time.monotonic()
+                    for name in [name for name in pending if deadlines[name] <= now]:
+                        sub_agent = pending.pop(name)
+                        tasks[name].cancel()
+                        timed_out.append(name)
+                        yield self._placeholder_event(ctx, sub_agent, timed_out)
+                    continue
+
+                if event is done_marker:
+                    if pending.pop(sub_agent.name, None) is not None and payload is not None:
+                        raise payload
+                    continue
+                if sub_agent.name not in pending:
+                    payload.set()  # Late event from a branch that already timed out; drop it
+                    continue
+                yield self._tag_branch(event, sub_agent)
+                payload.set()
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    @staticmethod
+    def _tag_branch(event: Event, sub_agent: BaseAgent) -> Event:
+        """Labels an event with the branch that produced it, so streaming clients can route it."""
+        event.custom_metadata = {
+            **(event.custom_metadata or {}),
+            "parallel_branch": sub_agent.name,
+            "output_key": getattr(sub_agent, "output_key", None),
+        }
+        return event
+
+    def _placeholder_event(self, ctx: InvocationContext, sub_agent: BaseAgent, timed_out: List[str]) -> Event:
+        logger.debug("%s: branch %s missed its deadline, using placeholder", self.name, sub_agent.name)
+        state_delta: Dict[str, Any] = {"timed_out_branches": list(timed_out)}
+        output_key = getattr(sub_agent, "output_key", None)
+        if output_key:
+            state_delta[output_key] = self.placeholder
+        return self._tag_branch(
+            Event(
+                author=sub_agent.name,
+                invocation_id=ctx.invocation_id,
+                branch=branch_name(self, sub_agent, ctx),
+                actions=EventActions(state_delta=state_delta),
+            ),
+            sub_agent,
+        )
@@ -0,0 +1,135 @@
+"""
+Streaming client API for the Multi-Platform Content Pipeline.
+
+`stream_content_pipeline` runs the pipeline in SSE streaming mode and yields a
+`ContentChunk` for every piece of content as soon as it exists:
+
+- partial text from each platform generator while it is writing,
+- each platform draft in full as soon as its `output_key` is written,
+- the consolidated summary, section by section, followed by the complete summary.
+
+Every chunk names the agent (branch) that produced it, so a UI can render one tile
+per platform independently.
+
+Demo with a stand-in model whose branches finish at different times:
+    python -m parallel_agent.streaming --mock "Sustainable travel"
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from common.agent_runner import new_runner
+
+SUMMARY_SOURCE = "summary"
+
+
+@dataclass
+class ContentChunk:
+    """
+    A piece of streamed pipeline output.
+
+    Attributes:
+        source (str): The agent that produced it (e.g. 'TweetGenerator'), or 'summary'
+                      for the consolidated summary.
+        output_key (Optional[str]): The state key the source writes to, if any.
+        text (str): The chunk text. For complete chunks this is the whole draft/summary.
+        partial (bool): True for incremental text, False once the source's output is complete.
+        elapsed (float): Seconds since the pipeline started.
+    """
+
+    source: str
+    output_key: Optional[str]
+    text: str
+    partial: bool
+    elapsed: float
+
+
+async def stream_content_pipeline(
+    topic: str,
+    agent: Optional[BaseAgent] = None,
+    runner: Optional[InMemoryRunner] = None,
+    user_id: str = "user",
+) -> AsyncIterator[ContentChunk]:
+    """
+    Runs the content pipeline for `topic` and yields content chunks as they become available.
+
+    Args:
+        topic (str): The topic to generate content for.
+        agent (Optional[BaseAgent]): The pipeline to run; defaults to this package's root_agent.
+        runner (Optional[InMemoryRunner]): Runner to use; a new in-memory runner is created when omitted.
+        user_id (str): The user ID the session belongs to.
+
+    Yields:
+        ContentChunk: Draft and summary chunks in the order they are produced.
+    """
+    if runner is None:
+        if agent is None:
+            from .agent import root_agent as agent
+        runner = new_runner(agent)
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id, session_id=uuid.uuid4().hex
+    )
+    message = types.Content(role="user", parts=[types.Part(text=topic)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+
+    start = time.perf_counter()
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session.id, new_message=message, run_config=run_config
+    ):
+        elapsed = time.perf_counter() - start
+        metadata = event.custom_metadata or {}
+        branch = metadata.get("parallel_branch")
+        if branch:
+            output_key = metadata.get("output_key")
+            if event.partial:
+                text = "".join(part.text or "" for part in (event.content.parts if event.content else []))
+                if text:
+                    yield ContentChunk(branch, output_key, text, True, elapsed)
+            elif output_key and output_key in event.actions.state_delta:
+                yield ContentChunk(branch, output_key, str(event.actions.state_delta[output_key]), False, elapsed)
+        elif event.content and event.content.parts:
+            # Everything after the fan-out is the consolidated summary (and optional polish step).
+            text = "".join(part.text or "" for part in event.content.parts)
+            if text:
+                yield ContentChunk(SUMMARY_SOURCE, None, text, bool(event.partial), elapsed)
+
+
+async def _demo(topic: str, use_mock: bool) -> None:
+    from .agent import root_agent
+
+    agent = root_agent
+    if use_mock:
+        from common.mock_llm import ScriptedLlm, request_prompt_text, with_model
+
+        def respond(llm_request):
+            prompt = request_prompt_text(llm_request)
+            platform = "Tweet" if "Twitter" in prompt else "Instagram caption" if "Instagram" in prompt else "Blog intro"
+            return f"{platform} about {topic}."
+
+        agent = with_model(root_agent, ScriptedLlm(responder=respond, latency=lambda: random.uniform(0.2, 1.5)))
+
+    async for chunk in stream_content_pipeline(topic, agent=agent):
+        state = "partial" if chunk.partial else "complete"
+        print(f"[{chunk.elapsed * 1000:7.1f}ms] {chunk.source:<26} {state:<8} {chunk.text.strip()[:70]!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream the content pipeline's output as it is produced.")
+    parser.add_argument("topic")
+    parser.add_argument("--mock", action="store_true", help="Use an offline stand-in model.")
+    args = parser.parse_args()
+    asyncio.run(_demo(args.topic, args.mock))
+
+
+if __name__ == "__main__":
+    main()
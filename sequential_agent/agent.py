@@ -1,9 +1,20 @@
 """
 Content Creation and SEO Optimization Pipeline
 """
-from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents import LlmAgent
 
-GEMINI_MODEL = "gemini-2.0-flash" # Or "gemini-1.0-pro-latest" or "gemini-2.0-flash"
+from common.history_compaction import HistoryCompactor
+from common.models import configured_model
+from common.prompt_cache import split_static_instructions
+
+from .pipelining import Handoff, PipelinedSequentialAgent, first_list_item
+from .stage_cache import StageCache
+
+GEMINI_MODEL = configured_model("gemini-2.0-flash") # Or "gemini-1.0-pro-latest"; the GEMINI_MODEL env var overrides it
+
+# With CONTENT_STAGE_CACHE=on, caches each stage's output by its inputs, so reruns of a topic skip the model
+# (see stage_cache.py)
+stage_cache = StageCache()
 
 
 # --- 1. Define Sub-Agents for Each Pipeline Stage ---
@@ -23,50 +34,53 @@ Example: '
 '
 """,
     description="Generates initial content ideas for a given topic.",
-    output_key="content_ideas" # Stores output in state['content_ideas']
+    output_key="content_ideas", # Stores output in state['content_ideas']
+    before_model_callback=stage_cache.before_model,
+    after_model_callback=stage_cache.after_model,
+    on_model_error_callback=stage_cache.on_model_error,
 )
 
 # 2. Keyword Research Agent
-# Takes the generated content ideas and suggests relevant SEO keywords for each.
+# Takes the first content idea and suggests relevant SEO keywords for it; only that idea is outlined.
+# It starts as soon as the first idea has been streamed (see the handoff below).
 # This agent would ideally use a real keyword research tool, but here it's simulated.
 keyword_research_agent = LlmAgent(
     name="KeywordResearchAgent",
     model=GEMINI_MODEL,
     instruction="""You are an SEO keyword research expert.
-Given a list of content ideas, identify 3-5 primary and secondary keywords for each idea that a target audience would search for.
+Given a content idea, identify 3-5 primary and secondary keywords that a target audience would search for.
 
-**Content Ideas:**
-{content_ideas}
+**Content Idea:**
+{primary_content_idea}
 
 **Output Format:**
-For each idea, list relevant keywords.
 Example:
 Idea: The Future of AI in Daily Life
 Keywords: AI in daily life, future AI, AI impact, personal AI, everyday artificial intelligence
----
-Idea: Building Your First Web App with Flask
-Keywords: Flask web app, Flask tutorial, build web app python, Python web development, Flask for beginners
 """,
-    description="Identifies relevant SEO keywords for content ideas.",
+    description="Identifies relevant SEO keywords for the primary content idea.",
     output_key="seo_keywords_map", # Stores output in state['seo_keywords_map']
+    before_model_callback=stage_cache.before_model,
+    after_model_callback=stage_cache.after_model,
+    on_model_error_callback=stage_cache.on_model_error,
 )
 
 # 3. SEO Content Outline Agent
-# Takes content ideas and their associated keywords to create a basic SEO-optimized outline.
+# Takes the first content idea and its keywords to create a basic SEO-optimized outline.
 seo_outline_agent = LlmAgent(
     name="SEOOutlineAgent",
     model=GEMINI_MODEL,
     instruction="""You are an SEO Content Strategist.
-Based on the provided content ideas and their associated keywords, pick one and create a basic SEO-optimized outline for a blog post or article.
+Based on the provided content idea and its associated keywords, create a basic SEO-optimized outline for a blog post or article.
 
-**Content Ideas:**
-{content_ideas}
+**Content Idea:**
+{primary_content_idea}
 
 **Keywords Map:**
 {seo_keywords_map}
 
 **Outline Structure:**
-For the first idea from 'Content Ideas', create an outline that includes:
+Create an outline that includes:
 1. Catchy Title (incorporating primary keyword)
 2. Introduction (1 paragraph, hook, introduce topic & scope)
 3. Main Sections (3-4 sections with H2 headings, each with a brief description and potential sub-topics/H3s, incorporating relevant keywords naturally)
@@ -77,20 +91,47 @@ Output *only* the structured outline in markdown format.
 """,
     description="Creates an SEO-optimized content outline.",
     output_key="final_content_outline", # Stores output in state['final_content_outline']
+    before_model_callback=stage_cache.before_model,
+    after_model_callback=stage_cache.after_model,
+    on_model_error_callback=stage_cache.on_model_error,
+)
+
+
+# 4. History Compactor (no model call)
+# The outline agent reads the idea and keywords from state, so the earlier stages' events in the
+# session history only repeat them. Compacts them into a short note before the outline is written.
+stage_history_compactor = HistoryCompactor(
+    name="StageHistoryCompactor",
+    description="Compacts the idea and keyword stages' events once their outputs are in state.",
+    output_keys=["content_ideas", "primary_content_idea", "seo_keywords_map"],
+    keep_latest=False,
 )
 
 
-# --- 2. Create the SequentialAgent ---
-# This agent orchestrates the pipeline by running the sub-agents in order.
-content_creation_pipeline = SequentialAgent(
+# --- 2. Create the Pipelined Sequential Agent ---
+# This agent orchestrates the pipeline by running the sub-agents in order. Each stage starts
+# as soon as its inputs are in state: the first idea is handed to keyword research while the
+# remaining ideas are still being generated (see pipelining.py).
+content_creation_pipeline = PipelinedSequentialAgent(
     name="ContentCreationPipeline",
     sub_agents=[
         idea_generator_agent,
         keyword_research_agent,
+        stage_history_compactor,
         seo_outline_agent
     ],
+    handoffs=[
+        # Writes state['primary_content_idea'] once the first idea in 'content_ideas' has streamed
+        Handoff(source_key="content_ideas", target_key="primary_content_idea", extract=first_list_item),
+    ],
+    # The compactor runs once both upstream stages have finished
+    stage_inputs={"StageHistoryCompactor": ["content_ideas", "seo_keywords_map"]},
     description="Executes a sequence for content idea generation, keyword research, and SEO outline creation.",
 )
 
+# Sends each stage's fixed instruction text as a static, cacheable system instruction and only its
+# {placeholder} blocks per call (see common/prompt_cache.py)
+split_static_instructions(content_creation_pipeline)
+
 # For ADK tools compatibility and runners, the root agent must be named `root_agent`
 root_agent = content_creation_pipeline
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Benchmarks for the Content Creation Pipeline, run against a stand-in model (see `common/mock_llm.py`).
+
+- cache:    runs a set of topics, then reruns them the way editorial teams do, and
+            reports model calls, prompt tokens and wall time per pass. The stage cache
+            is an in-memory store, so nothing touches the user's real cache file.
+- pipeline: compares the original strictly serial chain (keywords researched for every
+            idea) with the pipelined chain (keyword research starts on the first streamed
+            idea). Reports wall time and tokens. The stand-in model streams its replies
+            at a fixed token rate.
+
+Run:
+    python -m sequential_agent.benchmark cache --topics 20
+    python -m sequential_agent.benchmark pipeline --topics 10
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from typing import Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
+
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm, request_prompt_text, with_model
+from common.persistent_cache import PersistentCache
+from common.prompt_cache import split_static_instructions
+
+from . import agent
+from .stage_cache import StageCache
+
+STAGES = (agent.idea_generator_agent, agent.keyword_research_agent, agent.seo_outline_agent)
+IDEAS = [
+    "10 Ways to Master Python",
+    "The Future of AI in Daily Life",
+    "Building Your First Web App with Flask",
+    "Python Testing Best Practices",
+    "Async Programming Explained",
+]
+
+# The keyword and outline instructions as they were before pipelining, for the serial baseline
+SERIAL_KEYWORD_INSTRUCTION = """You are an SEO keyword research expert.
+Given a list of content ideas, identify 3-5 primary and secondary keywords for each idea that a target audience would search for.
+
+**Content Ideas:**
+{content_ideas}
+
+**Output Format:**
+For each idea, list relevant keywords.
+"""
+SERIAL_OUTLINE_INSTRUCTION = """You are an SEO Content Strategist.
+Based on the provided content ideas and their associated keywords, pick one and create a basic SEO-optimized outline for a blog post or article.
+
+**Content Ideas:**
+{content_ideas}
+
+**Keywords Map:**
+{seo_keywords_map}
+
+For the first idea from 'Content Ideas', create an outline. Output *only* the structured outline in markdown format.
+"""
+
+
+def respond(llm_request) -> str:
+    prompt = request_prompt_text(llm_request)
+    if "SEO Content Strategist" in prompt:
+        return "# Title\n## Introduction\n" + "".join(f"## Section {i}\nDetails.\n" for i in range(1, 5)) + "## Conclusion\n"
+    if "SEO keyword research expert" in prompt:
+        # Only the ideas given as input, not the instruction's example idea
+        inputs = prompt.split("**Content Idea", 1)[-1].split("**Output Format:**")[0]
+        ideas = [idea for idea in IDEAS if idea in inputs]
+        return "---\n".join(
+            f"Idea: {idea}\nKeywords: {idea.lower()}, {idea.lower()} guide, best {idea.lower()}, "
+            f"{idea.lower()} tips, learn {idea.lower()}\n"
+            for idea in ideas
+        )
+    return "".join(f"{i}. {idea}\n" for i, idea in enumerate(IDEAS, start=1))
+
+
+def build_serial_pipeline(model: ScriptedLlm) -> SequentialAgent:
+    """The pipeline as it was before pipelining: every stage waits for the previous one."""
+    no_cache = StageCache(enabled=False)
+    instructions = {
+        agent.keyword_research_agent.name: SERIAL_KEYWORD_INSTRUCTION,
+        agent.seo_outline_agent.name: SERIAL_OUTLINE_INSTRUCTION,
+    }
+    pipeline = SequentialAgent(
+        name="ContentCreationPipeline",
+        sub_agents=[
+            stage.clone(
+                update={
+                    "model": model,
+                    "instruction": instructions.get(stage.name, stage.instruction),
+                    # A replaced instruction is whole again; it is split below, like the pipelined stages
+                    "static_instruction": None if stage.name in instructions else stage.static_instruction,
+                    "before_model_callback": no_cache.before_model,
+                    "after_model_callback": no_cache.after_model,
+                    "on_model_error_callback": no_cache.on_model_error,
+                }
+            )
+            for stage in STAGES
+        ],
+    )
+    return split_static_instructions(pipeline)
+
+
+def build_pipelined_pipeline(model: ScriptedLlm, stage_cache: Optional[StageCache] = None) -> BaseAgent:
+    """A copy of the pipeline on the stand-in model, using `stage_cache` (none by default)."""
+    stage_cache = stage_cache or StageCache(enabled=False)
+    pipeline = with_model(agent.root_agent, model)
+    return pipeline.clone(
+        update={
+            "sub_agents": [
+                stage.clone(
+                    update={
+                        "before_model_callback": stage_cache.before_model,
+                        "after_model_callback": stage_cache.after_model,
+                        "on_model_error_callback": stage_cache.on_model_error,
+                    }
+                )
+                if isinstance(stage, LlmAgent) else stage  # The history compactor makes no model calls
+                for stage in pipeline.sub_agents
+            ]
+        }
+    )
+
+
+async def _run_topics(pipeline: BaseAgent, topics: int) -> float:
+    start = time.perf_counter()
+    for i in range(topics):
+        result = await run_agent(pipeline, f"Topic number {i}")
+    assert re.search(r"^# Title", result.final_text, re.M), "the outline should be the final response"
+    return time.perf_counter() - start
+
+
+async def run_cache_benchmark(topics: int, latency: float) -> None:
+    model = ScriptedLlm(responder=respond, latency=lambda: latency)
+    stage_cache = StageCache(cache=PersistentCache(":memory:"), enabled=True)
+    pipeline = build_pipelined_pipeline(model, stage_cache)
+    uncached = build_pipelined_pipeline(model)
+
+    for label, runner_pipeline in (("no cache", uncached), ("cold", pipeline), ("rerun", pipeline), ("rerun 2", pipeline)):
+        model.reset_counters()
+        elapsed = await _run_topics(runner_pipeline, topics)
+        print(
+            f"{label:<9} topics={topics:<4} model_calls={model.calls:<4} "
+            f"prompt_tokens={model.prompt_tokens:<7} wall={elapsed:6.2f}s"
+        )
+    print(f"cache: {stage_cache.cache.stats()}")
+
+
+async def run_pipelining_benchmark(topics: int, latency: float, seconds_per_token: float) -> None:
+    for label, build in (("serial", build_serial_pipeline), ("pipelined", build_pipelined_pipeline)):
+        model = ScriptedLlm(responder=respond, latency=lambda: latency, seconds_per_token=seconds_per_token)
+        elapsed = await _run_topics(build(model), topics)
+        print(
+            f"{label:<10} topics={topics:<4} wall/topic={elapsed / topics * 1000:7.1f}ms "
+            f"model_calls={model.calls:<4} prompt_tokens={model.prompt_tokens:<6} "
+            f"completion_tokens={model.completion_tokens}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the content pipeline's stage cache and pipelining.")
+    parser.add_argument("scenario", choices=("cache", "pipeline"))
+    parser.add_argument("--topics", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stand-in model time to first token in seconds.")
+    parser.add_argument("--seconds-per-token", type=float, default=0.01, help="Stand-in model generation speed.")
+    args = parser.parse_args()
+    if args.scenario == "cache":
+        asyncio.run(run_cache_benchmark(args.topics, args.latency))
+    else:
+        asyncio.run(run_pipelining_benchmark(args.topics, args.latency, args.seconds_per_token))
+
+
+if __name__ == "__main__":
+    main()
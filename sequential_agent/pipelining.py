@@ -0,0 +1,213 @@
+"""
+Pipelined execution for sequential chains of agents.
+
+`PipelinedSequentialAgent` runs its sub-agents like `SequentialAgent`, with two differences:
+
+- A stage starts as soon as the state keys it reads are available, not when the
+  previous stage ends. A stage's inputs are the `{key}` placeholders in its instruction,
+  or an explicit `stage_inputs` entry. Keys written by stages of the chain only count
+  once they are written in the current run.
+- A `Handoff` derives a smaller input from the streamed prefix of an upstream output,
+  e.g. the first item of a numbered list. The upstream stage is run in streaming (SSE)
+  mode, and the derived key is written the moment its extractor finds a value. A stage
+  that reads only the derived key therefore overlaps with the rest of the upstream
+  generation.
+
+The last stage starts only after every other stage has finished, so the chain's final
+response is still the last stage's. If no stage is running and none is ready (an input
+never appeared), the next stage is started anyway. Its missing input then fails the
+same way it would in a SequentialAgent.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import AsyncGenerator, Callable, Dict, List, Optional, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event, EventActions
+
+from common.instruction_templates import ARTIFACT_PREFIX, placeholders
+
+_LIST_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+(.+?)\s*$")
+
+
+def instruction_inputs(agent: BaseAgent) -> List[str]:
+    """Returns the required state keys an agent's instruction template reads (optional `{key?}` excluded)."""
+    instruction = getattr(agent, "instruction", None)
+    if not isinstance(instruction, str):
+        return []
+    keys: List[str] = []
+    for name in placeholders(instruction):
+        if name.endswith("?") or name.startswith(ARTIFACT_PREFIX):
+            continue
+        if name not in keys:
+            keys.append(name)
+    return keys
+
+
+def first_list_item(text: str, complete: bool) -> Optional[str]:
+    """
+    Handoff extractor: the first item of a numbered or bulleted list.
+
+    Args:
+        text (str): The upstream output received so far.
+        complete (bool): Whether `text` is the whole output.
+
+    Returns:
+        Optional[str]: The item text once its line is complete, or None. If a complete
+                       output has no list markers, its first non-empty line is used.
+    """
+    lines = text.split("\n")
+    if not complete:
+        lines = lines[:-1]  # The last line may still be growing
+    for line in lines:
+        match = _LIST_ITEM.match(line)
+        if match:
+            return match.group(1)
+    if complete:
+        return next((line.strip() for line in lines if line.strip()), None)
+    return None
+
+
+@dataclass(frozen=True)
+class Handoff:
+    """
+    Derives `target_key` from the streamed output of the stage that writes `source_key`.
+
+    Attributes:
+        source_key (str): The upstream stage's `output_key`.
+        target_key (str): The state key written with the extracted value.
+        extract (Callable[[str, bool], Optional[str]]): Called with the text so far and
+            whether it is complete; returns the value once it can be determined.
+    """
+
+    source_key: str
+    target_key: str
+    extract: Callable[[str, bool], Optional[str]]
+
+
+class PipelinedSequentialAgent(BaseAgent):
+    """
+    Runs sub-agents in order, starting each one as soon as its inputs are in state.
+
+    Attributes:
+        handoffs (List[Handoff]): Inputs derived early from streamed upstream outputs.
+        stage_inputs (Dict[str, List[str]]): Per sub-agent name overrides of the state keys
+            it needs before it can start; by default the keys its instruction reads.
+    """
+
+    handoffs: List[Handoff] = []
+    stage_inputs: Dict[str, List[str]] = {}
+
+    def _inputs_for(self, stage: BaseAgent) -> List[str]:
+        if stage.name in self.stage_inputs:
+            return list(self.stage_inputs[stage.name])
+        return instruction_inputs(stage)
+
+    def _stage_ctx(self, ctx: InvocationContext, stage: BaseAgent) -> InvocationContext:
+        """Runs handoff sources in streaming mode so their prefix can be watched."""
+        output_key = getattr(stage, "output_key", None)
+        run_config = ctx.run_config or RunConfig()
+        if output_key not in {handoff.source_key for handoff in self.handoffs}:
+            return ctx
+        if run_config.streaming_mode == StreamingMode.SSE:
+            return ctx
+        return ctx.model_copy(update={"run_config": run_config.model_copy(update={"streaming_mode": StreamingMode.SSE})})
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        stages = list(self.sub_agents)
+        chain_keys: Set[str] = {getattr(stage, "output_key", None) for stage in stages} - {None}
+        chain_keys |= {handoff.target_key for handoff in self.handoffs}
+        produced: Set[str] = set()
+        forward_partials = ctx.run_config is not None and ctx.run_config.streaming_mode == StreamingMode.SSE
+
+        def available(key: str) -> bool:
+            # Chain outputs left in state by an earlier turn are stale until rewritten in this run.
+            return key in produced if key in chain_keys else key in ctx.session.state
+
+        queue: asyncio.Queue = asyncio.Queue()
+        done_marker = object()
+
+        async def run_stage(stage: BaseAgent) -> None:
+            error: Optional[BaseException] = None
+            try:
+                async for event in stage.run_async(self._stage_ctx(ctx, stage)):
+                    processed = asyncio.Event()
+                    await queue.put((stage, event, processed))
+                    await processed.wait()  # Let the runner apply the event before generating the next one
+            except Exception as e:
+                error = e  # Reported through the queue and re-raised by the consumer
+            finally:
+                queue.put_nowait((stage, done_marker, error))
+
+        waiting = list(stages)
+        running: Dict[str, asyncio.Future] = {}
+        pending_handoffs = list(self.handoffs)
+        streamed: Dict[str, str] = {}  # Stage name -> partial text received so far
+        try:
+            while waiting or running:
+                for stage in list(waiting):
+                    is_last = stage is stages[-1]
+                    if (is_last and (running or len(waiting) > 1)) or not all(
+                        available(key) for key in self._inputs_for(stage)
+                    ):
+                        continue
+                    waiting.remove(stage)
+                    running[stage.name] = asyncio.ensure_future(run_stage(stage))
+                if waiting and not running:
+                    stage = waiting.pop(0)  # Nothing can make progress; fall back to serial order
+                    running[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+                stage, event, payload = await queue.get()
+                if event is done_marker:
+                    running.pop(stage.name, None)
+                    if payload is not None:
+                        raise payload
+                    continue
+
+                if event.partial:
+                    streamed[stage.name] = streamed.get(stage.name, "") + "".join(
+                        part.text or "" for part in (event.content.parts if event.content else [])
+                    )
+                    if forward_partials:
+                        yield event
+                else:
+                    yield event
+                    produced.update(event.actions.state_delta)
+                payload.set()
+
+                handoff_delta = self._handoff_delta(stage, event, streamed, pending_handoffs)
+                if handoff_delta:
+                    yield Event(
+                        author=self.name,
+                        invocation_id=ctx.invocation_id,
+                        branch=ctx.branch,
+                        actions=EventActions(state_delta=handoff_delta),
+                    )
+                    produced.update(handoff_delta)
+        finally:
+            for task in running.values():
+                task.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+
+    @staticmethod
+    def _handoff_delta(
+        stage: BaseAgent, event: Event, streamed: Dict[str, str], pending_handoffs: List[Handoff]
+    ) -> Dict[str, str]:
+        """Runs the extractors of the stage's pending handoffs; returns the values found and retires them."""
+        output_key = getattr(stage, "output_key", None)
+        delta: Dict[str, str] = {}
+        for handoff in [handoff for handoff in pending_handoffs if handoff.source_key == output_key]:
+            if event.partial:
+                value = handoff.extract(streamed.get(stage.name, ""), False)
+            elif output_key in event.actions.state_delta:
+                value = handoff.extract(str(event.actions.state_delta[output_key]), True)
+            else:
+                continue
+            if value is not None:
+                delta[handoff.target_key] = value
+                pending_handoffs.remove(handoff)
+        return delta
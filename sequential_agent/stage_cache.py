@@ -0,0 +1,191 @@
+"""
+Content-addressed result cache for the stages of the Content Creation Pipeline.
+
+The cache is opt-in (CONTENT_STAGE_CACHE=on). The stages are creative and run at the
+model's default temperature, so a rerun is expected to bring new ideas and outlines.
+Turn the cache on where repeating a topic should reproduce its earlier output instead,
+e.g. while iterating on a later stage's instruction.
+
+Each stage's output is stored under a hash of everything that determines it:
+
+- the agent name,
+- the model and its generation config,
+- the resolved instruction. This is the instruction template with its input state
+  keys (e.g. {content_ideas}) substituted, so a stage misses when its inputs change.
+- the request's contents: the user's request (the topic), the earlier turns of the
+  session and, when the instruction is split into a static system instruction and a
+  dynamic part (see common/prompt_cache.py), the dynamic part. Function call ids and
+  surrounding whitespace are left out, as in common/response_cache.py. A follow-up
+  message such as "make it shorter" therefore only hits within the same conversation.
+
+`StageCache.before_model` (before_model_callback) answers from the cache on a hit. The
+model call is skipped, and ADK writes the cached text to the agent's `output_key` as usual.
+`StageCache.after_model` (after_model_callback) stores successful text responses, and
+`StageCache.on_model_error` (on_model_error_callback) forgets a call that failed.
+
+A rerun of the same topic is served from the cache once every stage has seen the same
+request. With pipelining, the first rerun can still call the stages after the idea stage: the
+keyword stage's cold call started on a partial idea list, while on the rerun the full
+list is already in the session, and the stages after it see those earlier turns too.
+A rerun where only a later stage's instruction changed re-runs that stage and
+everything downstream of it.
+
+Settings come from environment variables:
+
+    CONTENT_STAGE_CACHE              'on' enables the cache (default: off)
+    CONTENT_STAGE_CACHE_PATH         SQLite file (default: ~/.cache/adk-course-agents/content_stages.sqlite3)
+    CONTENT_STAGE_CACHE_TTL_SECONDS  Entry lifetime (default: 30 days)
+
+To regenerate a topic, set state['stage_cache_bypass'] = True for the run. Stages then
+call the model and overwrite their cached entries.
+
+Inspect or clear the cache:
+    python -m sequential_agent.stage_cache stats
+    python -m sequential_agent.stage_cache clear
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from common.persistent_cache import PersistentCache
+from common.response_cache import normalize_contents
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "adk-course-agents", "content_stages.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+CACHE_MAX_ENTRIES = 10_000
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+BYPASS_KEY = "stage_cache_bypass"
+MAX_PENDING_CALLS = 1024  # Calls in flight that are tracked; the oldest are dropped beyond it (e.g. cancelled calls)
+
+
+def stage_cache_enabled() -> bool:
+    return os.environ.get("CONTENT_STAGE_CACHE", "off").strip().lower() not in ("0", "false", "no", "off")
+
+
+def stage_key(agent_name: str, llm_request: LlmRequest) -> str:
+    """Hashes the inputs that determine a stage's output into a cache key."""
+    config = llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else {}
+    material = json.dumps(
+        {
+            "agent": agent_name,
+            "model": llm_request.model,
+            "config": config,
+            "contents": normalize_contents(llm_request),  # Includes the user's request
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return "stage:" + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _response_text(llm_response: LlmResponse) -> Optional[str]:
+    """The response's text if it is a complete, successful, text-only reply, else None."""
+    if llm_response.partial or llm_response.error_code or llm_response.content is None:
+        return None
+    parts = llm_response.content.parts or []
+    if not parts or any(part.function_call for part in parts):
+        return None
+    text = "".join(part.text or "" for part in parts if not part.thought)
+    return text if text.strip() else None
+
+
+class StageCache:
+    """
+    Model callbacks that cache each pipeline stage's output in a PersistentCache.
+
+    Args:
+        cache (Optional[PersistentCache]): Backing store. When omitted, the store configured
+                                           through the environment is opened on first use.
+        enabled (Optional[bool]): None follows the CONTENT_STAGE_CACHE environment variable.
+    """
+
+    def __init__(self, cache: Optional[PersistentCache] = None, enabled: Optional[bool] = None):
+        self._cache = cache
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        # (invocation_id, branch, agent name) -> key of the call in flight, for after_model
+        self._pending: Dict[Tuple[str, Optional[str], str], str] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return stage_cache_enabled() if self._enabled is None else self._enabled
+
+    @property
+    def cache(self) -> PersistentCache:
+        # Opened lazily so importing the agent does not touch the filesystem.
+        with self._lock:
+            if self._cache is None:
+                self._cache = PersistentCache(
+                    os.environ.get("CONTENT_STAGE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    max_entries=CACHE_MAX_ENTRIES,
+                    max_bytes=CACHE_MAX_BYTES,
+                    default_ttl=float(os.environ.get("CONTENT_STAGE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                )
+            return self._cache
+
+    @staticmethod
+    def _call_id(callback_context: CallbackContext) -> Tuple[str, Optional[str], str]:
+        return (callback_context.invocation_id, callback_context.branch, callback_context.agent_name)
+
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        """Returns the cached output for this stage and inputs, skipping the model call (before_model_callback)."""
+        if not self.enabled:
+            return None
+        key = stage_key(callback_context.agent_name, llm_request)
+        if not callback_context.state.get(BYPASS_KEY):
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug("%s: stage cache hit", callback_context.agent_name)
+                return LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=cached)]),
+                    custom_metadata={"stage_cache": "hit"},
+                )
+        self._pending[self._call_id(callback_context)] = key
+        if len(self._pending) > MAX_PENDING_CALLS:
+            self._pending.pop(next(iter(self._pending)))
+        return None
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        """Stores a completed stage output under the key computed before the call (after_model_callback)."""
+        if llm_response.partial:
+            return None  # Streaming chunk; the aggregated final response follows
+        key = self._pending.pop(self._call_id(callback_context), None)
+        text = _response_text(llm_response)
+        if key is not None and text is not None:
+            self.cache.set(key, text)
+        return None
+
+    def on_model_error(
+        self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> Optional[LlmResponse]:
+        """Forgets the key of a failed call, which never reaches after_model (on_model_error_callback)."""
+        self._pending.pop(self._call_id(callback_context), None)
+        return None  # The error propagates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the content pipeline's stage cache.")
+    parser.add_argument("command", choices=("stats", "clear", "purge"), help="purge drops expired entries")
+    args = parser.parse_args()
+    cache = StageCache(enabled=True).cache
+    if args.command == "clear":
+        cache.clear()
+    elif args.command == "purge":
+        print(f"Removed {cache.purge_expired()} expired entries.")
+    print(json.dumps(cache.stats(), indent=2))
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Tests for loop_agent.budget: budget checks, BudgetGate and per-iteration accounting."""
+
+import asyncio
+
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm, request_prompt_text, with_model
+from loop_agent import agent
+from loop_agent.budget import exhausted_budget
+
+RECIPE = "Tomato Soup\nIngredients: tomatoes, water, salt\nSteps: chop, boil, blend"
+
+
+def iteration(latency_ms: float = 1000.0, total_tokens: int = 500, model_calls: int = 2):
+    return {"latency_ms": latency_ms, "total_tokens": total_tokens, "model_calls": model_calls}
+
+
+def test_no_budget_is_never_exhausted():
+    usage = {"started_at": 0.0, "total_tokens": 10**6, "model_calls": 100}
+    assert exhausted_budget({}, usage, [iteration()], now=1000.0) is None
+
+
+def test_spent_budget_is_exhausted():
+    usage = {"started_at": 0.0, "total_tokens": 100, "model_calls": 3}
+    assert exhausted_budget({"deadline_seconds": 10}, usage, [], now=10.0) == "deadline_seconds"
+    assert exhausted_budget({"max_tokens": 100}, usage, [], now=0.0) == "max_tokens"
+    assert exhausted_budget({"max_model_calls": 3}, usage, [], now=0.0) == "max_model_calls"
+    assert exhausted_budget({"max_model_calls": 4, "max_tokens": 101}, usage, [], now=0.0) is None
+
+
+def test_budget_too_small_for_another_iteration_is_exhausted():
+    usage = {"started_at": 0.0, "total_tokens": 1000, "model_calls": 3}
+    iterations = [iteration(total_tokens=400, model_calls=2), iteration(total_tokens=600, model_calls=2)]
+    assert exhausted_budget({"max_tokens": 1499}, usage, iterations, now=0.0) == "max_tokens"
+    assert exhausted_budget({"max_tokens": 1500}, usage, iterations, now=0.0) is None
+    assert exhausted_budget({"max_model_calls": 4}, usage, iterations, now=0.0) == "max_model_calls"
+    assert exhausted_budget({"deadline_seconds": 5}, usage, iterations, now=4.5) == "deadline_seconds"
+
+
+def run_pipeline(budget):
+    """Runs the recipe pipeline on a model whose critic never approves and whose refiner always changes the recipe."""
+    def respond(llm_request):
+        prompt = request_prompt_text(llm_request)
+        if "Culinary Critic" in prompt:
+            return "Add more vegetables, such as carrots and celery."
+        if "Recipe Refinement Assistant" in prompt:
+            return f"{RECIPE}\nRevision {model.calls}: " + "more carrots and celery. " * model.calls
+        return RECIPE
+
+    model = ScriptedLlm(responder=respond)
+    initial_state = {"loop_budget": budget} if budget else None
+    return model, asyncio.run(run_agent(with_model(agent.root_agent, model), "Tomato soup", initial_state=initial_state))
+
+
+def test_budget_gate_stops_before_an_iteration_that_does_not_fit():
+    model, result = run_pipeline({"max_model_calls": 4})
+    # Writer + one critic/refiner iteration; a second iteration (2 more calls) would exceed 4
+    assert model.calls == 3
+    assert result.state["loop_exit_reason"] == "budget_exhausted"
+    assert result.state["budget_exhausted"] == "max_model_calls"
+    assert result.final_text == result.state["current_recipe"]  # The best recipe so far is the answer
+    assert "Revision" in result.final_text
+    assert [(i["iteration"], i["model_calls"]) for i in result.state["loop_iterations"]] == [(1, 2)]
+    assert result.state["budget_usage"]["model_calls"] == 3
+
+
+def test_mid_loop_gate_stops_before_the_refiner_once_spent():
+    model, result = run_pipeline({"max_model_calls": 2})
+    # The writer and the critic spend the budget; the refinement gate stops the loop
+    assert model.calls == 2
+    assert result.state["budget_exhausted"] == "max_model_calls"
+    assert result.final_text == RECIPE
+
+
+def test_without_budget_iterations_are_still_recorded():
+    model, result = run_pipeline(None)
+    assert result.state.get("budget_exhausted") is None
+    iterations = result.state["loop_iterations"]
+    assert [i["iteration"] for i in iterations] == list(range(1, len(iterations) + 1))
+    assert sum(i["model_calls"] for i in iterations) == model.calls - 1  # All but the writer's call
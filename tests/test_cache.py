@@ -0,0 +1,207 @@
+"""Tests for function_tools.cache.AsyncTTLCache: coalescing, stale refresh and cancellation."""
+
+import asyncio
+
+import pytest
+
+from function_tools.cache import AsyncTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_cache(clock: FakeClock, ttl: float = 10.0, stale_seconds: float = 5.0, max_entries: int = 10) -> AsyncTTLCache:
+    return AsyncTTLCache(max_entries=max_entries, stale_seconds=stale_seconds, ttl_for=lambda value: ttl, clock=clock)
+
+
+class Fetcher:
+    """Counts calls; each call waits for `release` before returning its value."""
+
+    def __init__(self, value="v"):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return f"{self.value}{self.calls}"
+
+
+def test_hit_within_ttl_does_not_refetch():
+    async def scenario():
+        clock = FakeClock()
+        cache = make_cache(clock)
+        fetch = Fetcher()
+        fetch.release.set()
+        assert await cache.get_or_fetch("k", fetch) == "v1"
+        clock.now = 9.0
+        assert await cache.get_or_fetch("k", fetch) == "v1"
+        assert fetch.calls == 1
+        assert cache.stats()["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario():
+        cache = make_cache(FakeClock())
+        fetch = Fetcher()
+        waiters = [asyncio.ensure_future(cache.get_or_fetch("k", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        fetch.release.set()
+        assert await asyncio.gather(*waiters) == ["v1"] * 5
+        assert fetch.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_other_waiters():
+    async def scenario():
+        cache = make_cache(FakeClock())
+        fetch = Fetcher()
+        first = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        fetch.release.set()
+        assert await second == "v1"
+        assert first.cancelled()
+        assert fetch.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_fetch_of_cancelled_sole_caller_still_fills_the_cache():
+    async def scenario():
+        cache = make_cache(FakeClock())
+        fetch = Fetcher()
+        caller = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        caller.cancel()
+        fetch.release.set()
+        await asyncio.sleep(0.01)
+        assert await cache.get_or_fetch("k", fetch) == "v1"
+        assert fetch.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        cache = make_cache(FakeClock())
+
+        async def failing():
+            await asyncio.sleep(0)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(
+            cache.get_or_fetch("k", failing), cache.get_or_fetch("k", failing), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(cache) == 0
+
+    asyncio.run(scenario())
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def scenario():
+        clock = FakeClock()
+        cache = make_cache(clock)
+        fetch = Fetcher()
+        fetch.release.set()
+        await cache.get_or_fetch("k", fetch)
+        fetch.release.clear()
+        clock.now = 12.0  # Past the TTL, inside the stale window
+        assert await cache.get_or_fetch("k", fetch) == "v1"
+        assert await cache.get_or_fetch("k", fetch) == "v1"
+        fetch.release.set()
+        await asyncio.sleep(0.01)
+        assert fetch.calls == 2  # One refresh for both stale hits
+        assert await cache.get_or_fetch("k", fetch) == "v2"
+        assert cache.stats()["refreshes"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_miss_waits_on_running_refresh():
+    async def scenario():
+        clock = FakeClock()
+        cache = make_cache(clock)
+        fetch = Fetcher()
+        fetch.release.set()
+        await cache.get_or_fetch("k", fetch)
+        fetch.release.clear()
+        clock.now = 12.0
+        await cache.get_or_fetch("k", fetch)  # Starts the refresh
+        clock.now = 20.0  # Past the stale window: a miss that joins the refresh
+        miss = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        fetch.release.set()
+        assert await asyncio.wait_for(miss, 1.0) == "v2"
+        assert fetch.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_miss_waiting_on_cancelled_refresh_does_not_hang():
+    async def scenario():
+        clock = FakeClock()
+        cache = make_cache(clock)
+        fetch = Fetcher()
+        fetch.release.set()
+        await cache.get_or_fetch("k", fetch)
+        fetch.release.clear()
+        clock.now = 12.0
+        await cache.get_or_fetch("k", fetch)
+        clock.now = 20.0
+        miss = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        for task in list(cache._fetch_tasks):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(miss, 1.0)
+        # The next miss starts a new fetch instead of waiting on the cancelled one
+        fetch.release.set()
+        assert await asyncio.wait_for(cache.get_or_fetch("k", fetch), 1.0) == "v3"
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_serving_the_stale_entry():
+    async def scenario():
+        clock = FakeClock()
+        cache = make_cache(clock)
+        assert await cache.get_or_fetch("k", lambda: asyncio.sleep(0, result="old")) == "old"
+        clock.now = 12.0
+
+        async def failing():
+            raise RuntimeError("backend down")
+
+        assert await cache.get_or_fetch("k", failing) == "old"
+        await asyncio.sleep(0.01)
+        assert await cache.get_or_fetch("k", failing) == "old"
+
+    asyncio.run(scenario())
+
+
+def test_ttl_none_is_not_cached_and_lru_evicts():
+    async def scenario():
+        cache = AsyncTTLCache(
+            max_entries=2, stale_seconds=0, ttl_for=lambda value: None if value == "skip" else 10.0, clock=FakeClock()
+        )
+        await cache.get_or_fetch("skip", lambda: asyncio.sleep(0, result="skip"))
+        assert len(cache) == 0
+        for key in ("a", "b", "c"):
+            await cache.get_or_fetch(key, lambda key=key: asyncio.sleep(0, result=key))
+        assert len(cache) == 2
+        assert cache.stats()["evictions"] == 1
+
+    asyncio.run(scenario())
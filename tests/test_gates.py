@@ -0,0 +1,83 @@
+"""Tests for loop_agent.gates: the completion phrase, recipe similarity and the two loop gates."""
+
+import asyncio
+from typing import List
+
+from google.adk.agents import LlmAgent, LoopAgent
+
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm
+from loop_agent.gates import (
+    COMPLETION_PHRASE,
+    CONVERGENCE_SIMILARITY_THRESHOLD,
+    CritiqueApprovalGate,
+    RecipeConvergenceGate,
+    is_completion_critique,
+    recipe_similarity,
+)
+
+RECIPE = "Tomato Soup\nIngredients: tomatoes, water, salt\nSteps: chop, boil, blend"
+
+
+def test_completion_phrase_tolerates_formatting():
+    for critique in (COMPLETION_PHRASE, "  recipe looks great.", '"Recipe looks great!"', "**Recipe looks great!**\n"):
+        assert is_completion_critique(critique), critique
+    for critique in (None, "", "Recipe looks great, but add salt.", "Add more vegetables."):
+        assert not is_completion_critique(critique), critique
+
+
+def test_recipe_similarity_ignores_case_and_whitespace():
+    assert recipe_similarity(RECIPE, "  " + RECIPE.upper().replace("\n", "\n\n")) == 1.0
+    changed = RECIPE + "\nServe with basil, cream and croutons; season with pepper and garlic."
+    assert recipe_similarity(RECIPE, changed) < CONVERGENCE_SIMILARITY_THRESHOLD
+    assert recipe_similarity(RECIPE, "Pancakes") < 0.5
+
+
+def scripted_agent(name: str, output_key: str, replies: List[str]) -> LlmAgent:
+    """An agent whose model gives `replies` in turn (repeating the last one), counting its calls."""
+    def respond(llm_request):
+        return replies[min(model.calls, len(replies) - 1)]  # `calls` counts the turns served before this one
+
+    model = ScriptedLlm(responder=respond)
+    return LlmAgent(name=name, model=model, instruction=f"You are the {name}.", output_key=output_key)
+
+
+def recipe_loop(critiques: List[str], recipes: List[str], max_iterations: int = 5) -> LoopAgent:
+    return LoopAgent(
+        name="Loop",
+        sub_agents=[
+            RecipeConvergenceGate(name="ConvergenceGate"),
+            scripted_agent("Critic", "critique_feedback", critiques),
+            CritiqueApprovalGate(name="ApprovalGate"),
+            scripted_agent("Refiner", "current_recipe", recipes),
+        ],
+        max_iterations=max_iterations,
+    )
+
+
+def calls(loop: LoopAgent, name: str) -> int:
+    return loop.find_agent(name).model.calls
+
+
+def test_approval_gate_exits_without_calling_the_refiner():
+    loop = recipe_loop(["Add carrots.", COMPLETION_PHRASE], [RECIPE + "\nAlso: carrots, celery, onions and garlic."])
+    result = asyncio.run(run_agent(loop, "Tomato soup", initial_state={"current_recipe": RECIPE}))
+    assert result.state["loop_exit_reason"] == "critic_approved"
+    assert (calls(loop, "Critic"), calls(loop, "Refiner")) == (2, 1)
+
+
+def test_convergence_gate_exits_when_the_recipe_stops_changing():
+    loop = recipe_loop(["Add carrots."], [RECIPE])  # The refiner returns the recipe unchanged
+    result = asyncio.run(run_agent(loop, "Tomato soup", initial_state={"current_recipe": RECIPE}))
+    assert result.state["loop_exit_reason"] == "converged"
+    assert result.state["recipe_similarity"] == 1.0
+    assert (calls(loop, "Critic"), calls(loop, "Refiner")) == (1, 1)
+
+
+def test_changing_recipe_runs_every_iteration():
+    recipes = [f"{RECIPE}\nRevision {i}: " + "add another vegetable and spice. " * i for i in range(1, 4)]
+    loop = recipe_loop(["Add carrots."], recipes, max_iterations=3)
+    result = asyncio.run(run_agent(loop, "Tomato soup", initial_state={"current_recipe": RECIPE}))
+    assert result.state.get("loop_exit_reason") is None
+    assert (calls(loop, "Critic"), calls(loop, "Refiner")) == (3, 3)
+    assert result.state["current_recipe"] == recipes[-1]
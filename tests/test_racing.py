@@ -0,0 +1,104 @@
+"""Tests for agent_with_tools.racing.RacingAgent: winners, merging and cancelled tool calls."""
+
+import asyncio
+from typing import Optional
+
+import pytest
+from google.adk.agents import LlmAgent
+
+from agent_with_tools.racing import CANCELLED_TOOL_RESPONSE, RacingAgent, is_sufficient_answer
+from common.agent_runner import run_agent
+from common.mock_llm import ScriptedLlm, function_call_response, last_function_response
+
+ANSWER = "Paris is the capital and largest city of France."
+
+
+def source(name: str, answer: Optional[str], latency: float = 0.0, tool_seconds: Optional[float] = None) -> LlmAgent:
+    """
+    A branch that answers after `latency` seconds. With `tool_seconds` it first calls a
+    lookup tool that takes that long, and answers once the tool returns.
+    """
+    async def lookup(query: str) -> str:
+        """Looks up a query."""
+        await asyncio.sleep(tool_seconds)
+        return "notes"
+
+    def respond(llm_request):
+        if answer is None:
+            raise RuntimeError(f"{name} is down")
+        if tool_seconds is not None and last_function_response(llm_request) is None:
+            return function_call_response("lookup", {"query": "capital of France"})
+        return answer
+
+    return LlmAgent(
+        name=name,
+        model=ScriptedLlm(responder=respond, latency=lambda: latency),
+        instruction="Answer the question.",
+        tools=[lookup] if tool_seconds is not None else [],
+    )
+
+
+def test_is_sufficient_answer():
+    assert is_sufficient_answer(ANSWER)
+    assert not is_sufficient_answer("Paris.")
+    assert not is_sufficient_answer("I could not find anything about that question.")
+    assert not is_sufficient_answer("No relevant results were found for this query.")
+
+
+def test_first_sufficient_answer_wins_and_open_tool_calls_are_answered():
+    race = RacingAgent(
+        name="Race",
+        sub_agents=[source("Fast", ANSWER, latency=0.05), source("Slow", "Slow answer " * 5, tool_seconds=5.0)],
+        output_key="answer",
+    )
+    result = asyncio.run(asyncio.wait_for(run_agent(race, "Capital of France?"), 2.0))
+    assert result.final_text == ANSWER
+    assert result.state["answer"] == ANSWER
+    race_result = result.state["race_result"]
+    assert (race_result["winner"], race_result["cancelled"]) == ("Fast", ["Slow"])
+
+    calls = [call for event in result.events for call in event.get_function_calls()]
+    responses = [response for event in result.events for response in event.get_function_responses()]
+    assert [call.name for call in calls] == ["lookup"]
+    assert [(response.id, response.response) for response in responses] == [(calls[0].id, CANCELLED_TOOL_RESPONSE)]
+    cancelled_event = next(event for event in result.events if event.get_function_responses())
+    assert cancelled_event.author == "Slow"
+    assert cancelled_event.branch == "Race.Slow"
+    assert cancelled_event.custom_metadata["race_branch"] == "Slow"
+
+
+def test_insufficient_answer_does_not_end_the_race():
+    race = RacingAgent(
+        name="Race",
+        sub_agents=[source("Fast", "I could not find that."), source("Slow", ANSWER, tool_seconds=0.05)],
+    )
+    result = asyncio.run(run_agent(race, "Capital of France?"))
+    assert result.final_text == ANSWER
+    race_result = result.state["race_result"]
+    assert (race_result["winner"], race_result["insufficient"], race_result["cancelled"]) == ("Slow", ["Fast"], [])
+    # A branch that finished its tool call gets no cancelled response
+    responses = [response for event in result.events for response in event.get_function_responses()]
+    assert [response.response for response in responses] == [{"result": "notes"}]
+
+
+def test_answers_in_the_merge_window_are_merged():
+    race = RacingAgent(
+        name="Race",
+        sub_agents=[source("Search", ANSWER), source("Wiki", "France's capital, Paris, sits on the Seine.", latency=0.05)],
+        merge_window_seconds=0.5,
+        source_labels={"Wiki": "Wikipedia"},
+    )
+    result = asyncio.run(run_agent(race, "Capital of France?"))
+    assert result.final_text == f"{ANSWER}\n\n**Also from Wikipedia:**\nFrance's capital, Paris, sits on the Seine."
+    assert result.state["race_result"]["merged"] == ["Wiki"]
+
+
+def test_failed_branch_does_not_stop_the_race_but_all_failing_raises():
+    race = RacingAgent(name="Race", sub_agents=[source("Broken", None), source("Working", ANSWER, latency=0.05)])
+    result = asyncio.run(run_agent(race, "Capital of France?"))
+    assert result.final_text == ANSWER
+    assert result.state["race_result"]["failed"] == ["Broken"]
+
+    race = RacingAgent(name="Race", sub_agents=[source("Broken", None), source("AlsoBroken", None)])
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_agent(race, "Capital of France?"))
@@ -0,0 +1,76 @@
+"""Tests for travel_advisor.restaurants.RestaurantStore: city aliases, filters, location search and paging."""
+
+import numpy as np
+
+from travel_advisor.restaurants import RestaurantStore
+
+ROWS = [
+    # name, city, cuisine, price_level, rating, latitude, longitude
+    ("Slice", "New York", "Pizza", "1", "4.1", "40.7306", "-73.9866"),
+    ("Deli", "NYC", "American", "2", "4.6", "40.7223", "-73.9874"),
+    ("Steakhouse", "new york city", "American", "4", "4.8", "40.7580", "-73.9855"),
+    ("Bistro", "Paris", "French", "3", "4.5", "48.8566", "2.3522"),
+    ("Crêperie", "Paris", "French", "1", "4.0", "48.8530", "2.3499"),
+    ("Nowhere Diner", "Smalltown", "American", "1", "3.5", "10.0", "10.0"),
+]
+
+
+def names(store: RestaurantStore, rows: np.ndarray):
+    return [store.name(int(row)) for row in rows]
+
+
+def test_city_spellings_share_one_city():
+    store = RestaurantStore.from_rows(ROWS)
+    assert store.city_names == ["New York", "Paris", "Smalltown"]
+    for query in ("New York", "NYC", "Big Apple", "new york city"):
+        rows, distances = store.search(city=query)
+        assert names(store, rows) == ["Steakhouse", "Deli", "Slice"]  # Best rated first
+        assert distances is None
+
+
+def test_unknown_city_matches_itself_only():
+    store = RestaurantStore.from_rows(ROWS)
+    assert names(store, store.search(city="smalltown")[0]) == ["Nowhere Diner"]
+    assert len(store.search(city="Atlantis")[0]) == 0
+
+
+def test_attribute_filters():
+    store = RestaurantStore.from_rows(ROWS)
+    assert names(store, store.search(city="NYC", cuisine="american")[0]) == ["Steakhouse", "Deli"]
+    assert names(store, store.search(city="NYC", max_price_level=2)[0]) == ["Deli", "Slice"]
+    assert names(store, store.search(min_rating=4.5)[0]) == ["Steakhouse", "Deli", "Bistro"]
+    assert len(store.search(cuisine="Thai")[0]) == 0
+
+
+def test_location_search_is_nearest_first_and_can_narrow_by_city():
+    store = RestaurantStore.from_rows(ROWS)
+    rows, distances = store.search(latitude=40.7306, longitude=-73.9866, radius_km=10)
+    assert names(store, rows) == ["Slice", "Deli", "Steakhouse"]
+    assert list(distances) == sorted(distances)
+    rows, _ = store.search(latitude=48.8566, longitude=2.3522, radius_km=10, city="NYC")
+    assert len(rows) == 0
+    rows, _ = store.search(latitude=40.7306, longitude=-73.9866, radius_km=10, city="Big Apple", cuisine="pizza")
+    assert names(store, rows) == ["Slice"]
+
+
+def test_page():
+    store = RestaurantStore.from_rows(ROWS)
+    rows, distances = store.search(city="NYC")
+    first = store.page(rows, distances, offset=0, limit=2)
+    assert first["total_matches"] == 3
+    assert [record["name"] for record in first["restaurants"]] == ["Steakhouse", "Deli"]
+    assert first["restaurants"][0] == {"name": "Steakhouse", "city": "New York", "cuisine": "American", "price": "$$$$", "rating": 4.8}
+    assert first["next_offset"] == 2
+    assert store.page(rows, distances, offset=2, limit=2)["next_offset"] is None
+
+
+def test_npz_round_trip_merges_spellings_saved_apart(tmp_path):
+    store = RestaurantStore.from_rows(ROWS)
+    # A file saved before spellings were merged: "NYC" has its own code
+    store.city_names = ["New York", "Paris", "Smalltown", "NYC"]
+    store.city = np.where(np.arange(len(store)) == 1, 3, store.city).astype(np.int32)
+    path = str(tmp_path / "restaurants.npz")
+    store.save_npz(path)
+    loaded = RestaurantStore.load(path)
+    assert loaded.city_names == ["New York", "Paris", "Smalltown"]
+    assert names(loaded, loaded.search(city="New York")[0]) == ["Steakhouse", "Deli", "Slice"]
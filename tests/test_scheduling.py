@@ -0,0 +1,163 @@
+"""Tests for parallel_agent.scheduling: latency windows, hedging policy and HedgedLlm."""
+
+import asyncio
+from typing import List
+
+import pytest
+from google.adk.models import LLMRegistry, LlmRequest
+from google.genai import types
+
+from common.mock_llm import ScriptedLlm
+from parallel_agent.scheduling import BranchScheduler, LatencyTracker
+
+
+def request() -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="Topic")])])
+
+
+def scripted(latencies: List[float], fail_first: bool = False) -> ScriptedLlm:
+    """A model whose n-th call takes latencies[n] seconds; with `fail_first` the first call raises."""
+    pending = list(latencies)
+    replies = iter(range(len(latencies)))
+
+    def respond(llm_request):
+        call = next(replies)
+        if fail_first and call == 0:
+            raise RuntimeError("provider error")
+        return f"reply {call}"
+
+    return ScriptedLlm(responder=respond, latency=lambda: pending.pop(0))
+
+
+async def generate(model, llm_request: LlmRequest) -> str:
+    responses = [response async for response in model.generate_content_async(llm_request)]
+    return responses[-1].content.parts[0].text
+
+
+def warmed_scheduler(branch: str = "b", samples: float = 0.02, **kwargs) -> BranchScheduler:
+    scheduler = BranchScheduler(min_samples=5, min_hedge_delay=0.01, **kwargs)
+    for _ in range(5):
+        scheduler.tracker(branch).record(samples)
+    return scheduler
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=10)
+    assert tracker.percentile(95) is None
+    for seconds in range(1, 11):
+        tracker.record(float(seconds))
+    assert tracker.percentile(50) == 6.0
+    assert tracker.percentile(95) == 10.0
+    tracker.record(20.0)  # The window drops the oldest sample
+    assert len(tracker) == 10
+    assert tracker.percentile(0) == 2.0
+
+
+def test_hedge_delay_needs_min_samples_and_has_a_floor():
+    scheduler = BranchScheduler(min_samples=3, min_hedge_delay=0.05)
+    for _ in range(2):
+        scheduler.tracker("b").record(0.01)
+    assert scheduler.hedge_delay("b") is None
+    scheduler.tracker("b").record(0.01)
+    assert scheduler.hedge_delay("b") == 0.05
+    for _ in range(20):
+        scheduler.tracker("b").record(0.2)
+    assert scheduler.hedge_delay("b") == 0.2
+
+
+def test_fast_call_is_not_hedged_and_is_recorded():
+    async def scenario():
+        scheduler = warmed_scheduler()
+        model = scripted([0.0])
+        assert await generate(scheduler.model_for(model, "b"), request()) == "reply 0"
+        assert scheduler.stats()["hedges"] == 0
+        assert len(scheduler.tracker("b")) == 6
+
+    asyncio.run(scenario())
+
+
+def test_slow_primary_is_hedged_and_its_time_so_far_is_recorded():
+    async def scenario():
+        scheduler = warmed_scheduler()
+        model = scripted([0.5, 0.0])  # Primary is slow, the hedge answers at once
+        assert await generate(scheduler.model_for(model, "b"), request()) == "reply 0"
+        stats = scheduler.stats()
+        assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+        recorded = scheduler.tracker("b")._samples[-1]
+        # A lower bound for the cancelled primary: at least the hedge delay, not the hedge's own ~0s latency
+        assert 0.02 <= recorded < 0.5
+
+    asyncio.run(scenario())
+
+
+def test_no_hedge_when_every_slot_is_taken():
+    async def scenario():
+        scheduler = warmed_scheduler(max_concurrent_calls=1)
+        model = scripted([0.1, 0.0])
+        assert await generate(scheduler.model_for(model, "b"), request()) == "reply 0"
+        assert scheduler.stats()["hedges"] == 0
+        assert model.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_primary_falls_back_to_the_hedge():
+    async def scenario():
+        scheduler = warmed_scheduler()
+        model = scripted([0.1, 0.2], fail_first=True)
+        assert await generate(scheduler.model_for(model, "b"), request()) == "reply 1"
+        assert scheduler.stats()["hedge_wins"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_error_is_raised_when_every_attempt_fails():
+    async def scenario():
+        scheduler = BranchScheduler()
+        with pytest.raises(RuntimeError):
+            await generate(scheduler.model_for(scripted([0.0], fail_first=True), "b"), request())
+        assert len(scheduler.tracker("b")) == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_limit_is_shared_by_branches():
+    async def scenario():
+        scheduler = BranchScheduler(max_concurrent_calls=2)
+        in_flight = peak = 0
+
+        def respond(llm_request):
+            return "reply"
+
+        class Counting(ScriptedLlm):
+            async def generate_content_async(self, llm_request, stream=False):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                async for response in super().generate_content_async(llm_request, stream):
+                    yield response
+
+        model = Counting(responder=respond)
+        models = [scheduler.model_for(model, branch) for branch in ("a", "b", "c")]
+        await asyncio.gather(*(generate(models[i % 3], request()) for i in range(6)))
+        assert peak == 2
+
+    asyncio.run(scenario())
+
+
+def test_model_name_is_resolved_on_first_use(monkeypatch):
+    built = []
+
+    def new_llm(name):
+        built.append(name)
+        return scripted([0.0, 0.0])
+
+    monkeypatch.setattr(LLMRegistry, "new_llm", staticmethod(new_llm))
+    hedged = BranchScheduler().model_for("some-model", "b")
+    assert hedged.model == "some-model"
+    assert built == []
+    assert asyncio.run(generate(hedged, request())) == "reply 0"
+    assert asyncio.run(generate(hedged, request())) == "reply 1"
+    assert built == ["some-model"]
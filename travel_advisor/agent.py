@@ -1,47 +1,196 @@
+from typing import List
+
 from google.adk.agents import Agent
 
+from common.models import configured_model
+
+GEMINI_MODEL = configured_model("gemini-2.0-flash") # Override with the GEMINI_MODEL env var
+
+NEARBY_RADIUS_KM = 300
+NEARBY_LIMIT = 10
+MAX_NEARBY_LIMIT = 50  # Caps how many nearby cities a single tool response can put in the model's context
+RESTAURANT_PAGE_SIZE = 10
+MAX_RESTAURANT_PAGE_SIZE = 20  # Caps how many restaurants a single tool response can put in the model's context
+
+
+def _unknown_cities_error(unknown: List[str]) -> dict:
+    return {
+        "status": "error",
+        "error_message": f"Sorry, I could not find these cities: {', '.join(unknown)}"
+    }
+
+
+def _page_size(limit: int) -> int:
+    return min(max(limit, 1), MAX_RESTAURANT_PAGE_SIZE)
+
+
 def get_distance(from_city: str, to_city: str) -> dict:
     """
-        Retrieves the information about the distance between the cities and the weather at the destination
+        Retrieves the great-circle (as the crow flies) distance between two cities.
+        It has no weather information for the destination.
+
+        Args:
+            from_city (str): The city the traveller is coming from, optionally with its country (e.g. "Paris, France")
+            to_city (str): The city the traveller is going to, optionally with its country
+
+        Returns:
+            dict: distance information in kilometres and miles
+    """
+    from .geo import KM_PER_MILE, get_gazetteer
+
+    gazetteer = get_gazetteer()
+    indices, unknown = gazetteer.resolve([from_city, to_city])
+    if unknown:
+        return _unknown_cities_error(unknown)
+
+    distance_km = float(gazetteer.distances_km(indices[0], indices[1]))
+    from_name, to_name = gazetteer.names[indices[0]], gazetteer.names[indices[1]]
+    return {
+        "status": "success",
+        "from_city": from_name,
+        "to_city": to_name,
+        "distance_km": round(distance_km, 1),
+        "distance_miles": round(distance_km / KM_PER_MILE, 1),
+        "response": f"The distance between {from_name} and {to_name} is about {distance_km:,.0f} km ({distance_km / KM_PER_MILE:,.0f} miles)"
+    }
+
+
+def get_distance_matrix(cities: List[str]) -> dict:
+    """
+        Retrieves the distances between every pair of cities in a list, and the legs of the
+        itinerary that visits them in the given order
+
+        Args:
+            cities (List[str]): The cities of the trip, in travel order
+
+        Returns:
+            dict: the distance matrix in kilometres, each leg of the itinerary and the total trip distance
+    """
+    from .geo import get_gazetteer
+
+    if len(cities) < 2:
+        return {"status": "error", "error_message": "Please provide at least two cities"}
+    gazetteer = get_gazetteer()
+    indices, unknown = gazetteer.resolve(cities)
+    if unknown:
+        return _unknown_cities_error(unknown)
+
+    names = [gazetteer.names[index] for index in indices]
+    matrix = gazetteer.distance_matrix_km(indices).round(1)
+    legs = [
+        {"from": names[i], "to": names[i + 1], "distance_km": float(matrix[i, i + 1])}
+        for i in range(len(names) - 1)
+    ]
+    return {
+        "status": "success",
+        "cities": names,
+        "distance_matrix_km": matrix.tolist(),
+        "legs": legs,
+        "total_km": round(sum(leg["distance_km"] for leg in legs), 1)
+    }
+
+
+def get_nearby_cities(city: str, radius_km: float = NEARBY_RADIUS_KM, limit: int = NEARBY_LIMIT) -> dict:
+    """
+        Retrieves the cities within a given distance of a city, nearest first
 
         Args:
-            from_city (str): The city the traveller is coming from
-            to_city (str): The city the traveller is going to
+            city (str): The city to search around
+            radius_km (float): The search radius in kilometres
+            limit (int): The maximum number of cities to return
 
         Returns:
-            dict: distance information and the weather at the destination
+            dict: the nearby cities with their distance in kilometres
     """
+    from .geo import get_gazetteer
+
+    gazetteer = get_gazetteer()
+    index = gazetteer.lookup(city)
+    if index is None:
+        return _unknown_cities_error([city])
+
+    indices, distances = gazetteer.nearby(index, radius_km, min(max(limit, 1), MAX_NEARBY_LIMIT))
+    return {
+        "status": "success",
+        "city": gazetteer.names[index],
+        "nearby_cities": [
+            {"city": gazetteer.names[i], "country": gazetteer.countries[i], "distance_km": round(float(d), 1)}
+            for i, d in zip(indices, distances)
+        ]
+    }
 
-    if from_city.lower() == "san francisco" and to_city.lower() == "miami":
+def get_restaurants(
+    city: str, cuisine: str = "", max_price_level: int = 0, min_rating: float = 0.0, limit: int = RESTAURANT_PAGE_SIZE, offset: int = 0
+) -> dict:
+    """
+        Retrieves restaurant suggestions in a city, best rated first, one page at a time
+
+        Args:
+            city (str): The city to find restaurants in
+            cuisine (str): Only return restaurants of this cuisine (e.g. "Italian"); empty for any
+            max_price_level (int): Only return restaurants at or below this price level, from 1 ($) to 4 ($$$$); 0 for any
+            min_rating (float): Only return restaurants rated at least this (out of 5); 0 for any
+            limit (int): The number of restaurants to return (at most 20)
+            offset (int): The number of results to skip, to get the next page (use 'next_offset' from the previous page)
+
+        Returns:
+            dict: the page of restaurants, the total number of matches and the offset of the next page
+    """
+    from .restaurants import get_restaurant_store
+
+    store = get_restaurant_store()
+    rows, distances = store.search(city=city, cuisine=cuisine, max_price_level=max_price_level, min_rating=min_rating)
+    if not len(rows):
         return {
-            "status": "success",
-            "response": (
-                "The distance between San Francisco and Miami is 345km",
-                "Weather is approximately 42 degress Celcius"
-            )
+            "status": "error",
+            "error_message": f"Sorry, I do not have restaurant suggestions matching this in {city}"
         }
-    else:
+    return {"status": "success", "city": city, **store.page(rows, distances, max(offset, 0), _page_size(limit))}
+
+
+def get_restaurants_near(
+    latitude: float, longitude: float, radius_km: float = 2.0, cuisine: str = "", max_price_level: int = 0,
+    limit: int = RESTAURANT_PAGE_SIZE, offset: int = 0
+) -> dict:
+    """
+        Retrieves restaurants near a location, nearest first, one page at a time
+
+        Args:
+            latitude (float): Latitude of the location in degrees
+            longitude (float): Longitude of the location in degrees
+            radius_km (float): The search radius in kilometres
+            cuisine (str): Only return restaurants of this cuisine; empty for any
+            max_price_level (int): Only return restaurants at or below this price level, from 1 ($) to 4 ($$$$); 0 for any
+            limit (int): The number of restaurants to return (at most 20)
+            offset (int): The number of results to skip, to get the next page
+
+        Returns:
+            dict: the page of restaurants with their distance in kilometres, the total number of matches and the offset of the next page
+    """
+    from .restaurants import get_restaurant_store
+
+    store = get_restaurant_store()
+    rows, distances = store.search(
+        latitude=latitude, longitude=longitude, radius_km=radius_km, cuisine=cuisine, max_price_level=max_price_level
+    )
+    if not len(rows):
         return {
             "status": "error",
-            "error_message": f"Sorry, I do not have distance and weather information for this route"
+            "error_message": "Sorry, I do not have restaurant suggestions matching this near that location"
         }
-    
-def get_restaurants(city: str) -> list:
+    return {"status": "success", **store.page(rows, distances, max(offset, 0), _page_size(limit))}
 
-    return [
-        "Miami Eats",
-        "Fast Fries",
-        "Taco Castle"
-    ]
 
 root_agent = Agent(
     name="travel_advisor",
-    model="gemini-2.0-flash",
+    model=GEMINI_MODEL,
     description = (
-        "Agent to answer questions about distance between cities and restaurant suggestions"
+        "Agent to answer questions about distances between cities, nearby cities and restaurant suggestions"
     ),
     instruction=(
-        "You're a helpful agent who can answer questions about distance between cities, weather and also give suggestions on places to eat"
+        "You're a helpful agent who can answer questions about distance between cities, plan the distances of multi-city trips, "
+        "find cities near a place and also give suggestions on places to eat. "
+        "You have no weather data: if asked about the weather, say that you cannot provide it"
     ),
-    tools=[get_distance, get_restaurants]
+    tools=[get_distance, get_distance_matrix, get_nearby_cities, get_restaurants, get_restaurants_near]
 )
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Benchmarks for the travel advisor's data layer, with no network access.
+
+geo - the geodesic engine:
+1. gazetteer load time
+2. batch distances: random city pairs through one vectorized haversine pass (pairs/ms)
+3. the get_distance and get_distance_matrix tools end to end
+4. nearby queries on a synthetic set of points: the KD-tree (SphereIndex) against a
+   brute-force vectorized scan, with the results cross-checked
+
+restaurants - the restaurant store on a synthetic dataset (generated once into --workdir):
+1. load time from CSV and from the .npz columnar format, peak and resident memory
+2. city, filtered, deep-page and near-coordinates query latency
+3. the same filter as a linear scan over a list of dicts, for comparison
+
+Run:
+    python -m travel_advisor.benchmark geo --pairs 1000000 --points 200000
+    python -m travel_advisor.benchmark restaurants --rows 1000000
+"""
+
+import argparse
+import csv
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from . import agent
+from .geo import DEFAULT_GAZETTEER_PATH, Gazetteer, SphereIndex, get_gazetteer, haversine_km
+from .restaurants import COLUMNS, RestaurantStore
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_geo_benchmark(pairs: int, points: int, queries: int, radius_km: float) -> None:
+    rng = np.random.default_rng(0)
+
+    load = _best_of(lambda: Gazetteer.from_csv(DEFAULT_GAZETTEER_PATH))
+    gazetteer = Gazetteer.from_csv(DEFAULT_GAZETTEER_PATH)
+    print(f"gazetteer      cities={len(gazetteer):<7} load={load * 1000:7.2f}ms")
+
+    from_idx = rng.integers(0, len(gazetteer), pairs)
+    to_idx = rng.integers(0, len(gazetteer), pairs)
+    batch = _best_of(lambda: gazetteer.distances_km(from_idx, to_idx))
+    print(f"batch pairs    pairs={pairs:<9} time={batch * 1000:8.2f}ms  throughput={pairs / (batch * 1000):,.0f} pairs/ms")
+
+    single = _best_of(lambda: agent.get_distance("San Francisco", "Miami"), repeat=200)
+    itinerary = ["London", "Paris", "Zurich", "Rome", "Athens", "Istanbul", "Dubai", "Mumbai", "Singapore", "Sydney"]
+    matrix = _best_of(lambda: agent.get_distance_matrix(itinerary), repeat=200)
+    print(f"tools          get_distance={single * 1e6:6.1f}us  get_distance_matrix({len(itinerary)} cities)={matrix * 1e6:6.1f}us")
+
+    # Synthetic points spread uniformly over the sphere
+    lat = np.arcsin(rng.uniform(-1.0, 1.0, points))
+    lon = rng.uniform(-np.pi, np.pi, points)
+    build_start = time.perf_counter()
+    index = SphereIndex(lat, lon)
+    build = time.perf_counter() - build_start
+    query_ids = rng.integers(0, points, queries)
+
+    def tree_queries():
+        return [index.query_radius(lat[q], lon[q], radius_km)[0] for q in query_ids]
+
+    def brute_queries():
+        results = []
+        for q in query_ids:
+            distances = haversine_km(lat[q], lon[q], lat, lon)
+            hits = np.flatnonzero(distances <= radius_km)
+            results.append(hits[np.argsort(distances[hits], kind="stable")])
+        return results
+
+    tree_time = _best_of(tree_queries, repeat=3)
+    brute_time = _best_of(brute_queries, repeat=3)
+    mismatches = sum(set(a.tolist()) != set(b.tolist()) for a, b in zip(tree_queries(), brute_queries()))
+    print(
+        f"nearby radius  points={points:<8} build={build * 1000:7.1f}ms  radius={radius_km:g}km  "
+        f"kd-tree={tree_time / queries * 1e6:7.1f}us/query  brute-force={brute_time / queries * 1e6:8.1f}us/query  "
+        f"mismatches={mismatches}"
+    )
+
+    nearest = _best_of(lambda: [index.query_nearest(lat[q], lon[q], 10) for q in query_ids], repeat=3)
+    # What get_nearby_cities asks: the 10 nearest within the radius
+    capped = _best_of(lambda: [index.query_nearest(lat[q], lon[q], 10, radius_km) for q in query_ids], repeat=3)
+    print(
+        f"nearby k-NN    k=10  kd-tree={nearest / queries * 1e6:7.1f}us/query  "
+        f"within {radius_km:g}km={capped / queries * 1e6:7.1f}us/query"
+    )
+
+
+CUISINES = (
+    "American", "Barbecue", "British", "Chinese", "Cuban", "Ethiopian", "French", "Greek", "Indian", "Italian",
+    "Japanese", "Korean", "Lebanese", "Mexican", "Pizza", "Seafood", "Spanish", "Thai", "Turkish", "Vietnamese",
+)
+
+
+def generate_csv(path: str, rows: int, seed: int = 0) -> None:
+    """Writes a synthetic dataset of `rows` restaurants spread around the gazetteer's cities."""
+    rng = np.random.default_rng(seed)
+    gazetteer = get_gazetteer()
+    weights = np.sqrt(gazetteer.population.astype(np.float64))
+    city = rng.choice(len(gazetteer), size=rows, p=weights / weights.sum())
+    lat = np.degrees(gazetteer.lat[city]) + rng.normal(0.0, 0.08, rows)
+    lon = np.degrees(gazetteer.lon[city]) + rng.normal(0.0, 0.08, rows)
+    cuisine = rng.integers(0, len(CUISINES), rows)
+    price = rng.integers(1, 5, rows)
+    rating = np.round(rng.uniform(2.5, 5.0, rows), 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(rows):
+            writer.writerow((
+                f"{CUISINES[cuisine[i]]} Place #{i}", gazetteer.names[city[i]], CUISINES[cuisine[i]],
+                int(price[i]), rating[i], f"{lat[i]:.5f}", f"{lon[i]:.5f}",
+            ))
+
+
+def run_restaurant_benchmark(rows: int, workdir: str) -> None:
+    os.makedirs(workdir, exist_ok=True)
+    csv_path = os.path.join(workdir, f"restaurants_{rows}.csv")
+    npz_path = os.path.join(workdir, f"restaurants_{rows}.npz")
+    if not os.path.exists(csv_path):
+        generate_csv(csv_path, rows)
+
+    start = time.perf_counter()
+    store = RestaurantStore.from_csv(csv_path)
+    csv_load = time.perf_counter() - start
+    tracemalloc.start()  # Separate pass: tracing slows allocation down too much to time under it
+    RestaurantStore.from_csv(csv_path)
+    _, csv_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    store.save_npz(npz_path)
+    start = time.perf_counter()
+    RestaurantStore.from_npz(npz_path)
+    npz_load = time.perf_counter() - start
+    print(
+        f"load           rows={len(store):,}  csv={csv_load:6.2f}s (peak {csv_peak / 2**20:6.1f} MB)  "
+        f"npz={npz_load:6.2f}s  resident={store.nbytes / 2**20:6.1f} MB ({store.nbytes / len(store):.0f} B/row)"
+    )
+
+    queries = {
+        "city": lambda: store.page(*store.search(city="NYC"), 0, 10),
+        "city+filters": lambda: store.page(*store.search(city="Paris", cuisine="French", max_price_level=2, min_rating=4.5), 0, 10),
+        "city, page 50": lambda: store.page(*store.search(city="London"), 500, 10),
+    }
+    for label, query in queries.items():
+        print(f"query          {label:<16} {_best_of(query, 200) * 1e6:8.1f}us  matches={query()['total_matches']:,}")
+
+    start = time.perf_counter()
+    store.geo_index
+    print(f"geo index      build={time.perf_counter() - start:6.2f}s (on first location query)")
+    near = lambda: store.page(*store.search(latitude=25.7617, longitude=-80.1918, radius_km=2.0, cuisine="Cuban"), 0, 10)
+    print(f"query          {'near+cuisine':<16} {_best_of(near, 200) * 1e6:8.1f}us  matches={near()['total_matches']:,}")
+
+    # Baseline: a list of per-row dicts scanned linearly, as a naive store would do
+    naive = [store.record(row) for row in range(len(store))]
+    scan = lambda: [r for r in naive if r["city"] == "Paris" and r["cuisine"] == "French"][:10]
+    print(f"baseline       {'dict-list scan':<16} {_best_of(scan, 3) * 1e6:8.1f}us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the travel advisor's distance engine and restaurant store.")
+    parser.add_argument("scenario", choices=("geo", "restaurants"))
+    parser.add_argument("--pairs", type=int, default=1_000_000, help="City pairs per batch distance call.")
+    parser.add_argument("--points", type=int, default=200_000, help="Synthetic points for the nearby benchmark.")
+    parser.add_argument("--queries", type=int, default=200, help="Nearby queries to time.")
+    parser.add_argument("--radius-km", type=float, default=100.0)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic restaurants to load.")
+    parser.add_argument("--workdir", default=os.path.join(os.path.expanduser("~"), ".cache", "adk-course-agents"))
+    args = parser.parse_args()
+    if args.scenario == "geo":
+        run_geo_benchmark(args.pairs, args.points, args.queries, args.radius_km)
+    else:
+        run_restaurant_benchmark(args.rows, args.workdir)
+
+
+if __name__ == "__main__":
+    main()
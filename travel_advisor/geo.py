@@ -0,0 +1,314 @@
+"""
+Offline geodesic distance engine for the travel advisor.
+
+- `Gazetteer` loads a city file (data/cities.csv by default, or TRAVEL_GAZETTEER_PATH)
+  once into compact NumPy coordinate arrays. It resolves city names and aliases after
+  normalization (case, accents and punctuation are ignored; "Paris, France" narrows by
+  country).
+- `haversine_km` computes great-circle distances over whole arrays at once, so batch
+  queries (distance matrices, itineraries) cost one vectorized pass.
+- `SphereIndex` is a static KD-tree over the cities' 3D unit vectors, used for "cities
+  near X" queries. On the unit sphere, straight-line (chord) distance grows with
+  great-circle distance, so ordinary box pruning on the 3D points is exact.
+"""
+
+import csv
+import heapq
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088  # Mean Earth radius
+KM_PER_MILE = 1.609344
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "data", "cities.csv")
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_name(name: str) -> str:
+    """Normalizes a place name for lookup: accents stripped, casefolded, punctuation and extra spaces removed."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    text = "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Great-circle distance in km between points given in radians.
+
+    Arguments are scalars or NumPy arrays and broadcast against each other, so one call
+    can compute a single pair, many pairs, or a full matrix.
+    """
+    lat1 = np.asarray(lat1, dtype=np.float64)
+    lat2 = np.asarray(lat2, dtype=np.float64)
+    sin_dlat = np.sin((lat2 - lat1) * 0.5)
+    sin_dlon = np.sin((np.asarray(lon2, dtype=np.float64) - lon1) * 0.5)
+    a = sin_dlat * sin_dlat + np.cos(lat1) * np.cos(lat2) * sin_dlon * sin_dlon
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Converts latitudes/longitudes in radians to an (n, 3) array of unit vectors."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)), axis=-1)
+
+
+def _chord_for_km(distance_km: float) -> float:
+    return 2.0 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+def _km_for_chord(chord: np.ndarray) -> np.ndarray:
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+class SphereIndex:
+    """
+    Static KD-tree over points on the sphere for radius and k-nearest queries.
+
+    Args:
+        lat (np.ndarray): Latitudes in radians.
+        lon (np.ndarray): Longitudes in radians.
+        leaf_size (int): Maximum points per leaf; leaves are scanned with vectorized math.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, leaf_size: int = 32):
+        points = unit_vectors(lat, lon)
+        order = np.arange(len(points))
+        starts: List[int] = []
+        ends: List[int] = []
+        lows: List[np.ndarray] = []
+        highs: List[np.ndarray] = []
+        children: List[Tuple[int, int]] = []
+
+        # Nodes are built depth-first; children of internal nodes are filled in after they exist.
+        stack = [(0, len(points), -1, 0)]
+        while stack:
+            start, end, parent, side = stack.pop()
+            node = len(starts)
+            if parent >= 0:
+                left, right = children[parent]
+                children[parent] = (node, right) if side == 0 else (left, node)
+            block = points[order[start:end]]
+            low, high = (block.min(axis=0), block.max(axis=0)) if end > start else (np.zeros(3), np.zeros(3))
+            starts.append(start)
+            ends.append(end)
+            lows.append(low)
+            highs.append(high)
+            children.append((-1, -1))
+            if end - start > leaf_size:
+                dim = int(np.argmax(high - low))
+                mid = (start + end) // 2
+                segment = order[start:end]
+                order[start:end] = segment[np.argpartition(points[segment, dim], mid - start)]
+                stack.append((mid, end, node, 1))
+                stack.append((start, mid, node, 0))
+
+        self._points = points[order]
+        self._order = order
+        self._starts = starts
+        self._ends = ends
+        self._lows = np.array(lows)
+        self._highs = np.array(highs)
+        self._children = children
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _box_distance(self, node: int, query: np.ndarray) -> float:
+        gap = np.maximum(np.maximum(self._lows[node] - query, query - self._highs[node]), 0.0)
+        return float(np.sqrt(gap @ gap))
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds all points within `radius_km` of (lat, lon) (radians).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Point indices and their distances in km, nearest first.
+        """
+        query = unit_vectors(lat, lon)
+        limit = _chord_for_km(radius_km)
+        found: List[np.ndarray] = []
+        chords: List[np.ndarray] = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, query) > limit:
+                continue
+            left, right = self._children[node]
+            if left < 0:
+                block = self._points[self._starts[node]:self._ends[node]]
+                distance = np.sqrt(((block - query) ** 2).sum(axis=1))
+                hits = distance <= limit
+                found.append(self._order[self._starts[node]:self._ends[node]][hits])
+                chords.append(distance[hits])
+            else:
+                stack.extend((left, right))
+        if not found:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        indices = np.concatenate(found)
+        distances = _km_for_chord(np.concatenate(chords))
+        ranking = np.argsort(distances, kind="stable")
+        return indices[ranking], distances[ranking]
+
+    def query_nearest(
+        self, lat: float, lon: float, k: int, radius_km: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the `k` points nearest to (lat, lon) (radians), optionally only those within `radius_km`.
+
+        Unlike `query_radius`, the search stops as soon as no unvisited node can hold a
+        point closer than the k-th best, so a small `k` stays cheap in dense areas.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Point indices and their distances in km, nearest first.
+        """
+        query = unit_vectors(lat, lon)
+        limit = _chord_for_km(radius_km) if radius_km is not None else np.inf
+        best: List[Tuple[float, int]] = []  # Max-heap of (-chord, index) holding the k best so far
+        frontier = [(0.0, 0)]
+        while frontier:
+            box_distance, node = heapq.heappop(frontier)
+            if box_distance > limit or (len(best) == k and box_distance > -best[0][0]):
+                break
+            left, right = self._children[node]
+            if left < 0:
+                block = self._points[self._starts[node]:self._ends[node]]
+                distance = np.sqrt(((block - query) ** 2).sum(axis=1))
+                for position in np.argsort(distance)[:k]:
+                    if distance[position] > limit:
+                        break
+                    item = (-float(distance[position]), int(self._order[self._starts[node] + position]))
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+            else:
+                for child in (left, right):
+                    heapq.heappush(frontier, (self._box_distance(child, query), child))
+        best.sort(reverse=True)
+        indices = np.array([index for _, index in best], dtype=np.int64)
+        return indices, _km_for_chord(np.array([-chord for chord, _ in best]))
+
+
+class Gazetteer:
+    """
+    City names, aliases and coordinates held in NumPy arrays.
+
+    Attributes:
+        names (Tuple[str, ...]): Display name of each city.
+        countries (Tuple[str, ...]): Country name of each city.
+        country_codes (Tuple[str, ...]): ISO 3166-1 alpha-2 code of each city's country.
+        lat (np.ndarray): Latitudes in radians (float32).
+        lon (np.ndarray): Longitudes in radians (float32).
+        population (np.ndarray): Population, used to rank cities that share a name.
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, str]]):
+        self.names = tuple(row["name"] for row in rows)
+        self.countries = tuple(row["country"] for row in rows)
+        self.country_codes = tuple(row["country_code"].upper() for row in rows)
+        self.lat = np.radians(np.array([float(row["latitude"]) for row in rows])).astype(np.float32)
+        self.lon = np.radians(np.array([float(row["longitude"]) for row in rows])).astype(np.float32)
+        self.population = np.array([int(row.get("population") or 0) for row in rows], dtype=np.int64)
+
+        # Normalized name or alias -> city indices, most populous first
+        candidates: Dict[str, List[int]] = {}
+        for index, row in enumerate(rows):
+            aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias.strip()]
+            for name in [row["name"], *aliases]:
+                key = normalize_name(name)
+                if key and index not in candidates.setdefault(key, []):
+                    candidates[key].append(index)
+        for indices in candidates.values():
+            indices.sort(key=lambda index: -self.population[index])
+        self._candidates = candidates
+        self._country_keys = {normalize_name(country) for country in self.countries}
+        self._country_keys |= {code.casefold() for code in self.country_codes}
+        self._index: Optional[SphereIndex] = None
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Gazetteer":
+        """Loads a gazetteer from a CSV file with name, country_code, country, latitude, longitude, population and aliases ('|'-separated) columns."""
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(list(csv.DictReader(f)))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def index(self) -> SphereIndex:
+        if self._index is None:
+            self._index = SphereIndex(self.lat, self.lon)
+        return self._index
+
+    def lookup(self, name: str) -> Optional[int]:
+        """
+        Resolves a city name or alias to its index.
+
+        A trailing ", <country>" (name or ISO code) picks among cities that share a name.
+        A trailing qualifier that is not a known country (e.g. a US state: "Miami, FL") is ignored.
+
+        Returns:
+            Optional[int]: The index of the best match, or None if the name is unknown.
+        """
+        key = normalize_name(name)
+        if key in self._candidates:
+            return self._candidates[key][0]
+        if "," not in name:
+            return None
+        place, qualifier = name.rsplit(",", 1)
+        matches = self._candidates.get(normalize_name(place))
+        if not matches:
+            return None
+        qualifier_key = normalize_name(qualifier)
+        if qualifier_key not in self._country_keys:
+            return matches[0]
+        return next(
+            (
+                index
+                for index in matches
+                if qualifier_key in (normalize_name(self.countries[index]), self.country_codes[index].casefold())
+            ),
+            None,
+        )
+
+    def resolve(self, names: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+        """Looks up several names; returns the indices found and the names that could not be resolved."""
+        indices: List[int] = []
+        unknown: List[str] = []
+        for name in names:
+            index = self.lookup(name)
+            if index is None:
+                unknown.append(name)
+            else:
+                indices.append(index)
+        return np.array(indices, dtype=np.int64), unknown
+
+    def distances_km(self, from_indices: np.ndarray, to_indices: np.ndarray) -> np.ndarray:
+        """Pairwise distances between two equally long (or broadcastable) index arrays."""
+        return haversine_km(self.lat[from_indices], self.lon[from_indices], self.lat[to_indices], self.lon[to_indices])
+
+    def distance_matrix_km(self, indices: np.ndarray) -> np.ndarray:
+        """All-pairs distances between the given cities as an (n, n) array."""
+        column = indices[:, np.newaxis]
+        return self.distances_km(column, indices[np.newaxis, :])
+
+    def nearby(self, index: int, radius_km: float, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Cities within `radius_km` of city `index` (itself excluded), nearest first, at most `limit`."""
+        indices, distances = self.index.query_nearest(
+            float(self.lat[index]), float(self.lon[index]), limit + 1, radius_km=radius_km
+        )
+        keep = indices != index
+        return indices[keep][:limit], distances[keep][:limit]
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer() -> Gazetteer:
+    """Loads the gazetteer configured by TRAVEL_GAZETTEER_PATH (default: data/cities.csv) once per process."""
+    return Gazetteer.from_csv(os.environ.get("TRAVEL_GAZETTEER_PATH", DEFAULT_GAZETTEER_PATH))
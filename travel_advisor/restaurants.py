@@ -0,0 +1,270 @@
+"""
+Indexed restaurant store for the travel advisor.
+
+Restaurants are loaded from a local file (data/restaurants.csv by default, or
+TRAVEL_RESTAURANTS_PATH; '.npz' files written by `RestaurantStore.save_npz` load
+fastest). They are kept column by column in NumPy arrays:
+
+- names live in one UTF-8 blob with an offsets array, instead of one Python string per row;
+- cities and cuisines are dictionary-encoded as small integer codes;
+- price level, rating and coordinates are fixed-width numeric columns.
+
+Indexes:
+- by city: row ids grouped per city and pre-sorted by rating. A city query is a dict
+  lookup plus an array slice. City names go through the gazetteer, so aliases work ("NYC"),
+  both in queries and in the data: rows spelled "NYC" and "New York" are one city.
+- by location: a `SphereIndex` KD-tree (see geo.py), built on first use, for
+  "near these coordinates" queries.
+
+Cuisine, price and rating filters are vectorized masks over the candidate rows.
+Results are returned one page at a time, so large result sets never reach the model.
+"""
+
+import csv
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import SphereIndex, get_gazetteer, normalize_name
+
+DEFAULT_RESTAURANTS_PATH = os.path.join(os.path.dirname(__file__), "data", "restaurants.csv")
+COLUMNS = ("name", "city", "cuisine", "price_level", "rating", "latitude", "longitude")
+
+
+def _city_key(city: str) -> str:
+    # Resolve aliases and spelling variants through the gazetteer when it knows the city.
+    gazetteer = get_gazetteer()
+    index = gazetteer.lookup(city)
+    return normalize_name(gazetteer.names[index] if index is not None else city)
+
+
+class RestaurantStore:
+    """
+    Column-oriented restaurant table with city and location indexes.
+
+    Args:
+        names (Sequence[str]): Restaurant names.
+        cities (Sequence[str]): City of each restaurant.
+        cuisines (Sequence[str]): Cuisine of each restaurant.
+        price_level (Sequence[int]): Price level from 1 ($) to 4 ($$$$).
+        rating (Sequence[float]): Average rating out of 5.
+        latitude (Sequence[float]): Latitude in degrees.
+        longitude (Sequence[float]): Longitude in degrees.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        cities: Sequence[str],
+        cuisines: Sequence[str],
+        price_level: Sequence[int],
+        rating: Sequence[float],
+        latitude: Sequence[float],
+        longitude: Sequence[float],
+    ):
+        encoded = [name.encode("utf-8") for name in names]
+        self._name_blob = b"".join(encoded)
+        self._name_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=self._name_offsets[1:])
+
+        self.city_names, city_codes = self._encode(cities)
+        self.cuisine_names, cuisine_codes = self._encode(cuisines)
+        self.city = city_codes.astype(np.int32)
+        self.cuisine = cuisine_codes.astype(np.int16)
+        self.price_level = np.asarray(price_level, dtype=np.int8)
+        self.rating = np.asarray(rating, dtype=np.float32)
+        self.lat = np.radians(np.asarray(latitude, dtype=np.float64)).astype(np.float32)
+        self.lon = np.radians(np.asarray(longitude, dtype=np.float64)).astype(np.float32)
+        self._build_indexes()
+
+    @staticmethod
+    def _encode(values: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        """Dictionary-encodes a string column into (distinct values, codes)."""
+        codes: Dict[str, int] = {}
+        encoded = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int64, count=len(values))
+        return list(codes), encoded
+
+    def _merge_city_spellings(self) -> None:
+        """Re-encodes the city column so spellings of the same city ("NYC", "New York") share one code."""
+        keys = [_city_key(city) for city in self.city_names]
+        names: Dict[str, str] = {}  # City key -> its first spelling, kept as the display name
+        for key, city in zip(keys, self.city_names):
+            names.setdefault(key, city)
+        self._city_codes = {key: code for code, key in enumerate(names)}
+        if len(names) < len(keys):
+            remap = np.fromiter((self._city_codes[key] for key in keys), dtype=self.city.dtype, count=len(keys))
+            self.city = remap[self.city]
+            self.city_names = list(names.values())
+
+    def _build_indexes(self) -> None:
+        self._merge_city_spellings()
+        # Rows grouped by city, best rated first; a city's rows are one contiguous slice.
+        self._city_order = np.lexsort((-self.rating, self.city)).astype(np.int64)
+        counts = np.bincount(self.city, minlength=len(self.city_names))
+        self._city_bounds = np.concatenate(([0], np.cumsum(counts)))
+        self._cuisine_codes = {normalize_name(cuisine): code for code, cuisine in enumerate(self.cuisine_names)}
+        self._by_rating = np.argsort(-self.rating, kind="stable")
+        self._geo_index: Optional[SphereIndex] = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> "RestaurantStore":
+        """Builds a store from rows in COLUMNS order (e.g. CSV records)."""
+        columns = list(zip(*rows)) or [()] * len(COLUMNS)
+        names, cities, cuisines, price_level, rating, latitude, longitude = columns
+        return cls(
+            names,
+            cities,
+            cuisines,
+            np.asarray(price_level, dtype=np.int8),
+            np.asarray(rating, dtype=np.float32),
+            np.asarray(latitude, dtype=np.float64),
+            np.asarray(longitude, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_csv(cls, path: str) -> "RestaurantStore":
+        """Loads a CSV file with a header row naming at least the COLUMNS."""
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            positions = [header.index(column) for column in COLUMNS]
+            return cls.from_rows(tuple(row[p] for p in positions) for row in reader)
+
+    @classmethod
+    def from_npz(cls, path: str) -> "RestaurantStore":
+        """Loads a store saved with `save_npz`, without re-parsing text."""
+        data = np.load(path, allow_pickle=False)
+        store = cls.__new__(cls)
+        store._name_blob = data["name_blob"].tobytes()
+        store._name_offsets = data["name_offsets"]
+        store.city_names = data["city_names"].tolist()
+        store.cuisine_names = data["cuisine_names"].tolist()
+        for column in ("city", "cuisine", "price_level", "rating", "lat", "lon"):
+            setattr(store, column, data[column])
+        store._build_indexes()
+        return store
+
+    @classmethod
+    def load(cls, path: str) -> "RestaurantStore":
+        return cls.from_npz(path) if path.endswith(".npz") else cls.from_csv(path)
+
+    def save_npz(self, path: str) -> None:
+        np.savez(
+            path,
+            name_blob=np.frombuffer(self._name_blob, dtype=np.uint8),
+            name_offsets=self._name_offsets,
+            city_names=np.array(self.city_names, dtype=str),
+            cuisine_names=np.array(self.cuisine_names, dtype=str),
+            city=self.city,
+            cuisine=self.cuisine,
+            price_level=self.price_level,
+            rating=self.rating,
+            lat=self.lat,
+            lon=self.lon,
+        )
+
+    def __len__(self) -> int:
+        return len(self.city)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and indexes."""
+        arrays = (
+            self._name_offsets, self.city, self.cuisine, self.price_level, self.rating,
+            self.lat, self.lon, self._city_order, self._city_bounds, self._by_rating,
+        )
+        return len(self._name_blob) + sum(array.nbytes for array in arrays)
+
+    @property
+    def geo_index(self) -> SphereIndex:
+        if self._geo_index is None:
+            self._geo_index = SphereIndex(self.lat, self.lon)
+        return self._geo_index
+
+    def name(self, row: int) -> str:
+        return self._name_blob[self._name_offsets[row]:self._name_offsets[row + 1]].decode("utf-8")
+
+    def record(self, row: int, distance_km: Optional[float] = None) -> Dict:
+        """A restaurant as a JSON-friendly dict."""
+        record = {
+            "name": self.name(row),
+            "city": self.city_names[self.city[row]],
+            "cuisine": self.cuisine_names[self.cuisine[row]],
+            "price": "$" * int(self.price_level[row]),
+            "rating": round(float(self.rating[row]), 1),
+        }
+        if distance_km is not None:
+            record["distance_km"] = round(float(distance_km), 2)
+        return record
+
+    def in_city(self, city: str) -> np.ndarray:
+        """Row ids of a city's restaurants, best rated first (empty if the city is unknown)."""
+        code = self._city_codes.get(_city_key(city))
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self._city_order[self._city_bounds[code]:self._city_bounds[code + 1]]
+
+    def near(self, latitude: float, longitude: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Row ids within `radius_km` of a point given in degrees, nearest first, with their distances."""
+        return self.geo_index.query_radius(np.radians(latitude), np.radians(longitude), radius_km)
+
+    def search(
+        self,
+        city: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: float = 5.0,
+        cuisine: Optional[str] = None,
+        max_price_level: Optional[int] = None,
+        min_rating: Optional[float] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Finds restaurants by city and/or location, then applies attribute filters.
+
+        Location results are ordered nearest first; otherwise best rated first.
+
+        Returns:
+            Tuple[np.ndarray, Optional[np.ndarray]]: Matching row ids and, for location
+            queries, their distances in km.
+        """
+        distances = None
+        if latitude is not None and longitude is not None:
+            rows, distances = self.near(latitude, longitude, radius_km)
+            if city:
+                code = self._city_codes.get(_city_key(city), -1)
+                keep = self.city[rows] == code
+                rows, distances = rows[keep], distances[keep]
+        elif city:
+            rows = self.in_city(city)
+        else:
+            rows = self._by_rating
+
+        mask = np.ones(len(rows), dtype=bool)
+        if cuisine:
+            mask &= self.cuisine[rows] == self._cuisine_codes.get(normalize_name(cuisine), -1)
+        if max_price_level:
+            mask &= self.price_level[rows] <= max_price_level
+        if min_rating:
+            mask &= self.rating[rows] >= min_rating
+        if mask.all():
+            return rows, distances
+        return rows[mask], (distances[mask] if distances is not None else None)
+
+    def page(self, rows: np.ndarray, distances: Optional[np.ndarray], offset: int, limit: int) -> Dict:
+        """Formats one page of search results, with the offset of the next page if there is one."""
+        end = offset + limit
+        page_rows = rows[offset:end]
+        page_distances = distances[offset:end] if distances is not None else [None] * len(page_rows)
+        return {
+            "total_matches": int(len(rows)),
+            "restaurants": [self.record(int(row), distance) for row, distance in zip(page_rows, page_distances)],
+            "next_offset": end if end < len(rows) else None,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_restaurant_store() -> RestaurantStore:
+    """Loads the store configured by TRAVEL_RESTAURANTS_PATH (default: data/restaurants.csv) once per process."""
+    return RestaurantStore.load(os.environ.get("TRAVEL_RESTAURANTS_PATH", DEFAULT_RESTAURANTS_PATH))
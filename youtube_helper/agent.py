@@ -2,6 +2,13 @@ from google.adk.agents import Agent
 # Import for model configuration
 from google.genai import types
 
+from common.models import configured_model
+from common.response_cache import response_cache
+
+GEMINI_MODEL = configured_model("gemini-2.0-flash") # Override with the GEMINI_MODEL env var
+
+DEFAULT_TIPS_TOKEN_BUDGET = 120  # Keeps tool output well below the model's 250-token answer budget
+
 def generate_niche_video_ideas(channel_niche: str, num_ideas: int = 3) -> list:
     """
     Generates creative video ideas tailored to a specific YouTube channel niche.
@@ -15,57 +22,27 @@ def generate_niche_video_ideas(channel_niche: str, num_ideas: int = 3) -> list:
     """
     # In a real scenario, this would involve more sophisticated logic,
     # possibly calling an LLM or an external idea generation API.
-    if "tech reviews" in channel_niche.lower():
-        ideas = [
-            f"Top 5 Gadgets Under $100 for {channel_niche} in 2025",
-            f"Deep Dive: The Latest AI Smartphone Features",
-            f"DIY Smart Home Setup Guide for {channel_niche}",
-            f"Budget Gaming PC Build: Max Performance, Min Cost"
-        ]
-    elif "cooking tutorials" in channel_niche.lower():
-        ideas = [
-            f"Quick & Easy 30-Minute Meals: {channel_niche} Edition",
-            f"Mastering Sourdough Bread: A Beginner's Guide",
-            f"Global Street Food Recipes You Can Make At Home",
-            f"Ultimate Guide to Meal Prepping for the Week"
-        ]
-    else:
-        ideas = [
-            f"Exploring the Future of {channel_niche}",
-            f"The Ultimate Guide to {channel_niche} Basics",
-            f"Behind the Scenes of a {channel_niche} Creator",
-            f"Top 10 Tips for Mastering {channel_niche}"
-        ]
-    return ideas[:num_ideas]
+    # Niches and their idea templates live in data/niches.json (see niches.py).
+    from .niches import get_catalogue
 
-def get_channel_optimization_tips(channel_type: str) -> dict:
+    return get_catalogue().ideas(channel_niche, num_ideas)
+
+def get_channel_optimization_tips(channel_type: str, max_tokens: int = DEFAULT_TIPS_TOKEN_BUDGET) -> dict:
     """
-    Provides general tips for improving a YouTube channel's performance and reach.
+    Provides tips for improving a YouTube channel's performance and reach, chosen for the channel's type.
 
     Args:
         channel_type (str): The type or category of the YouTube channel (e.g., 'vlog', 'education', 'entertainment').
+        max_tokens (int): The approximate size limit of the returned tips, in tokens. Most relevant tips are kept first.
 
     Returns:
-        dict: A dictionary containing optimization tips for various aspects.
+        dict: Optimization tips grouped by aspect (most relevant first), the estimated token count of the
+              result and how many tips were left out to fit the limit.
     """
-    tips = {
-        "SEO": [
-            "Use relevant keywords in titles, descriptions, and tags.",
-            "Optimize video thumbnails for click-through rate.",
-            "Create compelling video descriptions with timestamps."
-        ],
-        "Engagement": [
-            "Encourage comments and questions.",
-            "Add end screens and cards to promote other videos.",
-            "Respond to comments to build community."
-        ],
-        "Content Strategy": [
-            "Analyze audience retention reports to understand viewer behavior.",
-            "Research trending topics in your niche.",
-            "Maintain a consistent upload schedule."
-        ]
-    }
-    return {"status": "success", "tips": tips}
+    # The tips table is built once as immutable data; see tips.py.
+    from .tips import select_tips
+
+    return select_tips(channel_type, max_tokens)
 
 # You could also integrate a tool like a mock web scraper for trending topics
 # or a tool that queries a hypothetical YouTube Analytics API.
@@ -73,7 +50,7 @@ def get_channel_optimization_tips(channel_type: str) -> dict:
 
 root_agent = Agent(
     name="youtube_creator_assistant",
-    model="gemini-2.0-flash",
+    model=GEMINI_MODEL,
     description=(
         "An AI assistant designed to help YouTube creators generate video ideas and optimize their channels."
     ),
@@ -90,5 +67,9 @@ root_agent = Agent(
     generate_content_config = types.GenerateContentConfig(
         temperature=0.3,
         max_output_tokens=250
-    )
+    ),
+    # Low temperature: repeated questions are answered from the shared response cache (see common/response_cache.py)
+    before_model_callback=response_cache.before_model,
+    after_model_callback=response_cache.after_model,
+    on_model_error_callback=response_cache.on_model_error
 )
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""
+Benchmarks for the YouTube creator assistant's tools.
+
+niches - lookup for generate_niche_video_ideas. For synthetic catalogues of increasing
+size, measures the one-off compile time and the per-lookup latency (p50/p99) of:
+1. linear   - an if/elif-style scan testing every niche phrase as a substring (the old approach, generalized)
+2. compiled - NicheCatalogue's token-phrase index
+Queries mix channel descriptions that mention a niche with ones that match nothing.
+
+tips - tokens per turn for get_channel_optimization_tips, run through the agent on a
+stand-in model (see `common/mock_llm.py`). The model calls the tool, then lists every
+tip it received and stops at the agent's max_output_tokens. Compares:
+1. full     - the whole tips table on every call (the old tool)
+2. budgeted - tips selected for the channel type within the tool's token budget
+
+cache - the shared model response cache on a workload of repeated questions (a few
+popular ones asked often, others once), with simulated model latency. Reports model
+calls, estimated tokens, hit rate and wall time for:
+1. off         - no response cache
+2. on          - the cache, at the agent's temperature (0.3)
+3. warm-agent  - the cache with the agent at temperature 0.9, above the threshold (nothing is cached)
+
+Run:
+    python -m youtube_helper.benchmark niches --sizes 10 100 1000 10000 100000
+    python -m youtube_helper.benchmark tips
+    python -m youtube_helper.benchmark cache --requests 200 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from itertools import product
+from typing import Dict, List
+
+from common.agent_runner import run_agent
+from common.mock_llm import (
+    ScriptedLlm,
+    function_call_response,
+    last_function_response,
+    last_user_text,
+    request_prompt_text,
+    with_model,
+)
+from common.persistent_cache import PersistentCache
+from common.response_cache import ResponseCache
+from common.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+from . import agent
+from .niches import NicheCatalogue
+from .tips import full_tips_payload
+
+_QUALIFIERS = ["budget", "beginner", "advanced", "vintage", "urban", "vegan", "retro", "kids", "luxury", "minimalist",
+               "speed", "extreme", "cozy", "competitive", "indie", "weekend", "outdoor", "digital", "classic", "modern"]
+_SUBJECTS = ["cooking", "gaming", "travel", "fitness", "woodworking", "photography", "gardening", "finance", "coding",
+             "fashion", "makeup", "music", "painting", "cycling", "camping", "fishing", "chess", "astronomy",
+             "history", "language", "parenting", "pets", "cars", "drones", "knitting", "pottery", "baking", "hiking",
+             "skating", "surfing", "robotics", "anime", "comics", "movies", "theater", "dance", "yoga", "running",
+             "investing", "crypto", "design", "writing", "poetry", "science", "math", "physics", "biology", "climbing",
+             "sailing", "skiing"]
+_FORMATS = ["tutorials", "reviews", "vlogs", "news", "challenges", "tips", "guides", "reactions", "podcasts", "shorts",
+            "livestreams", "documentaries", "interviews", "hacks", "builds", "diaries", "explainers", "rankings",
+            "comparisons", "walkthroughs", "recipes", "setups", "routines", "stories", "experiments", "myths",
+            "histories", "breakdowns", "tests", "hauls", "unboxings", "roundups", "lessons", "essays", "debates",
+            "collabs", "marathons", "speedruns", "showcases", "workshops", "courses", "tours", "journals",
+            "critiques", "playthroughs", "makeovers", "mods", "repairs", "restorations", "projects", "sketches",
+            "timelapses", "asmr", "qna", "bloopers", "highlights", "compilations", "recaps", "previews", "teardowns",
+            "deep dives", "case studies", "masterclasses", "crash courses", "top tens", "field trips", "day in the life",
+            "behind the scenes", "how tos", "first looks", "long plays", "quick tips", "study sessions", "home tours",
+            "gear guides", "cook alongs", "paint alongs", "code alongs", "build logs", "travel diaries", "try ons",
+            "taste tests", "side hustles", "money diaries", "news roundups", "weekly recaps", "monthly favorites",
+            "yearly reviews", "tier lists", "hot takes", "explained", "for beginners", "on a budget", "at home",
+            "in ten minutes", "for kids", "for seniors", "myth busting", "science explained", "walk and talks"]
+
+
+def synthetic_entries(size: int) -> List[Dict]:
+    """Builds `size` distinct niches (e.g. 'vegan baking tutorials') with one alias and four idea templates each."""
+    combos = product(_QUALIFIERS, _SUBJECTS, _FORMATS)
+    entries = []
+    for qualifier, subject, fmt in combos:
+        if len(entries) == size:
+            break
+        name = f"{qualifier} {subject} {fmt}"
+        entries.append({
+            "name": name,
+            "aliases": [f"{subject} {fmt} for {qualifier} fans"],
+            "ideas": [f"{{channel_niche}}: idea {i} for {name}" for i in range(4)],
+        })
+    if len(entries) < size:
+        raise ValueError(f"At most {len(entries)} synthetic niches are available")
+    return entries
+
+
+def make_queries(entries: List[Dict], count: int, rng: random.Random) -> List[str]:
+    queries = []
+    for i in range(count):
+        if i % 4 == 3:
+            queries.append("my channel about something completely different and unrelated")
+        else:
+            queries.append(f"Welcome to our {rng.choice(entries)['name']} channel, new videos every week")
+    return queries
+
+
+def linear_ideas(entries: List[Dict], channel_niche: str, num_ideas: int) -> List[str]:
+    """The if/elif approach: test each niche's phrases as substrings, first hit wins."""
+    text = channel_niche.lower()
+    for entry in entries:
+        if any(phrase in text for phrase in [entry["name"], *entry["aliases"]]):
+            return [template.format(channel_niche=channel_niche) for template in entry["ideas"][:num_ideas]]
+    return [f"The Ultimate Guide to {channel_niche} Basics"][:num_ideas]
+
+
+def _percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    return f"p50={p50 * 1e6:9.1f}us p99={p99 * 1e6:9.1f}us"
+
+
+def run_niche_benchmark(sizes: List[int], queries: int) -> None:
+    rng = random.Random(0)
+    for size in sizes:
+        entries = synthetic_entries(size)
+        sample = make_queries(entries, queries, rng)
+
+        start = time.perf_counter()
+        catalogue = NicheCatalogue(entries, ["The Ultimate Guide to {channel_niche} Basics"])
+        build = time.perf_counter() - start
+
+        for label, lookup in (
+            ("linear", lambda q: linear_ideas(entries, q, 3)),
+            ("compiled", lambda q: catalogue.ideas(q, 3)),
+        ):
+            # Keep the slow linear scan affordable on large catalogues
+            timed = sample if label == "compiled" or size <= 1000 else sample[: max(20, queries // 50)]
+            latencies = []
+            for query in timed:
+                t0 = time.perf_counter()
+                lookup(query)
+                latencies.append(time.perf_counter() - t0)
+            extra = f" build={build * 1000:8.1f}ms" if label == "compiled" else ""
+            print(f"niches={size:<7} {label:<9} {_percentiles(latencies)}{extra}")
+
+
+CHANNEL_TYPES = ("vlog", "education", "entertainment", "gaming", "cooking")
+
+
+def _full_tips_agent():
+    """The assistant with the old tool, which returned the whole tips table regardless of channel_type."""
+    def get_channel_optimization_tips(channel_type: str) -> dict:
+        """Provides general tips for improving a YouTube channel's performance and reach."""
+        return full_tips_payload()
+
+    return agent.root_agent.clone(
+        update={"tools": [agent.generate_niche_video_ideas, get_channel_optimization_tips]}
+    )
+
+
+def make_tips_responder(channel_type: str, max_output_tokens: int, turns: List[Dict]):
+    """Calls the tips tool, then lists every tip it got back, cut off at max_output_tokens like the real model."""
+    def respond(llm_request):
+        prompt_tokens = estimate_tokens(request_prompt_text(llm_request))
+        response = last_function_response(llm_request)
+        if response is None:
+            turns.append({"prompt_tokens": prompt_tokens, "completion_tokens": 0, "truncated": False})
+            return function_call_response("get_channel_optimization_tips", {"channel_type": channel_type})
+        answer = "Here are tips for your channel:\n" + "".join(
+            f"- **{category}:** {tip}\n" for category, tips in response.response.get("tips", {}).items() for tip in tips
+        )
+        limit = max_output_tokens * CHARS_PER_TOKEN
+        turns.append({
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": estimate_tokens(answer[:limit]),
+            "truncated": len(answer) > limit,
+        })
+        return answer[:limit]
+
+    return respond
+
+
+async def run_tips_benchmark() -> None:
+    max_output_tokens = agent.root_agent.generate_content_config.max_output_tokens
+    for label, assistant in (("full", _full_tips_agent()), ("budgeted", agent.root_agent)):
+        totals = {"prompt_tokens": 0, "completion_tokens": 0, "truncated": 0}
+        for channel_type in CHANNEL_TYPES:
+            turns: List[Dict] = []
+            model = ScriptedLlm(responder=make_tips_responder(channel_type, max_output_tokens, turns))
+            await run_agent(with_model(assistant, model), f"How can I grow my {channel_type} channel?")
+            print(
+                f"{label:<9} {channel_type:<14} "
+                + "  ".join(
+                    f"turn{i + 1}: prompt={turn['prompt_tokens']:<4} completion={turn['completion_tokens']:<4}"
+                    + (" (truncated)" if turn["truncated"] else "")
+                    for i, turn in enumerate(turns)
+                )
+            )
+            for turn in turns:
+                totals["prompt_tokens"] += turn["prompt_tokens"]
+                totals["completion_tokens"] += turn["completion_tokens"]
+                totals["truncated"] += turn["truncated"]
+        print(
+            f"{label:<9} {'total':<14} prompt={totals['prompt_tokens']} completion={totals['completion_tokens']} "
+            f"truncated_answers={totals['truncated']}/{len(CHANNEL_TYPES)}"
+        )
+
+
+CHANNELS = ("cooking tutorials", "tech reviews", "gaming", "travel vlog", "science education", "music covers",
+            "fitness", "personal finance", "woodworking", "photography", "language learning", "pet care")
+
+
+def make_questions(count: int, rng: random.Random) -> List[str]:
+    """Questions about channels with Zipf-like popularity: a few are asked over and over, most rarely."""
+    weights = [1 / (rank + 1) for rank in range(len(CHANNELS))]
+    questions = []
+    for _ in range(count):
+        channel = rng.choices(CHANNELS, weights)[0]
+        if rng.random() < 0.5:
+            questions.append(f"Give me video ideas for my {channel} channel")
+        else:
+            questions.append(f"How can I grow my {channel} channel?")
+    return questions
+
+
+def assistant_responder(llm_request):
+    """Calls the tool that matches the question, then summarizes its result."""
+    response = last_function_response(llm_request)
+    if response is not None:
+        return "Here is what I suggest:\n" + json.dumps(response.response)[:600]
+    text = last_user_text(llm_request)
+    if text.startswith("Give me video ideas"):
+        channel = text.removeprefix("Give me video ideas for my ").removesuffix(" channel")
+        return function_call_response("generate_niche_video_ideas", {"channel_niche": channel})
+    channel = text.removeprefix("How can I grow my ").removesuffix(" channel?")
+    return function_call_response("get_channel_optimization_tips", {"channel_type": channel})
+
+
+async def run_cache_benchmark(requests: int, latency_ms: float) -> None:
+    questions = make_questions(requests, random.Random(0))
+    print(f"workload       requests={requests} distinct={len(set(questions))} latency={latency_ms:g}ms per model call")
+    warm_config = agent.root_agent.generate_content_config.model_copy(update={"temperature": 0.9})
+    variants = (
+        ("off", ResponseCache(enabled=False), None),
+        ("on", ResponseCache(store=PersistentCache(":memory:"), enabled=True), None),
+        ("warm-agent", ResponseCache(store=PersistentCache(":memory:"), enabled=True), warm_config),
+    )
+    for label, cache, config in variants:
+        update = {"before_model_callback": cache.before_model, "after_model_callback": cache.after_model}
+        if config is not None:
+            update["generate_content_config"] = config
+        model = ScriptedLlm(responder=assistant_responder, latency=lambda: latency_ms / 1000)
+        assistant = with_model(agent.root_agent.clone(update=update), model)
+        start = time.perf_counter()
+        for question in questions:
+            await run_agent(assistant, question)
+        elapsed = time.perf_counter() - start
+        stats = cache.stats() if cache.enabled else {"hit_rate": 0.0}
+        print(
+            f"{label:<14} model_calls={model.calls:<5} prompt_tokens={model.prompt_tokens:<7} "
+            f"completion_tokens={model.completion_tokens:<6} hit_rate={stats['hit_rate']:5.1%} "
+            f"wall={elapsed:7.2f}s ({elapsed / requests * 1000:6.1f}ms/request)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the YouTube creator assistant's tools.")
+    parser.add_argument("scenario", choices=("niches", "tips", "cache"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200, help="Questions in the cache workload.")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Simulated latency per model call (cache).")
+    args = parser.parse_args()
+    if args.scenario == "niches":
+        run_niche_benchmark(args.sizes, args.queries)
+    elif args.scenario == "tips":
+        asyncio.run(run_tips_benchmark())
+    else:
+        asyncio.run(run_cache_benchmark(args.requests, args.latency_ms))
+
+
+if __name__ == "__main__":
+    main()
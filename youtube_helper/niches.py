@@ -0,0 +1,159 @@
+"""
+Niche catalogue for video idea generation.
+
+The catalogue (data/niches.json by default, or YOUTUBE_NICHE_CATALOGUE_PATH) maps niches
+and their aliases to idea templates. It is compiled once:
+
+- Every niche name and alias becomes a normalized token phrase ("Tech Reviews" ->
+  ('tech', 'review')) in a hash index. Matching a channel description looks up each
+  token window of each phrase length present in the catalogue. The cost depends on the
+  description's length, not on how many niches there are.
+- Idea templates are parsed and validated at load time. Each is kept as a bound
+  `str.format`, or as a constant when it has no placeholder.
+
+When several niches match, longer (more specific) phrases rank first. "cooking tutorials"
+beats "tutorials", for example.
+"""
+
+import json
+import os
+import re
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Set, Tuple, Union
+
+DEFAULT_CATALOGUE_PATH = os.path.join(os.path.dirname(__file__), "data", "niches.json")
+TEMPLATE_FIELDS = frozenset({"channel_niche"})
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+Template = Union[str, Callable[..., str]]  # A constant idea, or a bound str.format
+
+
+def _stem(token: str) -> str:
+    # Just enough folding for plurals to match singulars ("reviews" ~ "review", "recipes" ~ "recipe").
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Splits text into normalized, lightly stemmed tokens."""
+    return tuple(_stem(token) for token in _TOKEN.findall(text.casefold()))
+
+
+def compile_template(template: str) -> Template:
+    """
+    Validates an idea template and prepares it for fast rendering.
+
+    Raises:
+        ValueError: If the template uses a placeholder other than {channel_niche}.
+    """
+    fields = {field for _, field, _, _ in string.Formatter().parse(template) if field is not None}
+    unknown = fields - TEMPLATE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown placeholder(s) {sorted(unknown)} in idea template {template!r}")
+    return template.format if fields else template.format()
+
+
+def render(template: Template, channel_niche: str) -> str:
+    return template if isinstance(template, str) else template(channel_niche=channel_niche)
+
+
+@dataclass(frozen=True)
+class Niche:
+    """A catalogue entry: its name and compiled idea templates."""
+
+    name: str
+    ideas: Tuple[Template, ...]
+
+
+class NicheMatch(NamedTuple):
+    """A niche matched in a channel description; `phrase` is the name or alias that matched."""
+
+    niche: Niche
+    phrase: str
+    matched_tokens: int
+
+
+class NicheCatalogue:
+    """
+    Compiled niche catalogue with multi-phrase matching.
+
+    Args:
+        entries (Iterable[Dict]): Niches as {"name": str, "aliases": [str], "ideas": [str]}.
+        default_ideas (Sequence[str]): Templates used when no niche matches.
+    """
+
+    def __init__(self, entries: Iterable[Dict], default_ideas: Sequence[str]):
+        self.niches: List[Niche] = []
+        self.default = Niche("", tuple(compile_template(template) for template in default_ideas))
+        # Token phrase -> (niche index, display phrase) for every niche using it, in catalogue order
+        self._phrases: Dict[Tuple[str, ...], List[Tuple[int, str]]] = {}
+        lengths: Set[int] = set()
+        for entry in entries:
+            index = len(self.niches)
+            self.niches.append(Niche(entry["name"], tuple(compile_template(t) for t in entry.get("ideas", ()))))
+            for phrase in [entry["name"], *entry.get("aliases", ())]:
+                tokens = tokenize(phrase)
+                if not tokens:
+                    continue
+                users = self._phrases.setdefault(tokens, [])
+                if all(niche != index for niche, _ in users):
+                    users.append((index, phrase))
+                lengths.add(len(tokens))
+        self._lengths = sorted(lengths, reverse=True)
+
+    @classmethod
+    def from_json(cls, path: str) -> "NicheCatalogue":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["niches"], data.get("default", ()))
+
+    def __len__(self) -> int:
+        return len(self.niches)
+
+    def match(self, channel_niche: str, limit: int = 3) -> List[NicheMatch]:
+        """
+        Finds the catalogue niches mentioned in a channel description, best first.
+
+        Niches are ranked by the length of their longest matching phrase, then by
+        catalogue order.
+        """
+        tokens = tokenize(channel_niche)
+        best: Dict[int, NicheMatch] = {}
+        for length in self._lengths:
+            for start in range(len(tokens) - length + 1):
+                for index, phrase in self._phrases.get(tokens[start:start + length], ()):
+                    if index not in best:  # Longest phrases are tried first
+                        best[index] = NicheMatch(self.niches[index], phrase, length)
+        ranked = sorted(best.items(), key=lambda item: (-item[1].matched_tokens, item[0]))
+        return [match for _, match in ranked[:limit]]
+
+    def ideas(self, channel_niche: str, num_ideas: int) -> List[str]:
+        """
+        Renders up to `num_ideas` ideas for a channel niche.
+
+        Ideas come from the best matching niche, topped up from the next matches if it has
+        too few. The default templates are used when nothing matches.
+        """
+        if num_ideas <= 0:
+            return []
+        matches = self.match(channel_niche, limit=num_ideas)
+        sources = [match.niche for match in matches] or [self.default]
+        ideas: List[str] = []
+        for niche in sources:
+            for template in niche.ideas[:num_ideas - len(ideas)]:
+                ideas.append(render(template, channel_niche))
+            if len(ideas) >= num_ideas:
+                break
+        return ideas
+
+
+@lru_cache(maxsize=None)
+def get_catalogue() -> NicheCatalogue:
+    """Loads the catalogue configured by YOUTUBE_NICHE_CATALOGUE_PATH (default: data/niches.json) once per process."""
+    return NicheCatalogue.from_json(os.environ.get("YOUTUBE_NICHE_CATALOGUE_PATH", DEFAULT_CATALOGUE_PATH))
@@ -0,0 +1,151 @@
+"""
+Channel optimization tips, selected per channel type and sized to a token budget.
+
+The tips table is built once as immutable data (a read-only mapping of tuples), with
+the estimated token cost of every tip precomputed. A request works as follows:
+
+1. `channel_type` picks an ordered list of relevant categories. Type-specific tips come
+   first, then general categories in the order that matters most for that type.
+2. Tips are added breadth-first, the top tip of each category before any second tip, for
+   as long as the serialized payload stays within the budget.
+3. The payload reports its estimated token count and how many tips were left out.
+
+Selections are cached per (channel type, budget), since the table never changes.
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+from common.tokens import estimate_json_tokens, estimate_tokens
+
+from .niches import tokenize
+
+TIPS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "SEO": (
+        "Use relevant keywords in titles, descriptions, and tags.",
+        "Optimize video thumbnails for click-through rate.",
+        "Create compelling video descriptions with timestamps.",
+    ),
+    "Engagement": (
+        "Encourage comments and questions.",
+        "Add end screens and cards to promote other videos.",
+        "Respond to comments to build community.",
+    ),
+    "Content Strategy": (
+        "Analyze audience retention reports to understand viewer behavior.",
+        "Research trending topics in your niche.",
+        "Maintain a consistent upload schedule.",
+    ),
+    "Vlog": (
+        "Hook viewers in the first 10 seconds with what the video is about.",
+        "Keep a recognizable intro, format and personality across episodes.",
+        "Cut dead air aggressively; pacing drives retention in vlogs.",
+    ),
+    "Education": (
+        "Put the question the video answers in the title.",
+        "Split lessons into chapters so viewers can jump to what they need.",
+        "Link related lessons into playlists that build on each other.",
+    ),
+    "Entertainment": (
+        "Test several thumbnails and titles; curiosity drives clicks.",
+        "Publish Shorts cut from long videos to reach new viewers.",
+        "Collaborate with creators who share your audience.",
+    ),
+    "Gaming": (
+        "Cover new releases and updates on day one, when search demand peaks.",
+        "Stream regularly and cut highlights into separate videos.",
+        "Name the game and the topic early in the title.",
+    ),
+    "Music": (
+        "Release on a regular cadence and use Premieres for new tracks.",
+        "Add lyrics and credits to the description.",
+        "Post short performance clips that link to the full track.",
+    ),
+})
+
+GENERAL_CATEGORIES = ("SEO", "Engagement", "Content Strategy")
+
+# Channel type -> categories in priority order
+_PRIORITIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "vlog": ("Vlog", "Engagement", "Content Strategy", "SEO"),
+    "education": ("Education", "SEO", "Content Strategy", "Engagement"),
+    "entertainment": ("Entertainment", "Engagement", "Content Strategy", "SEO"),
+    "gaming": ("Gaming", "Engagement", "SEO", "Content Strategy"),
+    "music": ("Music", "Engagement", "SEO", "Content Strategy"),
+})
+
+# Words in a channel type description -> the type they indicate (tokens are plural-folded)
+_TYPE_KEYWORDS: Mapping[str, str] = MappingProxyType({
+    "vlog": "vlog", "vlogging": "vlog", "lifestyle": "vlog", "travel": "vlog", "daily": "vlog",
+    "education": "education", "educational": "education", "tutorial": "education", "howto": "education",
+    "course": "education", "lesson": "education", "science": "education",
+    "entertainment": "entertainment", "comedy": "entertainment", "sketch": "entertainment",
+    "prank": "entertainment", "reaction": "entertainment",
+    "gaming": "gaming", "game": "gaming", "esport": "gaming", "stream": "gaming", "streaming": "gaming",
+    "music": "music", "musician": "music", "band": "music", "cover": "music", "song": "music",
+})
+
+# Serialized cost of each tip, including its quotes and separator
+_TIP_TOKENS: Mapping[str, int] = MappingProxyType(
+    {tip: estimate_tokens(tip) + 1 for tips in TIPS.values() for tip in tips}
+)
+
+
+def channel_kind(channel_type: str) -> str:
+    """Classifies a free-form channel type (e.g. 'Educational science videos') as one of the known kinds, or 'general'."""
+    for token in tokenize(channel_type):
+        if token in _TYPE_KEYWORDS:
+            return _TYPE_KEYWORDS[token]
+    return "general"
+
+
+@lru_cache(maxsize=256)
+def _select(kind: str, token_budget: int) -> Tuple[Tuple[Tuple[str, Tuple[str, ...]], ...], int, int]:
+    categories = _PRIORITIES.get(kind, GENERAL_CATEGORIES)
+    chosen: Dict[str, List[str]] = {}
+    spent = estimate_json_tokens({"status": "success", "channel_type": kind, "tips": {}, "estimated_tokens": 0,
+                                  "omitted_tips": 0})
+    omitted = 0
+    depth = max(len(TIPS[category]) for category in categories)
+    for rank in range(depth):
+        for category in categories:
+            if rank >= len(TIPS[category]):
+                continue
+            tip = TIPS[category][rank]
+            cost = _TIP_TOKENS[tip] + (0 if category in chosen else estimate_tokens(category) + 2)
+            if spent + cost > token_budget:
+                omitted += 1
+                continue
+            chosen.setdefault(category, []).append(tip)
+            spent += cost
+    ordered = tuple((category, tuple(chosen[category])) for category in categories if category in chosen)
+    return ordered, spent, omitted
+
+
+def select_tips(channel_type: str, token_budget: int) -> Dict:
+    """
+    Builds the tips payload for a channel type within a token budget.
+
+    Args:
+        channel_type (str): Free-form channel type, e.g. 'vlog' or 'coding tutorials'.
+        token_budget (int): Upper bound on the payload's estimated tokens.
+
+    Returns:
+        Dict: The selected tips per category, the payload's estimated token count and
+              the number of tips left out to fit the budget.
+    """
+    kind = channel_kind(channel_type)
+    selected, spent, omitted = _select(kind, token_budget)
+    return {
+        "status": "success",
+        "channel_type": kind,
+        "tips": {category: list(tips) for category, tips in selected},
+        "estimated_tokens": spent,
+        "omitted_tips": omitted,
+    }
+
+
+def full_tips_payload() -> Dict:
+    """Every tip in the table, regardless of channel type or budget."""
+    return {"status": "success", "tips": {category: list(tips) for category, tips in TIPS.items()}}